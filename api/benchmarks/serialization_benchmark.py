@@ -0,0 +1,91 @@
+# CPU spent turning a page of campsites into a JSON body, per serialization path.
+#
+#   python -m api.benchmarks.serialization_benchmark [rows] [repeats]
+#
+# response_model:   a route returning ORM objects, FastAPI validates them
+#                   against response_model, runs jsonable_encoder, then json.dumps
+# adapter:          what GET /campsites does, one TypeAdapter validation and a
+#                   pydantic-core dump_json
+# revalidated:      a route returning already validated models through
+#                   response_model, FastAPI validates them again
+# fast_response:    the same models returned in a FastJSONResponse
+import asyncio
+import sys
+import time
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+from api.models.campsite_models import Campsite, CampsitePhoto, CampsiteContact, CampsiteCategory
+# the remaining models, so the mappers configure
+import api.models.review_models
+import api.models.facility_models
+import api.models.activity_models
+from api.schemas.campsite_schemas import Campsite as CampsiteSchema
+from api.utils.fast_json import FastJSONResponse
+
+PAGE_SIZE = 250
+
+campsite_list_adapter = TypeAdapter(list[CampsiteSchema])
+response_field = create_response_field("Response", list[CampsiteSchema])
+
+
+def make_page(rows=PAGE_SIZE):
+    category = CampsiteCategory(
+        category_id=1, category_name="In The Wild", category_img_url="https://example.com/wild.png")
+    return [
+        Campsite(
+            campsite_id=campsite_id, campsite_name=f"CAMPSITE {campsite_id}",
+            campsite_longitude=-1.5 + campsite_id / 1000, campsite_latitude=53.4 + campsite_id / 1000,
+            parking_cost=5.0, facilities_cost=None, description="A quiet spot by the river " * 4,
+            opening_month="March", closing_month="November", user_account_id=1, category_id=1,
+            category=category, approved=True, average_rating=4.5, review_count=12,
+            photos=[CampsitePhoto(campsite_photo_id=campsite_id * 2 + n, campsite_id=campsite_id,
+                                  campsite_photo_url=f"https://example.com/{campsite_id}/{n}.jpg") for n in range(2)],
+            contacts=[CampsiteContact(campsite_contact_id=campsite_id, campsite_id=campsite_id,
+                                      campsite_contact_name="Warden", campsite_contact_phone="0123456789")])
+        for campsite_id in range(1, rows + 1)
+    ]
+
+
+def response_model_body(content):
+    return JSONResponse(asyncio.run(serialize_response(field=response_field, response_content=content))).body
+
+
+def adapter_body(campsites):
+    return campsite_list_adapter.dump_json(campsite_list_adapter.validate_python(campsites, from_attributes=True))
+
+
+def fast_response_body(models):
+    return FastJSONResponse(models).body
+
+
+def cpu_ms(serialize, content, repeats):
+    serialize(content)
+    started = time.process_time()
+    for _ in range(repeats):
+        serialize(content)
+    return (time.process_time() - started) / repeats * 1000
+
+
+def run(rows=PAGE_SIZE, repeats=50):
+    campsites = make_page(rows)
+    models = campsite_list_adapter.validate_python(
+        campsites, from_attributes=True)
+    return {
+        "response_model": cpu_ms(response_model_body, campsites, repeats),
+        "adapter": cpu_ms(adapter_body, campsites, repeats),
+        "revalidated": cpu_ms(response_model_body, models, repeats),
+        "fast_response": cpu_ms(fast_response_body, models, repeats),
+    }
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else PAGE_SIZE
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    results = run(rows, repeats)
+    print(f"CPU ms per {rows} row page, mean of {repeats}")
+    for path, ms in results.items():
+        print(f"  {path:<15} {ms:8.2f}")
+    print(f"  saved by adapter        {results['response_model'] - results['adapter']:8.2f}")
+    print(f"  saved by fast_response  {results['revalidated'] - results['fast_response']:8.2f}")
@@ -29,7 +29,26 @@ load_dotenv('.env.passwords')
 
 # Set environment variables for use in prioject
 DATABASE_URL = os.getenv('DATABASE_URL')
+# Optional read replica of DATABASE_URL, GET requests read from it except for
+# READ_YOUR_WRITES_SECONDS after the same client writes (tracked by cookie)
+REPLICA_DATABASE_URL = os.getenv('REPLICA_DATABASE_URL')
+READ_YOUR_WRITES_SECONDS = float(os.getenv('READ_YOUR_WRITES_SECONDS', 5))
 SECRET_KEY = os.getenv('SECRET_KEY')
 ALGORITHM = os.getenv('ALGORITHM')
 PRE_HASHED_USER_PASSWORD = convert_string_env_var_to_bytes(
     'PRE_HASHED_USER_PASSWORD')
+
+# In-process response cache, see api/utils/response_cache.py
+RESPONSE_CACHE_MAX_BYTES = int(
+    os.getenv('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', 60))
+# Smallest JSON body sent gzip/brotli compressed, see api/utils/compression.py
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', 1024))
+
+# Connection pool, set per environment in .env.development / .env.production.
+# Size it to the worker count: each worker process has its own pool.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
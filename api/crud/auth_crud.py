@@ -1,4 +1,6 @@
 from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from datetime import timedelta, datetime, timezone
 from starlette import status
 from jose import jwt
@@ -9,21 +11,18 @@ from api.utils.security.password_utils import hash_password, verify_password
 
 
 def create_user(db, request: CreateUserCredentialsRequest):
-    existing_user = db.query(User_Credentials).filter(
-        User_Credentials.username == request.username).first()
-    if existing_user:
+    # the unique constraint on username catches duplicates, no lookup first
+    try:
+        user_id = db.scalar(insert(User_Credentials).values(
+            username=request.username,
+            hashed_password=hash_password(request.password)
+        ).returning(User_Credentials.user_id))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(status_code=409, detail="Username already exists.")
 
-    new_user = User_Credentials(
-        username=request.username,
-        hashed_password=hash_password(request.password)
-    )
-
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-
-    return {"username": new_user.username, "user_id": new_user.user_id}
+    return {"username": request.username, "user_id": user_id}
 
 
 def create_access_token_on_login(db, form_data):
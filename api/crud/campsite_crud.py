@@ -1,10 +1,61 @@
+import re
 from fastapi import HTTPException
-from sqlalchemy.orm import joinedload
-from api.models.campsite_models import Campsite, CampsitePhoto, CampsiteContact, CampsiteCategory
-from api.models.review_models import Review
+from pydantic import ValidationError
+from sqlalchemy import and_, or_, insert, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload, selectinload, load_only
+from api.models.campsite_models import Campsite, CampsitePhoto, CampsiteContact, CampsiteCategory, campsites_facilities
+from api.models.campsite_card_models import CampsiteCard
+from api.models.facility_models import Facility
+from api.models.activity_models import Activity, CampsiteActivity
 from api.models.user_models import User_Account, User_Credentials
-from schemas.campsite_schemas import CampsiteCreateRequest, CampsiteDetailed
-from utils.update_campsite_average_rating import update_campsite_average_rating
+from pydantic import TypeAdapter
+from schemas.campsite_schemas import CampsiteCreateRequest, CampsiteDetailed, CampsiteNearby
+from api.utils.pagination_cursor import encode_cursor, decode_cursor
+from api.utils.geo_grid import grid_cell_ranges
+from api.utils.month_mask import masks_open_in
+from api.utils.campsite_kd_tree import campsite_kd_tree
+from api.utils.campsite_clusters import campsite_cluster_index
+from api.utils.campsite_autocomplete import campsite_autocomplete
+from api.utils.campsite_trigrams import campsite_trigram_index, SIMILARITY_THRESHOLD
+from api.utils.campsite_facets import campsite_facet_index, cost_range_condition, id_bitmap, MULTI_VALUED_FACETS
+from api.utils.campsite_indexes import index_new_campsite, index_imported_campsites, ensure_index_loaded
+from api.utils.campsite_versions import bump_campsite_versions
+from api.utils.sparse_fields import narrowed_model
+from api.utils.path_ids import parse_path_id, session_dialect
+
+# read functions return validated models or plain data, which routes hand
+# straight to FastJSONResponse without validating them again
+nearby_list_adapter = TypeAdapter(list[CampsiteNearby])
+
+# rows fetched per round trip by the streaming export
+EXPORT_BATCH_SIZE = 500
+# rows inserted per transaction by the bulk import
+IMPORT_CHUNK_SIZE = 1000
+
+# sort key -> (column, descending), campsite_id breaks ties so the order is stable
+CAMPSITE_SORT_KEYS = {
+    "campsite_id": (CampsiteCard.campsite_id, False),
+    "date_added": (CampsiteCard.date_added, True),
+    "rating": (CampsiteCard.average_rating, True),
+}
+
+# CampsiteCreateRequest fields stored on the campsites row itself
+CAMPSITE_IMPORT_COLUMNS = {
+    "user_account_id", "campsite_name", "campsite_longitude", "campsite_latitude",
+    "parking_cost", "facilities_cost", "description", "opening_month",
+    "closing_month", "category_id"
+}
+
+CAMPSITE_RELATIONSHIPS = {
+    "photos": Campsite.photos,
+    "contacts": Campsite.contacts,
+    "category": Campsite.category,
+    "facilities": Campsite.facilities,
+    "activities": Campsite.activities,
+}
+# relationships serialized by the Campsite list schema
+CAMPSITE_LIST_RELATIONSHIPS = ("photos", "contacts", "category")
 
 
 def create_campsite(db, request: CampsiteCreateRequest):
@@ -14,43 +65,24 @@ def create_campsite(db, request: CampsiteCreateRequest):
         raise HTTPException(
             status_code=422, detail="Category ID does not exist!")
 
-    new_campsite = Campsite(
-        user_account_id=request.user_account_id,
-        campsite_name=request.campsite_name,
-        campsite_longitude=request.campsite_longitude,
-        campsite_latitude=request.campsite_latitude,
-        parking_cost=request.parking_cost,
-        facilities_cost=request.facilities_cost,
-        category_id=request.category_id,
-        opening_month=request.opening_month,
-        closing_month=request.closing_month
-    )
-    db.add(new_campsite)
-    db.commit()
-    db.refresh(new_campsite)
-
-    for photo_request in request.photos:
-        new_photo = CampsitePhoto(
-            campsite_photo_url=photo_request.campsite_photo_url,
-            campsite_id=new_campsite.campsite_id
-        )
-        db.add(new_photo)
-    db.commit()
+    facility_ids = {facility.facility_id for facility in request.facilities or []}
+    facilities = db.query(Facility).filter(
+        Facility.facility_id.in_(facility_ids)).all() if facility_ids else []
+    if len(facilities) != len(facility_ids):
+        raise HTTPException(
+            status_code=422, detail="Facility ID does not exist!")
 
-    for contact_request in request.contacts:
-        new_contact = CampsiteContact(
-            campsite_contact_name=contact_request.campsite_contact_name,
-            campsite_contact_phone=contact_request.campsite_contact_phone,
-            campsite_contact_email=contact_request.campsite_contact_email,
-            campsite_id=new_campsite.campsite_id
-        )
-        db.add(new_contact)
-    db.commit()
+    activity_ids = {activity.activity_id for activity in request.activities or []}
+    activities = db.query(Activity).filter(
+        Activity.activity_id.in_(activity_ids)).all() if activity_ids else []
+    if len(activities) != len(activity_ids):
+        raise HTTPException(
+            status_code=422, detail="Activity ID does not exist!")
 
     username = db.query(User_Credentials.username).join(
         User_Account, User_Account.user_id == User_Credentials.user_id
     ).filter(
-        User_Account.user_account_id == new_campsite.user_account_id
+        User_Account.user_account_id == request.user_account_id
     ).first()
 
     if not username:
@@ -58,7 +90,32 @@ def create_campsite(db, request: CampsiteCreateRequest):
             status_code=404, detail="Username not found for this campsite."
         )
 
-    db.refresh(new_campsite)
+    # one flush and commit for the campsite and everything hanging off it,
+    # generated ids come back through INSERT ... RETURNING
+    new_campsite = Campsite(
+        user_account_id=request.user_account_id,
+        campsite_name=request.campsite_name,
+        campsite_longitude=request.campsite_longitude,
+        campsite_latitude=request.campsite_latitude,
+        parking_cost=request.parking_cost,
+        facilities_cost=request.facilities_cost,
+        category_id=request.category_id,
+        opening_month=request.opening_month,
+        closing_month=request.closing_month,
+        photos=[CampsitePhoto(campsite_photo_url=photo_request.campsite_photo_url)
+                for photo_request in request.photos or []],
+        contacts=[CampsiteContact(
+            campsite_contact_name=contact_request.campsite_contact_name,
+            campsite_contact_phone=contact_request.campsite_contact_phone,
+            campsite_contact_email=contact_request.campsite_contact_email
+        ) for contact_request in request.contacts or []],
+        facilities=facilities,
+        activities=activities
+    )
+    db.add(new_campsite)
+    version = bump_campsite_versions(db)
+    db.commit()
+    index_new_campsite(new_campsite, version)
 
     campsite_data = CampsiteDetailed.model_validate({
         "campsite_name": new_campsite.campsite_name,
@@ -78,6 +135,8 @@ def create_campsite(db, request: CampsiteCreateRequest):
         "facilities_cost": new_campsite.facilities_cost,
         "opening_month": new_campsite.opening_month,
         "closing_month": new_campsite.closing_month,
+        "facilities": new_campsite.facilities,
+        "activities": new_campsite.activities,
         "approved": False,
         "username": username[0]
     })
@@ -85,37 +144,392 @@ def create_campsite(db, request: CampsiteCreateRequest):
     return campsite_data
 
 
+def import_campsites(db, rows, chunk_size: int = IMPORT_CHUNK_SIZE):
+    # rows: (row number, campsite dict or None, errors or None), see
+    # api/utils/campsite_import.py. Valid rows are inserted chunk by chunk,
+    # invalid rows and failed chunks are reported by row number.
+    known_ids = {
+        "category": set(db.scalars(select(CampsiteCategory.category_id))),
+        "facility": set(db.scalars(select(Facility.facility_id))),
+        "activity": set(db.scalars(select(Activity.activity_id))),
+        # as in create_campsite, the account must have a username
+        "user_account": set(db.scalars(select(User_Account.user_account_id).join(
+            User_Credentials, User_Account.user_id == User_Credentials.user_id))),
+    }
+    report = {"imported": 0, "campsite_ids": [], "errors": []}
+    chunk = []
+
+    for row_number, data, errors in rows:
+        if not errors:
+            try:
+                request = CampsiteCreateRequest.model_validate(data)
+                errors = campsite_reference_errors(request, known_ids)
+            except ValidationError as exc:
+                errors = [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                          for error in exc.errors()]
+        if errors:
+            report["errors"].append({"row": row_number, "errors": errors})
+            continue
+        chunk.append((row_number, request))
+        if len(chunk) == chunk_size:
+            insert_campsite_chunk(db, chunk, report)
+            chunk = []
+    if chunk:
+        insert_campsite_chunk(db, chunk, report)
+
+    if report["campsite_ids"]:
+        index_imported_campsites()
+    return report
+
+
+def campsite_reference_errors(request, known_ids):
+    errors = []
+    if request.user_account_id not in known_ids["user_account"]:
+        errors.append("user_account_id: Username not found for this campsite.")
+    if request.category_id not in known_ids["category"]:
+        errors.append("category_id: Category ID does not exist!")
+    for facility in request.facilities or []:
+        if facility.facility_id not in known_ids["facility"]:
+            errors.append(
+                f"facilities: Facility ID {facility.facility_id} does not exist!")
+    for activity in request.activities or []:
+        if activity.activity_id not in known_ids["activity"]:
+            errors.append(
+                f"activities: Activity ID {activity.activity_id} does not exist!")
+    return errors
+
+
+def insert_campsite_chunk(db, chunk, report):
+    # one transaction and one multi-row INSERT per table for the whole chunk
+    requests = [request for _, request in chunk]
+    try:
+        campsite_ids = db.scalars(
+            insert(Campsite).returning(
+                Campsite.campsite_id, sort_by_parameter_order=True),
+            [request.model_dump(include=CAMPSITE_IMPORT_COLUMNS) for request in requests]
+        ).all()
+        related_rows = [
+            (CampsitePhoto, [{"campsite_id": campsite_id, **photo.model_dump()}
+                             for campsite_id, request in zip(campsite_ids, requests) for photo in request.photos or []]),
+            (CampsiteContact, [{"campsite_id": campsite_id, **contact.model_dump()}
+                               for campsite_id, request in zip(campsite_ids, requests) for contact in request.contacts or []]),
+            (campsites_facilities, [{"campsite_id": campsite_id, "facility_id": facility.facility_id}
+                                    for campsite_id, request in zip(campsite_ids, requests) for facility in request.facilities or []]),
+            (CampsiteActivity, [{"campsite_id": campsite_id, "activity_id": activity.activity_id}
+                                for campsite_id, request in zip(campsite_ids, requests) for activity in request.activities or []]),
+        ]
+        for table, values in related_rows:
+            if values:
+                db.execute(insert(table), values)
+        bump_campsite_versions(db)
+        db.commit()
+    except SQLAlchemyError as exc:
+        db.rollback()
+        report["errors"].extend({"row": row_number, "errors": [f"Chunk not imported: {exc.__class__.__name__}"]}
+                                for row_number, _ in chunk)
+        return
+
+    report["imported"] += len(campsite_ids)
+    report["campsite_ids"].extend(campsite_ids)
+
+
+def campsite_loader_options(relationships=CAMPSITE_LIST_RELATIONSHIPS):
+    # Eager loads for serializing lists of campsites: selectin for the
+    # collections and a join for the category, so a page costs the same
+    # handful of queries however many campsites it holds
+    options = []
+    for field in relationships:
+        relationship = CAMPSITE_RELATIONSHIPS[field]
+        options.append(joinedload(relationship) if field ==
+                       "category" else selectinload(relationship))
+    return options
+
+
+def campsite_field_options(fields, *required_columns):
+    # SELECTs only the requested columns and loads only the requested relationships
+    columns = [getattr(Campsite, field)
+               for field in fields if field in Campsite.__table__.columns]
+    return [load_only(Campsite.campsite_id, *required_columns, *columns),
+            *campsite_loader_options([field for field in fields if field in CAMPSITE_RELATIONSHIPS])]
+
+
+def card_field_options(fields, *required_columns):
+    # SELECTs only the requested card columns
+    return [load_only(CampsiteCard.campsite_id, *required_columns,
+                      *(getattr(CampsiteCard, field) for field in fields))]
 
 
+# The filters below take the model they filter, Campsite or CampsiteCard,
+# which share their column names.
 
-def read_campsites(db, skip: int = 0, limit: int = 250):
-    campsites = db.query(Campsite).limit(limit).all()
-    for campsite in campsites:
-        update_campsite_average_rating(
-            db, campsite.campsite_id, Campsite, Review)
+def filter_campsites_in_bbox(query, bbox, model=Campsite):
+    min_lon, min_lat, max_lon, max_lat = bbox
+    # the indexed grid ranges narrow the scan, the exact comparisons trim cell edges
+    query = query.filter(or_(*(
+        model.grid_cell.between(start, end) for start, end in grid_cell_ranges(*bbox)
+    ))).filter(model.campsite_latitude.between(min_lat, max_lat))
 
-    return campsites
+    if min_lon <= max_lon:
+        return query.filter(model.campsite_longitude.between(min_lon, max_lon))
+    return query.filter(or_(model.campsite_longitude >= min_lon,
+                            model.campsite_longitude <= max_lon))
 
-def read_campsite_by_id(db, id: int):
-    result = db.query(Campsite, User_Credentials.username
+
+def filter_campsites_open_in(query, month, model=Campsite):
+    return query.filter(model.open_months.in_(masks_open_in(month)))
+
+
+# facet -> (link table campsite_id, linked id), indexed on (linked id, campsite_id)
+FACET_LINK_COLUMNS = {
+    "facility_id": (campsites_facilities.c.campsite_id, campsites_facilities.c.facility_id),
+    "activity_id": (CampsiteActivity.campsite_id, CampsiteActivity.activity_id),
+}
+
+
+def filter_campsites_by_facets(query, facets, model=Campsite):
+    # same semantics as CampsiteFacetIndex.matching: any requested category,
+    # cost range or approval state, but every requested facility and activity
+    if facets.get("category_id"):
+        query = query.filter(model.category_id.in_(facets["category_id"]))
+    for facet in MULTI_VALUED_FACETS:
+        campsite_id, linked_id = FACET_LINK_COLUMNS[facet]
+        # one semi-join per id, each a range of the link table's index
+        for facet_id in facets.get(facet) or []:
+            query = query.filter(model.campsite_id.in_(
+                select(campsite_id).where(linked_id == facet_id)))
+    for column in ("parking_cost", "facilities_cost"):
+        if facets.get(column):
+            query = query.filter(or_(*(cost_range_condition(getattr(model, column), name)
+                                       for name in facets[column])))
+    if facets.get("approved"):
+        query = query.filter(model.approved.in_(facets["approved"]))
+    return query
+
+
+def read_campsite_facet_counts(db, facets: dict | None = None, bbox: tuple | None = None, open_in: list[int] | None = None):
+    # the bbox and month filters aren't facets, the campsites they match come
+    # from the same indexed card columns the list filters on
+    within = None
+    if bbox or open_in:
+        query = select(CampsiteCard.campsite_id)
+        if bbox:
+            query = filter_campsites_in_bbox(query, bbox, CampsiteCard)
+        for month in open_in or []:
+            query = filter_campsites_open_in(query, month, CampsiteCard)
+        within = id_bitmap(db.scalars(query))
+    ensure_index_loaded(db, campsite_facet_index)
+    return campsite_facet_index.counts(facets, within)
+
+
+def campsite_list_query(skip: int = 0, limit: int = 250, cursor: str | None = None, sort_by: str = "campsite_id", bbox: tuple | None = None, fields: tuple | None = None, facets: dict | None = None, open_in: list[int] | None = None):
+    # The SELECT behind read_campsites_async, a single table scan of the
+    # campsite cards
+    sort_column, descending = CAMPSITE_SORT_KEYS[sort_by]
+    query = select(CampsiteCard)
+
+    if fields:
+        query = query.options(*card_field_options(fields, sort_column))
+
+    if bbox:
+        query = filter_campsites_in_bbox(query, bbox, CampsiteCard)
+
+    if facets:
+        query = filter_campsites_by_facets(query, facets, CampsiteCard)
+
+    for month in open_in or []:
+        query = filter_campsites_open_in(query, month, CampsiteCard)
+
+    if cursor:
+        sort_value, last_campsite_id = decode_cursor(cursor, sort_by)
+        if sort_by == "campsite_id":
+            query = query.filter(CampsiteCard.campsite_id > last_campsite_id)
+        else:
+            past_sort_value = sort_column < sort_value if descending else sort_column > sort_value
+            query = query.filter(or_(
+                past_sort_value,
+                and_(sort_column == sort_value,
+                     CampsiteCard.campsite_id > last_campsite_id)
+            ))
+
+    if sort_by == "campsite_id":
+        query = query.order_by(CampsiteCard.campsite_id)
+    else:
+        query = query.order_by(
+            sort_column.desc() if descending else sort_column, CampsiteCard.campsite_id)
+
+    # one extra row tells us whether there is a next page without a COUNT
+    return query.offset(skip).limit(limit + 1)
+
+
+def campsite_page(campsites, limit: int, sort_by: str):
+    # -> (campsites, next_cursor) from the limit + 1 rows of campsite_list_query
+    next_cursor = None
+    if len(campsites) > limit:
+        sort_column = CAMPSITE_SORT_KEYS[sort_by][0]
+        campsites = campsites[:limit]
+        last_campsite = campsites[-1]
+        next_cursor = encode_cursor(
+            sort_by, getattr(last_campsite, sort_column.key), last_campsite.campsite_id)
+
+    return campsites, next_cursor
+
+
+async def read_campsites_async(db, skip: int = 0, limit: int = 250, cursor: str | None = None, sort_by: str = "campsite_id", bbox: tuple | None = None, fields: tuple | None = None, facets: dict | None = None, open_in: list[int] | None = None):
+    query = campsite_list_query(skip=skip, limit=limit, cursor=cursor, sort_by=sort_by,
+                                bbox=bbox, fields=fields, facets=facets, open_in=open_in)
+    return campsite_page((await db.scalars(query)).all(), limit, sort_by)
+
+
+def stream_campsites(db, batch_size: int = EXPORT_BATCH_SIZE):
+    # Yields every campsite in batches. yield_per reads through a server side
+    # cursor where the driver has one, the collections are selectin loaded per
+    # batch and each batch is expunged once consumed, so memory stays flat.
+    query = select(Campsite).options(
+        *campsite_loader_options()
+    ).order_by(Campsite.campsite_id).execution_options(yield_per=batch_size)
+    for campsites in db.execute(query).scalars().partitions():
+        yield campsites
+        for campsite in campsites:
+            db.expunge(campsite)
+
+
+def read_campsites_by_ids(db, campsite_ids):
+    # one batched query, returned in the order of campsite_ids
+    campsites = db.query(Campsite).options(
+        *campsite_loader_options()
+    ).filter(
+        Campsite.campsite_id.in_(campsite_ids)
+    ).all()
+    campsites_by_id = {campsite.campsite_id: campsite for campsite in campsites}
+    return [campsites_by_id[campsite_id] for campsite_id in campsite_ids if campsite_id in campsites_by_id]
+
+
+def read_campsite_name_suggestions(db, prefix: str, limit: int = 10):
+    ensure_index_loaded(db, campsite_autocomplete)
+    return campsite_autocomplete.suggest(prefix, limit)
+
+
+def read_nearby_campsites(db, latitude: float, longitude: float, k: int = 10):
+    ensure_index_loaded(db, campsite_kd_tree)
+    nearest = campsite_kd_tree.nearest(latitude, longitude, k)
+    if not nearest:
+        return []
+
+    distances = dict(nearest)
+    nearby_campsites = []
+    for campsite in read_campsites_by_ids(db, [campsite_id for campsite_id, _ in nearest]):
+        campsite_dict = campsite.__dict__.copy()
+        campsite_dict['distance_km'] = distances[campsite.campsite_id]
+        nearby_campsites.append(campsite_dict)
+    return nearby_list_adapter.validate_python(nearby_campsites)
+
+
+def search_campsites(db, q: str, skip: int = 0, limit: int = 20):
+    # every search term must match, as a prefix, in the name or description
+    terms = re.findall(r"\w+", q.lower())
+    if not terms:
+        return []
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        # bm25 is lower-is-better, name matches weigh ten times description matches
+        rows = db.execute(text(
+            "SELECT rowid FROM campsites_fts WHERE campsites_fts MATCH :match "
+            "ORDER BY bm25(campsites_fts, 10.0, 1.0), rowid LIMIT :limit OFFSET :skip"
+        ), {"match": " ".join(f'"{term}"*' for term in terms), "limit": limit, "skip": skip}).all()
+    elif dialect == "postgresql":
+        rows = db.execute(text(
+            "SELECT campsite_id FROM campsites, to_tsquery('english', :match) query "
+            "WHERE search_vector @@ query "
+            "ORDER BY ts_rank_cd(search_vector, query) DESC, campsite_id LIMIT :limit OFFSET :skip"
+        ), {"match": " & ".join(f"{term}:*" for term in terms), "limit": limit, "skip": skip}).all()
+    else:
+        raise HTTPException(
+            status_code=501, detail="501 - Search Not Supported By This Database")
+
+    return read_campsites_by_ids(db, [row[0] for row in rows])
+
+
+def fuzzy_search_campsites(db, q: str, skip: int = 0, limit: int = 20):
+    # typo tolerant name match ranked by trigram similarity
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        ensure_index_loaded(db, campsite_trigram_index)
+        matches = campsite_trigram_index.search(q)[skip:skip + limit]
+        campsite_ids = [campsite_id for campsite_id, _ in matches]
+    elif dialect == "postgresql":
+        # set_limit drives the index-backed % operator
+        db.execute(text("SELECT set_limit(:threshold)"),
+                   {"threshold": SIMILARITY_THRESHOLD})
+        rows = db.execute(text(
+            "SELECT campsite_id FROM campsites WHERE campsite_name % :q "
+            "ORDER BY similarity(campsite_name, :q) DESC, campsite_id LIMIT :limit OFFSET :skip"
+        ), {"q": q, "limit": limit, "skip": skip}).all()
+        campsite_ids = [row[0] for row in rows]
+    else:
+        raise HTTPException(
+            status_code=501, detail="501 - Search Not Supported By This Database")
+
+    return read_campsites_by_ids(db, campsite_ids)
+
+
+def read_campsite_markers(db, bbox: tuple | None = None):
+    # plain column select, no ORM entities or relationship loads
+    query = select(
+        Campsite.campsite_id,
+        Campsite.campsite_latitude,
+        Campsite.campsite_longitude,
+        Campsite.category_id,
+        Campsite.average_rating
+    ).order_by(Campsite.campsite_id)
+    if bbox:
+        query = filter_campsites_in_bbox(query, bbox)
+    return db.execute(query).all()
+
+
+def read_campsite_clusters(db, zoom: int, bbox: tuple | None = None):
+    ensure_index_loaded(db, campsite_cluster_index)
+    return campsite_cluster_index.clusters(zoom, bbox)
+
+
+def campsite_detail_query(id: int, fields: tuple | None = None):
+    if fields:
+        loader_options = campsite_field_options(fields)
+    else:
+        loader_options = [
+            joinedload(Campsite.photos),
+            joinedload(Campsite.contacts),
+            joinedload(Campsite.category),
+            selectinload(Campsite.facilities),
+            selectinload(Campsite.activities)
+        ]
+
+    return select(Campsite, User_Credentials.username
     ).join(
         User_Account, User_Account.user_account_id == Campsite.user_account_id
     ).join(
         User_Credentials, User_Credentials.user_id == User_Account.user_id
     ).options(
-        joinedload(Campsite.photos),
-        joinedload(Campsite.contacts),
-        joinedload(Campsite.category)
+        *loader_options
     ).filter(
         Campsite.campsite_id == id
-    ).first()
+    )
 
+
+def campsite_detail(result, fields: tuple | None = None):
     if not result:
         raise HTTPException(status_code=404, detail="404 - Campsite Not Found!")
 
     campsite, username = result
     campsite_dict = campsite.__dict__.copy()
     campsite_dict['username'] = username
-    campsite_data = CampsiteDetailed.model_validate(campsite_dict)
+    response_model = narrowed_model(
+        CampsiteDetailed, fields) if fields else CampsiteDetailed
+    campsite_data = response_model.model_validate(campsite_dict)
 
     return campsite_data
+
+
+async def read_campsite_by_id_async(db, id: int, fields: tuple | None = None):
+    result = (await db.execute(campsite_detail_query(parse_path_id(id, session_dialect(db)), fields))).unique().first()
+    return campsite_detail(result, fields)
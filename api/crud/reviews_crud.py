@@ -1,38 +1,49 @@
 from fastapi import HTTPException
+from sqlalchemy import delete, select
 from api.models.review_models import Review
 from api.models.campsite_models import Campsite
 from api.models.user_models import User_Account, User_Credentials
 from api.schemas.review_schemas import ReviewPostRequest, ReviewPatchRequest
-from api.utils.update_campsite_average_rating import update_campsite_average_rating
+from api.utils.campsite_rating_aggregates import apply_campsite_rating_change
+from api.utils.campsite_indexes import index_campsite_review_change
+from api.utils.campsite_versions import bump_campsite_versions
+from api.utils.path_ids import parse_path_id, session_dialect
 
 
 def create_review_by_campsite_id(db, campsite_id, request: ReviewPostRequest):
-    campsite = db.get(Campsite, campsite_id)
-    if not campsite:
+    # "01" and "1" are the same campsite, and must invalidate the same cache tags
+    campsite_id = parse_path_id(campsite_id, session_dialect(db))
+    # the aggregate UPDATE doubles as the campsite existence check
+    average_rating = apply_campsite_rating_change(
+        db, campsite_id, added_rating=request.rating)
+    if average_rating is None:
+        db.rollback()
         raise HTTPException(
             status_code=404, detail="404 - Campsite Not Found!")
 
-    new_review = Review(
-        rating=request.rating,
-        comment=request.comment,
-        campsite_id=campsite_id,
-        user_account_id=request.user_account_id
-    )
-    db.add(new_review)
-    db.commit()
-    db.refresh(new_review)
-
     username = db.query(User_Credentials.username).join(
         User_Account, User_Account.user_id == User_Credentials.user_id
     ).filter(
-        User_Account.user_account_id == new_review.user_account_id
+        User_Account.user_account_id == request.user_account_id
     ).first()
 
     if not username:
+        db.rollback()
         raise HTTPException(
             status_code=404, detail="Username not found for this review."
         )
 
+    new_review = Review(
+        rating=request.rating,
+        comment=request.comment,
+        campsite_id=campsite_id,
+        user_account_id=request.user_account_id
+    )
+    db.add(new_review)
+    version = bump_campsite_versions(db, campsite_id)
+    db.commit()
+    index_campsite_review_change(campsite_id, version, average_rating)
+
     review_data = {
         "review_id": new_review.review_id,
         "campsite_id": campsite_id,
@@ -45,8 +56,8 @@ def create_review_by_campsite_id(db, campsite_id, request: ReviewPostRequest):
     return review_data
 
 
-def read_reviews_by_campsite_id(db, id: int):
-    reviews = db.query(
+def review_list_query(id: int):
+    return select(
         Review,
         User_Credentials.username
     ).join(
@@ -55,8 +66,10 @@ def read_reviews_by_campsite_id(db, id: int):
         User_Credentials, User_Credentials.user_id == User_Account.user_id
     ).filter(
         Review.campsite_id == id
-    ).all()
+    )
 
+
+def reviews_with_usernames(reviews):
     reviews_with_username = []
     for review, username in reviews:
         review_data = review.__dict__
@@ -67,8 +80,15 @@ def read_reviews_by_campsite_id(db, id: int):
     return reviews_with_username
 
 
+async def read_reviews_by_campsite_id_async(db, id: int):
+    return reviews_with_usernames((await db.execute(review_list_query(parse_path_id(id, session_dialect(db))))).all())
+
+
 def update_review_by_review_id(db, campsite_id: int, review_id: int, request: ReviewPatchRequest):
-    review = db.get(Review, review_id)
+    # locked until commit, so a concurrent patch or delete of the review waits
+    # and then sees this one's rating rather than subtracting the same one
+    review = db.scalars(select(Review).where(Review.review_id == review_id).with_for_update(
+    ).execution_options(populate_existing=True)).first()
     if not review:
         raise HTTPException(
             status_code=404, detail="404 - Review Not Found!")
@@ -78,21 +98,44 @@ def update_review_by_review_id(db, campsite_id: int, review_id: int, request: Re
         raise HTTPException(
             status_code=404, detail="404 - Campsite Not Found!")
 
-    if request.rating:
+    average_rating = None
+    if request.rating and request.rating != review.rating:
+        average_rating = apply_campsite_rating_change(
+            db, review.campsite_id, added_rating=request.rating, removed_rating=review.rating)
         review.rating = request.rating
-        update_campsite_average_rating(db, campsite_id, Campsite, Review)
-        db.commit()
     if request.comment:
         review.comment = request.comment
-        db.commit()
-    db.refresh(review)
-    return review
+    version = bump_campsite_versions(db, review.campsite_id)
+    db.commit()
+    index_campsite_review_change(review.campsite_id, version, average_rating)
+
+    username = db.query(User_Credentials.username).join(
+        User_Account, User_Account.user_id == User_Credentials.user_id
+    ).filter(
+        User_Account.user_account_id == review.user_account_id
+    ).scalar()
+
+    return {
+        "review_id": review.review_id,
+        "campsite_id": review.campsite_id,
+        "rating": review.rating,
+        "comment": review.comment,
+        "user_account_id": review.user_account_id,
+        "username": username,
+    }
 
 
 def remove_review_by_review_id(db, review_id: int):
-    review = db.get(Review, review_id)
+    # the rating removed from the aggregates is the one the DELETE actually
+    # removed, a concurrent delete of the same review finds nothing
+    review = db.execute(delete(Review).where(Review.review_id == review_id).returning(
+        Review.campsite_id, Review.rating)).first()
     if not review:
         raise HTTPException(
             status_code=404, detail="404 - Review Not Found!")
-    db.delete(review)
+    campsite_id = review.campsite_id
+    average_rating = apply_campsite_rating_change(
+        db, campsite_id, removed_rating=review.rating)
+    version = bump_campsite_versions(db, campsite_id)
     db.commit()
+    index_campsite_review_change(campsite_id, version, average_rating)
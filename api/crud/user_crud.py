@@ -1,6 +1,11 @@
 from fastapi import HTTPException
+from sqlalchemy import select, update
 from api.models.user_models import User_Account, user_campsite_favourites
 from api.models.campsite_models import Campsite
+from api.models.campsite_card_models import CampsiteCard
+from api.utils.campsite_indexes import index_user_favourites_change
+from api.utils.path_ids import parse_path_id, session_dialect
+from api.crud.campsite_crud import card_field_options
 
 # DISABLED PENDING AMDMINISTRATION LEVEL RESTRICTION
 # def read_users(db):
@@ -18,12 +23,6 @@ def read_user_account_by_user_id(db, user_id):
 
 
 def update_user_xp(db, user_id, xp):
-    user_account = db.query(User_Account).filter(
-        User_Account.user_id == user_id).first()
-    if not user_account:
-        raise HTTPException(
-            status_code=404, detail="404 - User Account Not Found!")
-
     try:
         if xp.startswith('-'):
             xp_value = -int(xp[1:])
@@ -32,9 +31,16 @@ def update_user_xp(db, user_id, xp):
     except ValueError:
         raise HTTPException(status_code=400, detail="400 - Invalid XP Value")
 
-    user_account.xp += xp_value
+    # increment in the database and read the row back in the same statement
+    user_account = db.scalars(
+        update(User_Account).where(User_Account.user_id == user_id).values(
+            xp=User_Account.xp + xp_value).returning(User_Account)
+    ).first()
+    if not user_account:
+        db.rollback()
+        raise HTTPException(
+            status_code=404, detail="404 - User Account Not Found!")
     db.commit()
-    db.refresh(user_account)
     return user_account
 
 
@@ -52,16 +58,29 @@ def create_user_favourite_campsite(db, user_id, campsite_id):
     if campsite_id not in user.favourites:
         user.favourites.append(campsite)
         db.commit()
+        index_user_favourites_change(user.user_id)
     return
 
 
-def read_user_campsite_favourites_by_user_id(db, user_id: str):
-    user_account = db.query(User_Account).filter(
-        User_Account.user_id == user_id).first()
+def favourite_campsites_query(user_account, fields: tuple | None = None):
     if not user_account:
         raise HTTPException(
             status_code=404, detail="404 - User Account Not Found!")
-    return user_account.favourites
+    loader_options = card_field_options(fields) if fields else []
+
+    return select(CampsiteCard).join(
+        user_campsite_favourites, user_campsite_favourites.c.campsite_id == CampsiteCard.campsite_id
+    ).filter(
+        user_campsite_favourites.c.user_account_id == user_account.user_account_id
+    ).options(
+        *loader_options
+    ).order_by(CampsiteCard.campsite_id)
+
+
+async def read_user_campsite_favourites_by_user_id_async(db, user_id: str, fields: tuple | None = None):
+    user_account = (await db.scalars(select(User_Account).filter(
+        User_Account.user_id == parse_path_id(user_id, session_dialect(db))))).first()
+    return (await db.scalars(favourite_campsites_query(user_account, fields))).all()
 
 
 def remove_user_favourite_campsite(db, user_id, campsite_id):
@@ -79,6 +98,7 @@ def remove_user_favourite_campsite(db, user_id, campsite_id):
     if campsite in user_account.favourites:
         user_account.favourites.remove(campsite)
         db.commit()
+        index_user_favourites_change(user_account.user_id)
         return {"message": f"Campsite {campsite.campsite_id} removed from favourites."}
     else:
         raise HTTPException(
@@ -1,6 +1,6 @@
 from datetime import datetime
 from api.models.campsite_models import Campsite, CampsitePhoto, CampsiteContact, CampsiteCategory
-from api.models.activity_models import Activity
+from api.models.activity_models import Activity, CampsiteActivity
 from api.models.facility_models import Facility
 from api.models.review_models import Review
 from api.models.user_models import User_Credentials, User_Account
@@ -76,5 +76,11 @@ def get_test_data():
         ],
         'user_campsite_favourites': [
             [1, 3], [1, 1]
+        ],
+        'campsite_facilities': [
+            [1, 1], [1, 2], [3, 2]
+        ],
+        'campsite_activity': [
+            CampsiteActivity(campsite_id=3, activity_id=2)
         ]
     }
@@ -1,11 +1,57 @@
 from sqlalchemy import create_engine, MetaData, text
 from sqlalchemy.orm import sessionmaker, declarative_base
-from config.config import DATABASE_URL
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from config.config import DATABASE_URL, REPLICA_DATABASE_URL
+from database.database_utils.instrumented_pool import pool_options
+
+# sync driver -> async driver, for the engine behind the async read routes
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url):
+    # "postgresql+psycopg2://..." -> "postgresql+asyncpg://...", URLs that
+    # already name an async driver are left alone
+    scheme, separator, rest = url.partition("://")
+    backend, _, driver = scheme.partition("+")
+    if driver in ("aiosqlite", "asyncpg") or backend not in ASYNC_DRIVERS:
+        return url
+    return ASYNC_DRIVERS[backend] + separator + rest
 
 
 Base = declarative_base()
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL))
+# objects stay loaded after commit, so write paths can answer from what they
+# just wrote instead of refreshing it with another SELECT
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Async routes hold a pooled connection only while awaiting the database, so
+# concurrent reads are bounded by the pool rather than the threadpool that
+# runs sync routes. expire_on_commit is off here too, an expired attribute
+# would need an implicit load, which an AsyncSession cannot do.
+async_engine = create_async_engine(
+    async_database_url(DATABASE_URL), **pool_options(DATABASE_URL, asynchronous=True))
+AsyncSessionLocal = async_sessionmaker(
+    autoflush=False, expire_on_commit=False, bind=async_engine)
+
+# Read-only requests use these, see database_utils/replica_routing.py. Without
+# a replica they are the primary's engines.
+if REPLICA_DATABASE_URL:
+    replica_engine = create_engine(
+        REPLICA_DATABASE_URL, **pool_options(REPLICA_DATABASE_URL))
+    async_replica_engine = create_async_engine(
+        async_database_url(REPLICA_DATABASE_URL), **pool_options(REPLICA_DATABASE_URL, asynchronous=True))
+else:
+    replica_engine = engine
+    async_replica_engine = async_engine
+ReplicaSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=replica_engine)
+AsyncReplicaSessionLocal = async_sessionmaker(
+    autoflush=False, expire_on_commit=False, bind=async_replica_engine)
 
 
 def init_db():
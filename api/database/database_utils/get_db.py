@@ -1,9 +1,26 @@
-from database.database import SessionLocal
+from fastapi import Request
+from database.database import SessionLocal, AsyncSessionLocal, ReplicaSessionLocal, AsyncReplicaSessionLocal
+from database.database_utils.replica_routing import reads_from_replica, PRIMARY_SESSION_FACTORY
 
 
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    # GET requests read from the replica, writes and a writer's next reads
+    # use the primary
+    if reads_from_replica(request):
+        db = ReplicaSessionLocal(info={PRIMARY_SESSION_FACTORY: SessionLocal})
+    else:
+        db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db(request: Request):
+    if reads_from_replica(request):
+        db = AsyncReplicaSessionLocal(
+            info={PRIMARY_SESSION_FACTORY: AsyncSessionLocal})
+    else:
+        db = AsyncSessionLocal()
+    async with db:
+        yield db
@@ -0,0 +1,91 @@
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from config.config import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING
+
+
+class CheckoutTimingMixin:
+    # Times every checkout from the pool: the wait for a free connection, plus
+    # the connect itself when the pool opens a new one. A rising wait means
+    # requests are queueing for connections and the pool is too small.
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._timing_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with self._timing_lock:
+                self.timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        with self._timing_lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return connection
+
+    def metrics(self):
+        with self._timing_lock:
+            checkouts, timeouts = self.checkouts, self.timeouts
+            wait_total, wait_max = self.wait_seconds_total, self.wait_seconds_max
+        return {
+            "pool_size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            # overflow() counts up from -pool_size, only positive values are
+            # connections opened beyond the pool size
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_seconds_total": wait_total,
+            "wait_seconds_max": wait_max,
+            "wait_seconds_mean": wait_total / checkouts if checkouts else 0.0,
+        }
+
+
+class InstrumentedQueuePool(CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def is_memory_database(url):
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory")
+
+
+def pool_options(url, asynchronous=False):
+    # create_engine keyword arguments for DATABASE_URL. An in-memory SQLite
+    # database lives and dies with its connection, so it keeps SQLAlchemy's
+    # single connection pool and gets no sizing.
+    if is_memory_database(url):
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if asynchronous else InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def pool_metrics(engine):
+    pool = engine.pool
+    if isinstance(pool, CheckoutTimingMixin):
+        return pool.metrics()
+    return {"status": pool.status()}
@@ -0,0 +1,54 @@
+import math
+import time
+from contextlib import asynccontextmanager, contextmanager
+from config.config import REPLICA_DATABASE_URL, READ_YOUR_WRITES_SECONDS
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Set on a client's responses to its writes. Its reads go to the primary until
+# the replica has had time to catch up, whichever worker serves them.
+LAST_WRITE_COOKIE = "last_write"
+
+# Session.info key of the primary's session factory, set on replica sessions
+PRIMARY_SESSION_FACTORY = "primary_session_factory"
+
+
+def wrote_recently(request, window_seconds=READ_YOUR_WRITES_SECONDS, clock=time.time):
+    try:
+        last_write = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        return False
+    return clock() - last_write < window_seconds
+
+
+def reads_from_replica(request, replica_configured=bool(REPLICA_DATABASE_URL)):
+    return (replica_configured and request.method in READ_METHODS
+            and not wrote_recently(request))
+
+
+def record_write(request, response, replica_configured=bool(REPLICA_DATABASE_URL),
+                 window_seconds=READ_YOUR_WRITES_SECONDS, clock=time.time):
+    if replica_configured and request.method not in READ_METHODS:
+        response.set_cookie(LAST_WRITE_COOKIE, f"{clock():.3f}", max_age=math.ceil(window_seconds),
+                            httponly=True, samesite="lax")
+
+
+@contextmanager
+def primary_session(db):
+    # db, or a session on the primary when db reads from the replica
+    session_factory = db.info.get(PRIMARY_SESSION_FACTORY)
+    if session_factory is None:
+        yield db
+        return
+    with session_factory() as primary:
+        yield primary
+
+
+@asynccontextmanager
+async def async_primary_session(db):
+    session_factory = db.info.get(PRIMARY_SESSION_FACTORY)
+    if session_factory is None:
+        yield db
+        return
+    async with session_factory() as primary:
+        yield primary
@@ -13,7 +13,9 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     formatted_errors = []
 
     for error in errors:
-        error_location = error['loc'][-1].capitalize()
+        # list items end their loc with an index, name the field instead
+        error_location = next(part for part in reversed(
+            error['loc']) if isinstance(part, str)).capitalize()
         trimmed_default_error_message = ' '.join(error['msg'].split(' ')[1:])
         user_readable_error_message = f"{error_location} {trimmed_default_error_message}"
         formatted_errors.append({
@@ -1,14 +1,18 @@
 import uvicorn
 from os import getenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError, HTTPException
 from sqlalchemy.exc import SQLAlchemyError
 from starlette import status
 
-from database.database import engine, Base
+from database.database import engine, async_engine, replica_engine, async_replica_engine, Base
+from database.database_utils.instrumented_pool import pool_metrics
 from database.database_utils.get_db import get_db
+from database.database_utils.replica_routing import record_write
+from config.config import REPLICA_DATABASE_URL
 
+from api.utils.fast_json import FastJSONResponse
 from api.errors.error_handling import (
     validation_exception_handler, attribute_error_handler,  http_exception_handler, sqlalchemy_exception_handler)
 
@@ -18,7 +22,7 @@ import api.routes.users as users_route
 
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # CORS
 origins = [
@@ -29,9 +33,25 @@ app.add_middleware(
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"]
 )
 
+
+async def remember_writes(request: Request, call_next):
+    # the last write time travels with the client, so read-your-writes holds
+    # across workers
+    response = await call_next(request)
+    record_write(request, response)
+    return response
+
+
+# without a replica every read goes to the primary, so there is nothing to
+# remember and no reason to wrap every request
+if REPLICA_DATABASE_URL:
+    app.middleware("http")(remember_writes)
+
+
 app.include_router(auth_route.router)
 app.include_router(campsites_route.router)
 app.include_router(users_route.router)
@@ -48,6 +68,18 @@ def health_check():
     return {"Server": "Healthy and happy!"}
 
 
+@app.get("/metrics/pool", status_code=status.HTTP_200_OK)
+def get_pool_metrics():
+    # per worker process, each has its own pools
+    metrics = {"sync": pool_metrics(engine),
+               "async": pool_metrics(async_engine.sync_engine)}
+    if replica_engine is not engine:
+        metrics["replica"] = pool_metrics(replica_engine)
+        metrics["async_replica"] = pool_metrics(
+            async_replica_engine.sync_engine)
+    return metrics
+
+
 if __name__ == "__main__":
     PORT = int(getenv('PORT', 8000))
     uvicorn.run("main:app", host="0.0.0.0", port=PORT, reload=True)
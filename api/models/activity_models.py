@@ -1,5 +1,5 @@
 from database.database import Base
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, ForeignKey
 
 
 class Activity(Base):
@@ -18,3 +18,9 @@ class CampsiteActivity(Base):
         "campsites.campsite_id", ondelete="CASCADE"))
     activity_id = Column(Integer, ForeignKey(
         "activities.activity_id", ondelete="CASCADE"))
+
+    # the activity_id filter looks campsites up by activity
+    __table_args__ = (
+        Index("ix_campsite_activities_activity_id_campsite_id",
+              activity_id, campsite_id),
+    )
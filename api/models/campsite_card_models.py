@@ -0,0 +1,157 @@
+from sqlalchemy import Boolean, Column, Integer, String, Float, ForeignKey, Index, JSON, DDL, event
+from database.database import Base
+
+
+class CampsiteCard(Base):
+    # Denormalised read model behind GET /campsites and favourites: one row
+    # per campsite holding everything a list entry shows, so a page is a
+    # single indexed scan of this table. Kept in step with the campsites,
+    # photos, contacts and categories tables by the triggers below.
+    __tablename__ = "campsite_cards"
+    campsite_id = Column(Integer, ForeignKey(
+        "campsites.campsite_id", ondelete="CASCADE"), primary_key=True)
+    campsite_name = Column(String)
+    campsite_longitude = Column(Float)
+    campsite_latitude = Column(Float)
+    grid_cell = Column(Integer, index=True)
+    parking_cost = Column(Float)
+    facilities_cost = Column(Float)
+    description = Column(String)
+    opening_month = Column(String)
+    closing_month = Column(String)
+    open_months = Column(Integer, index=True)
+    date_added = Column(String)
+    approved = Column(Boolean)
+    user_account_id = Column(Integer)
+    category_id = Column(Integer, index=True)
+    average_rating = Column(Float)
+    review_count = Column(Integer)
+    # serialized CampsiteCategory, or null
+    category = Column(JSON)
+    # serialized CampsitePhoto and CampsiteContact lists, oldest first
+    photos = Column(JSON)
+    contacts = Column(JSON)
+
+    # composite indexes backing keyset pagination on GET /campsites
+    __table_args__ = (
+        Index("ix_campsite_cards_date_added_campsite_id",
+              date_added, campsite_id),
+        Index("ix_campsite_cards_average_rating_campsite_id",
+              average_rating, campsite_id),
+    )
+
+
+# columns copied straight from campsites, the rest are built from related rows
+CARD_CAMPSITE_COLUMNS = [column.name for column in CampsiteCard.__table__.columns
+                         if column.name not in ("category", "photos", "contacts")]
+CARD_COLUMNS = CARD_CAMPSITE_COLUMNS + ["category", "photos", "contacts"]
+
+# dialect -> (json object function, ordered json array aggregate)
+CARD_JSON_FUNCTIONS = {
+    "sqlite": ("json_object", "json_group_array({object})"),
+    "postgresql": ("json_build_object", "COALESCE(json_agg({object} ORDER BY {order_by}), '[]'::json)"),
+}
+
+
+def json_list_sql(dialect, table, columns, order_by):
+    # rows of table belonging to campsite c as a JSON array. SQLite walks the
+    # campsite_id index in rowid order, which is already id order.
+    build_object, aggregate = CARD_JSON_FUNCTIONS[dialect]
+    pairs = ", ".join(f"'{column}', r.{column}" for column in columns)
+    json_object = f"{build_object}({pairs})"
+    return (f"(SELECT {aggregate.format(object=json_object, order_by='r.' + order_by)} "
+            f"FROM {table} AS r WHERE r.campsite_id = c.campsite_id)")
+
+
+def card_select_sql(dialect, where):
+    build_object = CARD_JSON_FUNCTIONS[dialect][0]
+    category = (f"CASE WHEN cat.category_id IS NULL THEN NULL ELSE {build_object}("
+                "'category_id', cat.category_id, 'category_name', cat.category_name, "
+                "'category_img_url', cat.category_img_url) END")
+    photos = json_list_sql(dialect, "campsite_photos", [
+        "campsite_photo_id", "campsite_photo_url", "campsite_id"], "campsite_photo_id")
+    contacts = json_list_sql(dialect, "campsite_contacts", [
+        "campsite_contact_id", "campsite_contact_name", "campsite_contact_phone",
+        "campsite_contact_email", "campsite_id"], "campsite_contact_id")
+    columns = ", ".join(f"c.{column}" for column in CARD_CAMPSITE_COLUMNS)
+    return (f"SELECT {columns}, {category}, {photos}, {contacts} FROM campsites AS c "
+            f"LEFT JOIN categories AS cat ON cat.category_id = c.category_id WHERE {where}")
+
+
+def card_refresh_sql(dialect, where):
+    # rewrites the cards of the campsites matching where
+    if dialect == "sqlite":
+        return f"INSERT OR REPLACE INTO campsite_cards ({', '.join(CARD_COLUMNS)}) {card_select_sql(dialect, where)}"
+    updates = ", ".join(
+        f"{column} = EXCLUDED.{column}" for column in CARD_COLUMNS[1:])
+    return (f"INSERT INTO campsite_cards ({', '.join(CARD_COLUMNS)}) {card_select_sql(dialect, where)} "
+            f"ON CONFLICT (campsite_id) DO UPDATE SET {updates}")
+
+
+def card_backfill_sql(dialect):
+    # cards for campsites written before the table existed
+    return (f"INSERT INTO campsite_cards ({', '.join(CARD_COLUMNS)}) "
+            f"{card_select_sql(dialect, 'c.campsite_id NOT IN (SELECT campsite_id FROM campsite_cards)')}")
+
+
+def sqlite_card_trigger(name, event_name, table, *statements):
+    return DDL(f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event_name} ON {table} BEGIN "
+               + " ".join(f"{statement};" for statement in statements) + " END")
+
+
+campsite_card_sqlite_ddl = [
+    sqlite_card_trigger("campsite_cards_campsite_insert", "INSERT", "campsites",
+                        card_refresh_sql("sqlite", "c.campsite_id = new.campsite_id")),
+    sqlite_card_trigger("campsite_cards_campsite_update", "UPDATE", "campsites",
+                        card_refresh_sql("sqlite", "c.campsite_id = new.campsite_id")),
+    sqlite_card_trigger("campsite_cards_campsite_delete", "DELETE", "campsites",
+                        "DELETE FROM campsite_cards WHERE campsite_id = old.campsite_id"),
+    sqlite_card_trigger("campsite_cards_category_update", "UPDATE", "categories",
+                        card_refresh_sql("sqlite", "c.category_id = new.category_id")),
+]
+for table in ("campsite_photos", "campsite_contacts"):
+    campsite_card_sqlite_ddl += [
+        sqlite_card_trigger(f"campsite_cards_{table}_insert", "INSERT", table,
+                            card_refresh_sql("sqlite", "c.campsite_id = new.campsite_id")),
+        sqlite_card_trigger(f"campsite_cards_{table}_update", "UPDATE", table,
+                            card_refresh_sql(
+                                "sqlite", "c.campsite_id = old.campsite_id"),
+                            card_refresh_sql("sqlite", "c.campsite_id = new.campsite_id")),
+        sqlite_card_trigger(f"campsite_cards_{table}_delete", "DELETE", table,
+                            card_refresh_sql("sqlite", "c.campsite_id = old.campsite_id")),
+    ]
+campsite_card_sqlite_ddl.append(DDL(card_backfill_sql("sqlite")))
+
+# Postgres gets one trigger function for every source table. Deleted
+# campsites lose their card through the foreign key cascade.
+campsite_card_postgresql_ddl = [
+    DDL("CREATE OR REPLACE FUNCTION refresh_campsite_cards() RETURNS trigger AS $$ BEGIN "
+        "IF TG_TABLE_NAME = 'campsites' THEN "
+        "IF TG_OP <> 'DELETE' THEN "
+        f"{card_refresh_sql('postgresql', 'c.campsite_id = NEW.campsite_id')}; END IF; "
+        "ELSIF TG_TABLE_NAME = 'categories' THEN "
+        f"{card_refresh_sql('postgresql', 'c.category_id = NEW.category_id')}; "
+        "ELSE "
+        "IF TG_OP <> 'INSERT' THEN "
+        f"{card_refresh_sql('postgresql', 'c.campsite_id = OLD.campsite_id')}; END IF; "
+        "IF TG_OP <> 'DELETE' THEN "
+        f"{card_refresh_sql('postgresql', 'c.campsite_id = NEW.campsite_id')}; END IF; "
+        "END IF; RETURN NULL; END $$ LANGUAGE plpgsql"),
+]
+for table, events in (("campsites", "INSERT OR UPDATE"), ("categories", "UPDATE"),
+                      ("campsite_photos", "INSERT OR UPDATE OR DELETE"),
+                      ("campsite_contacts", "INSERT OR UPDATE OR DELETE")):
+    campsite_card_postgresql_ddl += [
+        DDL(f"DROP TRIGGER IF EXISTS {table}_refresh_campsite_cards ON {table}"),
+        DDL(f"CREATE TRIGGER {table}_refresh_campsite_cards AFTER {events} ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION refresh_campsite_cards()"),
+    ]
+campsite_card_postgresql_ddl.append(DDL(card_backfill_sql("postgresql")))
+
+# after the whole schema exists, the triggers span four tables
+for statement in campsite_card_sqlite_ddl:
+    event.listen(Base.metadata, "after_create",
+                 statement.execute_if(dialect="sqlite"))
+for statement in campsite_card_postgresql_ddl:
+    event.listen(Base.metadata, "after_create",
+                 statement.execute_if(dialect="postgresql"))
@@ -1,8 +1,10 @@
 from typing import List
-from sqlalchemy import Boolean, Column, Integer, String, Float, ForeignKey, Table
+from sqlalchemy import Boolean, Column, Integer, String, Float, ForeignKey, Index, Table, DDL, event
 from sqlalchemy.orm import relationship, Mapped
 from database.database import Base
 from api.utils.date_stamp import date_stamp
+from api.utils.geo_grid import grid_cell
+from api.utils.month_mask import month_mask
 from api.models.user_models import user_campsite_favourites
 
 
@@ -20,19 +22,36 @@ campsites_facilities = Table(
            ondelete="CASCADE"), primary_key=True),
     Column("facility_id", ForeignKey("facilities.facility_id",
            ondelete="CASCADE"), primary_key=True),
+    # the facility_id filter looks campsites up by facility
+    Index("ix_campsites_facilities_facility_id_campsite_id",
+          "facility_id", "campsite_id"),
 )
 
 
+def default_grid_cell(context):
+    params = context.get_current_parameters()
+    return grid_cell(params.get("campsite_latitude"), params.get("campsite_longitude"))
+
+
+def default_open_months(context):
+    params = context.get_current_parameters()
+    return month_mask(params.get("opening_month"), params.get("closing_month"))
+
+
 class Campsite(Base):
     __tablename__ = "campsites"
     campsite_id = Column(Integer, primary_key=True)
     campsite_name = Column(String, index=True)
     campsite_longitude = Column(Float)
     campsite_latitude = Column(Float)
+    # spatial bucket for viewport queries, see api/utils/geo_grid.py
+    grid_cell = Column(Integer, default=default_grid_cell, index=True)
     parking_cost = Column(Float)
     facilities_cost = Column(Float)
     opening_month = Column(String)
     closing_month = Column(String)
+    # 12-bit mask of the months the campsite is open, see api/utils/month_mask.py
+    open_months = Column(Integer, default=default_open_months, index=True)
     description = Column(String)
     date_added = Column(String, default=date_stamp())
     approved = Column(Boolean, default=False)
@@ -48,6 +67,15 @@ class Campsite(Base):
     reviews = relationship("Review", back_populates="campsite")
     average_rating = Column(Float, default=0.0)
 
+    # rating aggregates, maintained by every review write in reviews_crud
+    review_count = Column(Integer, default=0, nullable=False)
+    rating_sum = Column(Integer, default=0, nullable=False)
+    rating_1_count = Column(Integer, default=0, nullable=False)
+    rating_2_count = Column(Integer, default=0, nullable=False)
+    rating_3_count = Column(Integer, default=0, nullable=False)
+    rating_4_count = Column(Integer, default=0, nullable=False)
+    rating_5_count = Column(Integer, default=0, nullable=False)
+
     contacts: Mapped[List["CampsiteContact"]] = relationship(
         "CampsiteContact", back_populates="campsite", cascade="all, delete-orphan")
     photos: Mapped[List["CampsitePhoto"]] = relationship(
@@ -55,7 +83,48 @@ class Campsite(Base):
     favourited_by: Mapped[List["User_Account"]] = relationship(
         'User_Account', secondary=user_campsite_favourites, back_populates='favourites')
 
-    # facilities: Mapped[List["Facility"]] = relationship(secondary=campsites_facilities, cascade="all, delete-orphan")
+    facilities: Mapped[List["Facility"]] = relationship(
+        "Facility", secondary=campsites_facilities, order_by="Facility.facility_id")
+    activities: Mapped[List["Activity"]] = relationship(
+        "Activity", secondary="campsite_activities", order_by="Activity.activity_id")
+
+
+# Full-text search over campsite names and descriptions. SQLite gets an FTS5
+# table kept in sync by triggers, Postgres a generated tsvector column with a
+# GIN index, so every write path (including seeding) stays searchable.
+campsite_search_sqlite_ddl = [
+    DDL("CREATE VIRTUAL TABLE IF NOT EXISTS campsites_fts USING fts5("
+        "campsite_name, description, content='campsites', content_rowid='campsite_id')"),
+    DDL("CREATE TRIGGER IF NOT EXISTS campsites_fts_insert AFTER INSERT ON campsites BEGIN "
+        "INSERT INTO campsites_fts(rowid, campsite_name, description) "
+        "VALUES (new.campsite_id, new.campsite_name, new.description); END"),
+    DDL("CREATE TRIGGER IF NOT EXISTS campsites_fts_delete AFTER DELETE ON campsites BEGIN "
+        "INSERT INTO campsites_fts(campsites_fts, rowid, campsite_name, description) "
+        "VALUES ('delete', old.campsite_id, old.campsite_name, old.description); END"),
+    DDL("CREATE TRIGGER IF NOT EXISTS campsites_fts_update AFTER UPDATE OF campsite_name, description ON campsites BEGIN "
+        "INSERT INTO campsites_fts(campsites_fts, rowid, campsite_name, description) "
+        "VALUES ('delete', old.campsite_id, old.campsite_name, old.description); "
+        "INSERT INTO campsites_fts(rowid, campsite_name, description) "
+        "VALUES (new.campsite_id, new.campsite_name, new.description); END"),
+]
+campsite_search_postgresql_ddl = [
+    DDL("ALTER TABLE campsites ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(campsite_name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED"),
+    DDL("CREATE INDEX IF NOT EXISTS ix_campsites_search_vector ON campsites USING GIN (search_vector)"),
+    # trigram index behind fuzzy name search, SQLite uses an in-process one
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+    DDL("CREATE INDEX IF NOT EXISTS ix_campsites_campsite_name_trgm ON campsites "
+        "USING GIN (campsite_name gin_trgm_ops)"),
+]
+for statement in campsite_search_sqlite_ddl:
+    event.listen(Campsite.__table__, "after_create",
+                 statement.execute_if(dialect="sqlite"))
+for statement in campsite_search_postgresql_ddl:
+    event.listen(Campsite.__table__, "after_create",
+                 statement.execute_if(dialect="postgresql"))
+event.listen(Campsite.__table__, "after_drop", DDL(
+    "DROP TABLE IF EXISTS campsites_fts").execute_if(dialect="sqlite"))
 
 
 class CampsiteContact(Base):
@@ -65,7 +134,7 @@ class CampsiteContact(Base):
     campsite_contact_phone = Column(String)
     campsite_contact_email = Column(String)
 
-    campsite_id = Column(Integer, ForeignKey("campsites.campsite_id"))
+    campsite_id = Column(Integer, ForeignKey("campsites.campsite_id"), index=True)
     campsite: Mapped["Campsite"] = relationship(
         "Campsite", back_populates="contacts")
 
@@ -75,6 +144,6 @@ class CampsitePhoto(Base):
     campsite_photo_id = Column(Integer, primary_key=True)
     campsite_photo_url = Column(String)
 
-    campsite_id = Column(Integer, ForeignKey("campsites.campsite_id"))
+    campsite_id = Column(Integer, ForeignKey("campsites.campsite_id"), index=True)
     campsite: Mapped["Campsite"] = relationship(
         "Campsite", back_populates="photos")
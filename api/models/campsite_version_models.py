@@ -0,0 +1,28 @@
+from uuid import uuid4
+from sqlalchemy import Column, Integer, String, event
+from database.database import Base
+
+# the campsite_id of the row versioning the campsite list as a whole
+LIST_VERSION_ID = 0
+
+
+def new_epoch():
+    return uuid4().hex[:12]
+
+
+class CampsiteVersion(Base):
+    # Version counters behind the campsite ETags, shared by every worker: the
+    # row with LIST_VERSION_ID for the list, one per changed campsite. The
+    # list row's epoch changes whenever the data is reseeded, so ETags handed
+    # out before can never match again.
+    __tablename__ = "campsite_versions"
+    campsite_id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(Integer, nullable=False, default=0)
+    # set on the list row only
+    epoch = Column(String)
+
+
+@event.listens_for(CampsiteVersion.__table__, "after_create")
+def insert_list_version(table, connection, **kwargs):
+    connection.execute(table.insert().values(
+        campsite_id=LIST_VERSION_ID, version=0, epoch=new_epoch()))
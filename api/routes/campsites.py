@@ -1,10 +1,26 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import Annotated
-from database.database_utils.get_db import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from typing import Annotated, Literal
+from database.database_utils.get_db import get_db, get_async_db
 from api.utils.security.authentication_utils import get_current_user
-from api.schemas.campsite_schemas import CampsiteDetailed, CampsiteCreateRequest, Campsite
-from api.crud.campsite_crud import create_campsite, read_campsites, read_campsite_by_id
+from api.schemas.campsite_schemas import CampsiteDetailed, CampsiteCreateRequest, Campsite, CampsiteNearby, CampsiteCluster, CampsiteSuggestion, CampsiteFacetCounts, CampsiteExport, CampsiteImportReport
+from api.utils.geo_grid import parse_bbox
+from api.utils.campsite_import import parse_import_rows
+from api.utils.month_mask import parse_open_in, current_month
+from api.utils.campsite_versions import read_list_version, read_list_etag_async, read_campsite_etag_async, etag_matches
+from api.utils.response_cache import response_cache, cached_json_response, cached_json_response_async, not_modified_response
+from api.utils.fast_json import FastJSONResponse
+from api.utils.compression import negotiate_encoding, compress_stream, compressed_response
+from api.utils.sparse_fields import parse_fields, narrowed_list_adapter
+from api.utils.campsite_autocomplete import MAX_SUGGESTIONS
+from api.utils.path_ids import parse_path_id
+from api.utils.marker_feed import MARKER_FEED_MEDIA_TYPE, wants_packed_markers, pack_markers, columnar_markers
+from api.crud.campsite_crud import create_campsite, read_campsites_async, read_campsite_by_id_async, read_nearby_campsites, read_campsite_clusters, read_campsite_markers, search_campsites, fuzzy_search_campsites, read_campsite_name_suggestions, read_campsite_facet_counts, stream_campsites, import_campsites
 from api.routes.reviews import router as reviews_route
 
 db_dependency = Annotated[Session, Depends(get_db)]
@@ -17,17 +33,169 @@ router = APIRouter(
 
 router.include_router(reviews_route, prefix='/{campsite_id}/reviews')
 
+campsite_list_adapter = TypeAdapter(list[Campsite])
+facet_counts_adapter = TypeAdapter(CampsiteFacetCounts)
+export_adapter = TypeAdapter(CampsiteExport)
+
+CostRange = Literal["free", "under_10", "10_to_20", "20_plus"]
+
+
+def read_cached_list_version(db):
+    # cached responses over every campsite are served only at the list
+    # version they were loaded at, so another worker's write reloads them too
+    return None if response_cache.settling("campsites") else read_list_version(db)
+
+
+def campsite_facet_filters(category_id: Annotated[list[int], Query()] = [], facility_id: Annotated[list[int], Query()] = [], activity_id: Annotated[list[int], Query()] = [], parking_cost: Annotated[list[CostRange], Query()] = [], facilities_cost: Annotated[list[CostRange], Query()] = [], approved: bool | None = None):
+    # repeat a parameter to request several values, e.g. ?facility_id=1&facility_id=2
+    facets = {
+        "category_id": category_id,
+        "facility_id": facility_id,
+        "activity_id": activity_id,
+        "parking_cost": parking_cost,
+        "facilities_cost": facilities_cost,
+        "approved": [] if approved is None else [approved],
+    }
+    return {facet: values for facet, values in facets.items() if values}
+
+
+facet_dependency = Depends(campsite_facet_filters)
+
 
 @router.post("/", status_code=201, response_model=CampsiteDetailed)
 def post_campsite(request: CampsiteCreateRequest, db: db_dependency, user=user_dependency):
-    return create_campsite(db=db, request=request)
+    return FastJSONResponse(create_campsite(db=db, request=request), status_code=201)
+
+
+@router.post("/import", response_model=CampsiteImportReport)
+async def post_campsite_import(request: Request, db: db_dependency, user=user_dependency):
+    # body is NDJSON (application/x-ndjson) or CSV (text/csv), one campsite per row
+    rows = parse_import_rows(request.headers.get("content-type"), await request.body())
+    return FastJSONResponse(await run_in_threadpool(import_campsites, db, rows))
 
 
 @router.get("/", response_model=list[Campsite])
-def get_campsites(skip: int = 0, limit: int = 250, db: Session = Depends(get_db)):
-    return read_campsites(db, skip=skip, limit=limit)
+async def get_campsites(request: Request, skip: Annotated[int, Query(ge=0)] = 0, limit: Annotated[int, Query(ge=1, le=250)] = 250, cursor: str | None = None, sort_by: Literal["campsite_id", "date_added", "rating"] = "campsite_id", bbox: str | None = None, fields: str | None = None, facets: dict = facet_dependency, open_in: str | None = None, open_now: bool = False, db: AsyncSession = Depends(get_async_db)):
+    if cursor and skip:
+        # the cursor already says where the page starts
+        raise HTTPException(
+            status_code=400, detail="400 - Skip Cannot Be Used With A Cursor")
+    field_names = parse_fields(fields, Campsite) if fields else None
+    open_months = [parse_open_in(open_in)] if open_in else []
+    # the version moves on commit but a lagging replica may still return the
+    # old list, so no ETag until the write has settled
+    etag = None if response_cache.settling("campsites") else await read_list_etag_async(db)
+    if open_now:
+        open_months.append(current_month())
+        if etag:
+            # the results change with the calendar, so the month is part of the ETag
+            etag = f'{etag[:-1]}-month{open_months[-1]}"'
+    if etag and etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified_response(etag)
+
+    async def load():
+        campsites, next_cursor = await read_campsites_async(
+            db, skip=skip, limit=limit, cursor=cursor, sort_by=sort_by, bbox=parse_bbox(bbox) if bbox else None, fields=field_names, facets=facets, open_in=open_months)
+        adapter = narrowed_list_adapter(
+            Campsite, field_names) if field_names else campsite_list_adapter
+        body = adapter.dump_json(
+            adapter.validate_python(campsites, from_attributes=True))
+        return body, {"X-Next-Cursor": next_cursor} if next_cursor else {}, ["campsites"]
+
+    return await cached_json_response_async(request, load, headers={"ETag": etag} if etag else None, version=etag)
+
+
+@router.get("/facets", response_model=CampsiteFacetCounts)
+def get_campsite_facet_counts(request: Request, bbox: str | None = None, facets: dict = facet_dependency, open_in: str | None = None, open_now: bool = False, db: Session = Depends(get_db)):
+    # takes the list's filters, so the counts describe the list they sit beside
+    open_months = [parse_open_in(open_in)] if open_in else []
+    version = read_cached_list_version(db)
+    if open_now:
+        open_months.append(current_month())
+        if version:
+            # the counts change with the calendar, as the list's ETag does
+            version = (*version, open_months[-1])
+
+    def load():
+        counts = read_campsite_facet_counts(
+            db, facets, bbox=parse_bbox(bbox) if bbox else None, open_in=open_months)
+        body = facet_counts_adapter.dump_json(
+            facet_counts_adapter.validate_python(counts))
+        return body, {}, ["campsites"]
+
+    return cached_json_response(request, load, version=version)
+
+
+@router.get("/export")
+def export_campsites(request: Request, db: Session = Depends(get_db)):
+    # the body is streamed after get_db has closed the session, a closed
+    # session is reusable so the generator carries on with it and closes it
+    # again once the last batch is sent
+    def ndjson():
+        try:
+            for campsites in stream_campsites(db):
+                yield b"".join(export_adapter.dump_json(export_adapter.validate_python(campsite, from_attributes=True)) + b"\n"
+                               for campsite in campsites)
+        finally:
+            db.close()
+
+    # the export is always big enough to be worth compressing
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    headers = {"Vary": "Accept-Encoding"}
+    body = ndjson()
+    if encoding:
+        body = compress_stream(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
+
+
+@router.get("/search", response_model=list[Campsite])
+def get_campsite_search_results(request: Request, q: Annotated[str, Query(min_length=1, max_length=200)], skip: Annotated[int, Query(ge=0)] = 0, limit: Annotated[int, Query(ge=1, le=50)] = 20, fuzzy: bool = False, db: Session = Depends(get_db)):
+    search = fuzzy_search_campsites if fuzzy else search_campsites
+
+    def load():
+        campsites = search(db, q=q, skip=skip, limit=limit)
+        body = campsite_list_adapter.dump_json(
+            campsite_list_adapter.validate_python(campsites, from_attributes=True))
+        return body, {}, ["campsites"]
+
+    return cached_json_response(request, load, version=read_cached_list_version(db))
+
+
+@router.get("/autocomplete", response_model=list[CampsiteSuggestion])
+def get_campsite_name_suggestions(prefix: Annotated[str, Query(min_length=1, max_length=100)], limit: Annotated[int, Query(ge=1, le=MAX_SUGGESTIONS)] = MAX_SUGGESTIONS, db: Session = Depends(get_db)):
+    return FastJSONResponse(read_campsite_name_suggestions(db, prefix=prefix, limit=limit))
+
+
+@router.get("/nearby", response_model=list[CampsiteNearby])
+def get_nearby_campsites(request: Request, lat: Annotated[float, Query(ge=-90, le=90)], lon: Annotated[float, Query(ge=-180, le=180)], k: Annotated[int, Query(ge=1, le=100)] = 10, db: Session = Depends(get_db)):
+    return compressed_response(request, to_json(read_nearby_campsites(db, latitude=lat, longitude=lon, k=k)))
+
+
+@router.get("/markers")
+def get_campsite_markers(request: Request, bbox: str | None = None, db: Session = Depends(get_db)):
+    markers = read_campsite_markers(
+        db, bbox=parse_bbox(bbox) if bbox else None)
+    if wants_packed_markers(request.headers.get("accept")):
+        return compressed_response(request, pack_markers(markers), MARKER_FEED_MEDIA_TYPE, headers={"Vary": "Accept"})
+    return compressed_response(request, to_json(columnar_markers(markers)), headers={"Vary": "Accept"})
+
+
+@router.get("/clusters", response_model=list[CampsiteCluster])
+def get_campsite_clusters(request: Request, zoom: Annotated[int, Query(ge=0, le=22)], bbox: str | None = None, db: Session = Depends(get_db)):
+    return compressed_response(request, to_json(read_campsite_clusters(db, zoom=zoom, bbox=parse_bbox(bbox) if bbox else None)))
 
 
 @router.get("/{campsite_id}", response_model=CampsiteDetailed)
-def get_campsite_by_campsite_id(campsite_id, db: Session = Depends(get_db), user=user_dependency):
-    return read_campsite_by_id(db, campsite_id)
+async def get_campsite_by_campsite_id(campsite_id, request: Request, fields: str | None = None, db: AsyncSession = Depends(get_async_db), user=user_dependency):
+    field_names = parse_fields(fields, CampsiteDetailed) if fields else None
+    tag = f"campsite:{parse_path_id(campsite_id)}"
+    etag = None if response_cache.settling(tag) else await read_campsite_etag_async(db, campsite_id)
+    if etag and etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified_response(etag)
+
+    async def load():
+        campsite = await read_campsite_by_id_async(db, campsite_id, fields=field_names)
+        return campsite.model_dump_json().encode(), {}, [tag]
+
+    return await cached_json_response_async(request, load, headers={"ETag": etag} if etag else None, version=etag)
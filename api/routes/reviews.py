@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
 from typing import Annotated
-from database.database_utils.get_db import get_db
+from database.database_utils.get_db import get_db, get_async_db
 from api.utils.security.authentication_utils import get_current_user
 from api.schemas.review_schemas import ReviewPostRequest, ReviewPatchRequest, ReviewResponse, Review
-from api.crud.reviews_crud import create_review_by_campsite_id, read_reviews_by_campsite_id, update_review_by_review_id, remove_review_by_review_id
+from api.utils.response_cache import cached_json_response_async
+from api.utils.path_ids import parse_path_id
+from api.crud.reviews_crud import create_review_by_campsite_id, read_reviews_by_campsite_id_async, update_review_by_review_id, remove_review_by_review_id
 
 db_dependency = Annotated[Session, Depends(get_db)]
 user_dependency = Depends(get_current_user)
@@ -13,6 +17,8 @@ router = APIRouter(
     dependencies=[user_dependency]
 )
 
+review_list_adapter = TypeAdapter(list[Review])
+
 
 @router.post("/", status_code=201, response_model=ReviewResponse)
 def post_review_by_campsite_id(campsite_id, request: ReviewPostRequest, db: Session = Depends(get_db), user=user_dependency):
@@ -20,8 +26,14 @@ def post_review_by_campsite_id(campsite_id, request: ReviewPostRequest, db: Sess
 
 
 @router.get("/", response_model=list[Review])
-def get_reviews_by_campsite_id(campsite_id, db: Session = Depends(get_db), user=user_dependency):
-    return read_reviews_by_campsite_id(db, campsite_id)
+async def get_reviews_by_campsite_id(campsite_id, request: Request, db: AsyncSession = Depends(get_async_db), user=user_dependency):
+    async def load():
+        reviews = await read_reviews_by_campsite_id_async(db, campsite_id)
+        body = review_list_adapter.dump_json(
+            review_list_adapter.validate_python(reviews))
+        return body, {}, [f"reviews:{parse_path_id(campsite_id)}"]
+
+    return await cached_json_response_async(request, load)
 
 
 @router.patch("/{review_id}", status_code=200, response_model=ReviewResponse)
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
 from typing import Annotated
-from database.database_utils.get_db import get_db
+from database.database_utils.get_db import get_db, get_async_db
 from api.utils.security.authentication_utils import get_current_user
-from api.crud.user_crud import read_user_account_by_user_id, update_user_xp, create_user_favourite_campsite, read_user_campsite_favourites_by_user_id, remove_user_favourite_campsite
+from api.crud.user_crud import read_user_account_by_user_id, update_user_xp, create_user_favourite_campsite, read_user_campsite_favourites_by_user_id_async, remove_user_favourite_campsite
 from api.schemas.campsite_schemas import Campsite
+from api.utils.response_cache import cached_json_response_async
+from api.utils.path_ids import parse_path_id
+from api.utils.sparse_fields import parse_fields, narrowed_list_adapter
 from api.schemas.user_schemas import UserAccountDetails
 
 db_dependency = Annotated[Session, Depends(get_db)]
@@ -16,6 +21,8 @@ router = APIRouter(
     dependencies=[user_dependency]
 )
 
+campsite_list_adapter = TypeAdapter(list[Campsite])
+
 # DISABLED PENDING AMDMINISTRATION LEVEL RESTRICTION
 # @router.get("/", response_model=list[UserAccountDetails])
 # def get_users(db: Session = Depends(get_db), user=user_dependency):
@@ -33,10 +40,21 @@ def patch_user_xp(user_id: str, xp: str, db: Session = Depends(get_db), user=use
 
 
 @router.get("/{user_id}/favourites", response_model=list[Campsite])
-def get_user_favourite_campsites(user_id, db: Session = Depends(get_db), user=user_dependency):
-    favourites = read_user_campsite_favourites_by_user_id(db, user_id=user_id)
-    print(favourites)
-    return favourites
+async def get_user_favourite_campsites(user_id, request: Request, fields: str | None = None, db: AsyncSession = Depends(get_async_db), user=user_dependency):
+    field_names = parse_fields(fields, Campsite) if fields else None
+
+    async def load():
+        favourites = await read_user_campsite_favourites_by_user_id_async(
+            db, user_id=user_id, fields=field_names)
+        adapter = narrowed_list_adapter(
+            Campsite, field_names) if field_names else campsite_list_adapter
+        body = adapter.dump_json(
+            adapter.validate_python(favourites, from_attributes=True))
+        tags = [f"favourites:{parse_path_id(user_id)}"] + \
+            [f"campsite:{campsite.campsite_id}" for campsite in favourites]
+        return body, {}, tags
+
+    return await cached_json_response_async(request, load)
 
 
 @router.post("/{user_id}/favourites/{campsite_id}", status_code=201)
@@ -18,6 +18,9 @@ class ActivityBase(BaseModel):
     activity_name: str
     activity_img_url: str
 
+    class Config:
+        from_attributes = True
+
 
 class ActivityCreate(ActivityBase):
     pass
@@ -85,11 +85,59 @@ class Campsite(CampsiteBase):
     category: CampsiteCategory | None = None
     approved: bool = False
     average_rating: float | None = None
+    review_count: int = 0
 
     class Config:
         from_attributes = True
 
 
+class CampsiteExport(Campsite):
+    date_added: str
+    rating_1_count: int = 0
+    rating_2_count: int = 0
+    rating_3_count: int = 0
+    rating_4_count: int = 0
+    rating_5_count: int = 0
+
+
+class CampsiteNearby(Campsite):
+    distance_km: float
+
+
+class CampsiteCluster(BaseModel):
+    latitude: float
+    longitude: float
+    count: int
+    campsite_id: int | None = None
+
+
+class CampsiteImportError(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class CampsiteImportReport(BaseModel):
+    imported: int
+    campsite_ids: list[int]
+    errors: list[CampsiteImportError]
+
+
+class CampsiteFacetCounts(BaseModel):
+    total: int
+    category_id: dict[int, int]
+    facility_id: dict[int, int]
+    activity_id: dict[int, int]
+    parking_cost: dict[str, int]
+    facilities_cost: dict[str, int]
+    approved: dict[bool, int]
+
+
+class CampsiteSuggestion(BaseModel):
+    campsite_id: int
+    campsite_name: str
+    average_rating: float
+
+
 class CampsiteDetailed(CampsiteBase):
     user_account_id: int
     username: str
@@ -101,3 +149,4 @@ class CampsiteDetailed(CampsiteBase):
     facilities: list[Facility] | None = None
     activities: list[Activity] | None = None
     average_rating: float | None = None
+    review_count: int = 0
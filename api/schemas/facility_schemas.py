@@ -18,6 +18,9 @@ class FacilityBase(BaseModel):
     facility_name: str
     facility_img_url: str
 
+    class Config:
+        from_attributes = True
+
 
 class FacilityCreate(FacilityBase):
     pass
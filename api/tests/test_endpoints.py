@@ -1,20 +1,32 @@
-from sqlalchemy import create_engine
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.pool import StaticPool, NullPool
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 import pytest
 from fastapi.testclient import TestClient
 
-from datetime import timedelta
+import json
+import asyncio
+from datetime import datetime, timedelta, timezone
 
 from database.database import Base
-from api.main import app, get_db
+from api.main import app, get_db, remember_writes
+from database.database_utils.get_db import get_async_db
 from api.data.test_data import get_test_data
 from api.utils.seed_database import seed_database
 from api.utils.test_utils import is_valid_date, get_test_user_token
 from api.crud.auth_crud import create_access_token
 from api.models.user_models import User_Credentials
+from api.models.campsite_models import Campsite as CampsiteModel, CampsitePhoto as CampsitePhotoModel, CampsiteCategory as CategoryModel, campsites_facilities
+from api.models.campsite_card_models import CampsiteCard as CampsiteCardModel
 from api.schemas.campsite_schemas import Campsite
+from api.utils.marker_feed import MARKER_FEED_MEDIA_TYPE, unpack_markers
+from api.utils.response_cache import response_cache
+from api.utils.pagination_cursor import encode_cursor
+from api.utils.campsite_versions import bump_campsite_versions
+from api.utils.compression import COMPRESSION_MIN_BYTES
+from api.crud.campsite_crud import stream_campsites, import_campsites, read_campsites_async, read_campsite_by_id_async
 
 from os import environ
 environ['ENV'] = 'development'
@@ -34,14 +46,24 @@ class AuthenticatedTestClient(TestClient):
 
 client = AuthenticatedTestClient(app, token)
 
-TEST_DB_URL = "sqlite:///"
+# A named shared-cache in-memory database, so the aiosqlite connections behind
+# the async routes see the same tables as the sync engine. The StaticPool
+# connection keeps it alive between tests.
+TEST_DB_PATH = "/file:parkfinite_test?mode=memory&cache=shared&uri=true"
+TEST_DB_URL = "sqlite://" + TEST_DB_PATH
 test_engine = create_engine(
     TEST_DB_URL,
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
 TestSession = sessionmaker(
-    autocommit=False, autoflush=False, bind=test_engine)
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=test_engine)
+# TestClient runs each request on a fresh event loop, so async connections are
+# not pooled across requests
+test_async_engine = create_async_engine(
+    "sqlite+aiosqlite://" + TEST_DB_PATH, poolclass=NullPool)
+AsyncTestSession = async_sessionmaker(
+    autoflush=False, expire_on_commit=False, bind=test_async_engine)
 
 
 def override_get_db():
@@ -49,7 +71,32 @@ def override_get_db():
     return db
 
 
+async def override_get_async_db():
+    async with AsyncTestSession() as db:
+        yield db
+
+
+class QueryRecorder:
+    # records the statements sent through the sync and the async test engines
+    def __init__(self, *engines):
+        self.engines = engines or (test_engine, test_async_engine.sync_engine)
+        self.statements = []
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self.record)
+        return self
+
+    def __exit__(self, *exc_info):
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self.record)
+
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
 
 
 @pytest.fixture(scope='function')
@@ -82,6 +129,26 @@ def test_db_class_scope():
         test_session.close()
 
 
+@pytest.mark.main
+class TestPoolMetrics:
+    def test_pool_metrics(self):
+        response = client.get("/metrics/pool")
+        assert response.status_code == 200
+        # sized pools report their counters, in-memory SQLite only a status line
+        assert response.json().keys() == {"sync", "async"}
+
+
+@pytest.mark.main
+class TestWithoutReplica:
+    def test_writes_set_no_last_write_cookie(self, test_db):
+        response = client.post("/campsites/3/reviews",
+                               json={"rating": 4, "user_account_id": 1})
+        assert response.status_code == 201
+        assert "set-cookie" not in response.headers
+        assert not [middleware for middleware in app.user_middleware
+                    if middleware.kwargs.get("dispatch") is remember_writes]
+
+
 @pytest.mark.main
 class TestPostCampsite:
     def test_basic_campsite_with_category(self, test_db):
@@ -117,8 +184,8 @@ class TestPostCampsite:
         assert posted_campsite['photos'] == []
         assert posted_campsite['approved'] == False
         assert posted_campsite['contacts'] == []
-        assert posted_campsite['activities'] is None
-        assert posted_campsite['facilities'] is None
+        assert posted_campsite['activities'] == []
+        assert posted_campsite['facilities'] == []
         assert posted_campsite['description'] is None
 
     def test_campsite_with_photo(self, test_db):
@@ -235,6 +302,56 @@ class TestPostCampsite:
                 'campsite_contact_name': 'Cathy C', 'campsite_contact_phone': '0987654321', 'campsite_id': 4}
         ]
 
+    def test_campsite_with_facilities_and_activities(self, test_db):
+        request_body = {
+            "user_account_id": 1,
+            "campsite_name": "TEST NAME",
+            "campsite_longitude": 1.23,
+            "campsite_latitude": 4.56,
+            "category_id": 3,
+            "facilities": [
+                {"facility_id": 3, "facility_name": "Pet Friendly",
+                    "facility_img_url": "https://example.com/facility5.jpg"}
+            ],
+            "activities": [
+                {"activity_id": 1, "activity_name": "Hiking",
+                    "activity_img_url": "https://example.com/activity1.jpg"}
+            ]
+        }
+        response = client.post("/campsites", json=request_body)
+        assert response.status_code == 201
+        posted_campsite = response.json()
+        assert posted_campsite['facilities'] == [
+            {"facility_id": 3, "facility_name": "Pet Friendly",
+                "facility_img_url": "https://example.com/facility5.jpg"}
+        ]
+        assert posted_campsite['activities'] == [
+            {"activity_id": 1, "activity_name": "Hiking",
+                "activity_img_url": "https://example.com/activity1.jpg"}
+        ]
+
+        campsite = client.get("/campsites/4").json()
+        assert [facility['facility_id']
+                for facility in campsite['facilities']] == [3]
+        assert [activity['activity_id']
+                for activity in campsite['activities']] == [1]
+
+    def test_422_facility_not_found(self, test_db):
+        request_body = {
+            "user_account_id": 1,
+            "campsite_name": "TEST NAME",
+            "campsite_longitude": 1.23,
+            "campsite_latitude": 4.56,
+            "category_id": 3,
+            "facilities": [
+                {"facility_id": 987654321, "facility_name": "Sauna",
+                    "facility_img_url": "https://example.com/facility9.jpg"}
+            ]
+        }
+        response = client.post("/campsites", json=request_body)
+        assert response.status_code == 422
+        assert response.json()['detail'] == "Facility ID does not exist!"
+
     def test_404_category_not_found(self, test_db):
         request_body = {
             "category_id": 987654321,
@@ -368,6 +485,1097 @@ class TestGetCampsites:
         assert campsites[1]["average_rating"] == 2.0
 
 
+@pytest.mark.main
+class TestGetCampsitesPagination:
+    def test_first_page_returns_next_cursor(self, test_db):
+        response = client.get("/campsites?limit=2")
+        assert response.status_code == 200
+        campsites = response.json()
+        assert [campsite['campsite_id'] for campsite in campsites] == [1, 2]
+        assert isinstance(response.headers['X-Next-Cursor'], str)
+
+    def test_follow_cursor_to_last_page(self, test_db):
+        first_page = client.get("/campsites?limit=2")
+        cursor = first_page.headers['X-Next-Cursor']
+
+        response = client.get(f"/campsites?limit=2&cursor={cursor}")
+        assert response.status_code == 200
+        assert [campsite['campsite_id'] for campsite in response.json()] == [3]
+        assert 'X-Next-Cursor' not in response.headers
+
+    def test_sort_by_rating_pages_in_order(self, test_db):
+        first_page = client.get("/campsites?limit=1&sort_by=rating")
+        cursor = first_page.headers['X-Next-Cursor']
+        second_page = client.get(
+            f"/campsites?limit=2&sort_by=rating&cursor={cursor}")
+
+        ratings = [campsite['average_rating']
+                   for campsite in first_page.json() + second_page.json()]
+        assert ratings == [5.0, 2.0, 0.0]
+
+    def test_sort_by_date_added_visits_every_campsite(self, test_db):
+        campsite_ids = []
+        cursor = None
+        while True:
+            url = "/campsites?limit=1&sort_by=date_added"
+            response = client.get(f"{url}&cursor={cursor}" if cursor else url)
+            campsite_ids += [campsite['campsite_id']
+                             for campsite in response.json()]
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+        assert sorted(campsite_ids) == [1, 2, 3]
+
+    def test_skip_is_applied(self, test_db):
+        response = client.get("/campsites?skip=1&limit=1")
+        assert [campsite['campsite_id'] for campsite in response.json()] == [2]
+
+    def test_400_invalid_cursor(self, test_db):
+        response = client.get("/campsites?cursor=NOT_A_CURSOR")
+        assert response.status_code == 400
+        assert response.json()['detail'] == "400 - Invalid Cursor"
+
+    def test_400_cursor_from_different_sort(self, test_db):
+        cursor = client.get("/campsites?limit=1").headers['X-Next-Cursor']
+        response = client.get(f"/campsites?sort_by=rating&cursor={cursor}")
+        assert response.status_code == 400
+
+    def test_400_cursor_with_wrong_sort_value_type(self, test_db):
+        for sort_by, sort_value in (("rating", "high"), ("rating", True), ("date_added", 5.0), ("campsite_id", "1")):
+            cursor = encode_cursor(sort_by, sort_value, 1)
+            response = client.get(
+                f"/campsites?sort_by={sort_by}&cursor={cursor}")
+            assert response.status_code == 400
+            assert response.json()['detail'] == "400 - Invalid Cursor"
+        cursor = encode_cursor("rating", 5, 1)
+        assert client.get(
+            f"/campsites?sort_by=rating&cursor={cursor}").status_code == 200
+
+    def test_422_negative_skip(self, test_db):
+        response = client.get("/campsites?skip=-1")
+        assert response.status_code == 422
+
+    def test_400_skip_with_cursor(self, test_db):
+        cursor = client.get("/campsites?limit=1").headers['X-Next-Cursor']
+        response = client.get(f"/campsites?skip=1&cursor={cursor}")
+        assert response.status_code == 400
+
+    def test_422_invalid_sort_by(self, test_db):
+        response = client.get("/campsites?sort_by=INVALID")
+        assert response.status_code == 422
+
+
+@pytest.mark.main
+class TestGetCampsitesInBoundingBox:
+    def test_returns_only_campsites_in_viewport(self, test_db):
+        response = client.get("/campsites?bbox=-1.6,53.4,-1.5,53.5")
+        assert response.status_code == 200
+        campsites = response.json()
+        assert [campsite['campsite_id'] for campsite in campsites] == [1]
+
+    def test_viewport_containing_all_campsites(self, test_db):
+        response = client.get("/campsites?bbox=-2,53,-1,54")
+        assert len(response.json()) == 3
+
+    def test_empty_viewport(self, test_db):
+        response = client.get("/campsites?bbox=10,10,11,11")
+        assert response.status_code == 200
+        assert response.json() == []
+
+    def test_posted_campsite_is_found_in_viewport(self, test_db):
+        request_body = {
+            "user_account_id": 1,
+            "campsite_name": "TEST NAME",
+            "campsite_longitude": 1.23,
+            "campsite_latitude": 4.56,
+            "category_id": 3
+        }
+        client.post("/campsites", json=request_body)
+        response = client.get("/campsites?bbox=1.2,4.5,1.3,4.6")
+        assert [campsite['campsite_name']
+                for campsite in response.json()] == ["TEST NAME"]
+
+    def test_bbox_with_cursor_pagination(self, test_db):
+        first_page = client.get("/campsites?bbox=-2,53,-1,54&limit=2")
+        cursor = first_page.headers['X-Next-Cursor']
+        second_page = client.get(
+            f"/campsites?bbox=-2,53,-1,54&limit=2&cursor={cursor}")
+        assert [campsite['campsite_id']
+                for campsite in second_page.json()] == [3]
+
+    def test_400_invalid_bbox(self, test_db):
+        response = client.get("/campsites?bbox=INVALID")
+        assert response.status_code == 400
+        assert response.json()['detail'] == "400 - Invalid Bounding Box"
+
+
+@pytest.mark.main
+class TestGetNearbyCampsites:
+    def test_returns_nearest_approved_campsites(self, test_db):
+        response = client.get("/campsites/nearby?lat=53.45&lon=-1.54&k=5")
+        assert response.status_code == 200
+        campsites = response.json()
+        assert [campsite['campsite_id'] for campsite in campsites] == [1, 3]
+        assert campsites[0]['distance_km'] < campsites[1]['distance_km']
+        assert campsites[0]['distance_km'] == pytest.approx(0.7, abs=0.1)
+        assert campsites[0]['category']['category_name'] == "In The Wild"
+        assert isinstance(campsites[0]['photos'], list)
+
+    def test_k_limits_results(self, test_db):
+        response = client.get("/campsites/nearby?lat=53.12&lon=-1.81&k=1")
+        campsites = response.json()
+        assert len(campsites) == 1
+        assert campsites[0]['campsite_id'] == 3
+
+    def test_unapproved_campsite_is_not_returned(self, test_db):
+        response = client.get("/campsites/nearby?lat=53.54321&lon=-1.87654&k=3")
+        assert 2 not in [campsite['campsite_id'] for campsite in response.json()]
+
+    def test_sees_campsite_added_by_another_worker(self, test_db):
+        assert client.get("/campsites/nearby?lat=10&lon=10&k=1").json()[0]["campsite_name"] != "Far Away"
+        # another worker's insert leaves this process's kd-tree alone but
+        # moves the shared list version
+        test_db.add(CampsiteModel(campsite_name="Far Away", campsite_longitude=10, campsite_latitude=10,
+                                  user_account_id=1, category_id=1, approved=True))
+        bump_campsite_versions(test_db)
+        test_db.commit()
+        campsites = client.get("/campsites/nearby?lat=10&lon=10&k=1").json()
+        assert campsites[0]['campsite_name'] == "Far Away"
+
+    def test_422_invalid_coordinates(self, test_db):
+        response = client.get("/campsites/nearby?lat=91&lon=0")
+        assert response.status_code == 422
+        response = client.get("/campsites/nearby?lat=0")
+        assert response.status_code == 422
+
+
+@pytest.mark.main
+class TestGetCampsiteClusters:
+    def test_zoomed_out_campsites_are_clustered(self, test_db):
+        response = client.get("/campsites/clusters?zoom=0")
+        assert response.status_code == 200
+        clusters = response.json()
+        assert len(clusters) == 1
+        assert clusters[0]['count'] == 2
+        assert clusters[0]['campsite_id'] is None
+
+    def test_zoomed_in_campsites_are_separate(self, test_db):
+        response = client.get("/campsites/clusters?zoom=17")
+        clusters = response.json()
+        assert sorted(cluster['campsite_id'] for cluster in clusters) == [1, 3]
+        assert all(cluster['count'] == 1 for cluster in clusters)
+
+    def test_clusters_within_bbox(self, test_db):
+        response = client.get("/campsites/clusters?zoom=17&bbox=-1.6,53.4,-1.5,53.5")
+        clusters = response.json()
+        assert len(clusters) == 1
+        assert clusters[0]['campsite_id'] == 1
+        assert clusters[0]['latitude'] == pytest.approx(53.45645)
+
+    def test_422_missing_zoom(self, test_db):
+        response = client.get("/campsites/clusters")
+        assert response.status_code == 422
+
+
+@pytest.mark.main
+class TestGetCampsiteMarkers:
+    def test_json_columnar_markers(self, test_db):
+        response = client.get("/campsites/markers")
+        assert response.status_code == 200
+        markers = response.json()
+        assert markers['campsite_id'] == [1, 2, 3]
+        assert markers['category_id'] == [1, 2, 3]
+        assert markers['latitude'][0] == 53.45645
+        assert markers['longitude'][0] == -1.54322
+        assert markers['average_rating'] == [5.0, 2.0, 0.0]
+
+    def test_packed_markers(self, test_db):
+        response = client.get(
+            "/campsites/markers", headers={"Accept": MARKER_FEED_MEDIA_TYPE})
+        assert response.status_code == 200
+        assert response.headers['content-type'] == MARKER_FEED_MEDIA_TYPE
+        assert len(response.content) == 4 + 3 * 20
+
+        markers = unpack_markers(response.content)
+        assert markers['campsite_id'] == [1, 2, 3]
+        assert markers['latitude'][0] == pytest.approx(53.45645)
+        assert markers['average_rating'] == [5.0, 2.0, 0.0]
+
+    def test_markers_within_bbox(self, test_db):
+        response = client.get("/campsites/markers?bbox=-1.6,53.4,-1.5,53.5")
+        assert response.json()['campsite_id'] == [1]
+
+
+@pytest.mark.main
+class TestCampsiteConditionalRequests:
+    def test_list_304_when_etag_matches(self, test_db):
+        response = client.get("/campsites")
+        etag = response.headers['ETag']
+
+        response = client.get("/campsites", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert response.headers['Vary'] == "Accept-Encoding"
+        assert response.content == b""
+
+    def test_etag_is_weak_across_content_codings(self, test_db):
+        # the gzip and identity bodies differ, so they can't share a strong ETag
+        gzip_etag = client.get(
+            "/campsites", headers={"Accept-Encoding": "gzip"}).headers['ETag']
+        assert gzip_etag.startswith('W/"')
+        response = client.get("/campsites", headers={"Accept-Encoding": "identity",
+                                                     "If-None-Match": gzip_etag})
+        assert response.status_code == 304
+
+    def test_list_etag_changes_after_review(self, test_db):
+        etag = client.get("/campsites").headers['ETag']
+        client.post("/campsites/1/reviews",
+                    json={"rating": 1, "user_account_id": 1})
+
+        response = client.get("/campsites", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_list_etag_changes_after_new_campsite(self, test_db):
+        etag = client.get("/campsites").headers['ETag']
+        client.post("/campsites", json={
+            "user_account_id": 1,
+            "campsite_name": "TEST NAME",
+            "campsite_longitude": 1.23,
+            "campsite_latitude": 4.56,
+            "category_id": 3
+        })
+
+        response = client.get("/campsites", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(response.json()) == 4
+
+    def test_detail_304_when_etag_matches(self, test_db):
+        etag = client.get("/campsites/1").headers['ETag']
+        response = client.get("/campsites/1", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_detail_etag_is_per_campsite(self, test_db):
+        etag_1 = client.get("/campsites/1").headers['ETag']
+        etag_2 = client.get("/campsites/2").headers['ETag']
+        client.patch("/campsites/2/reviews/4",
+                     json={"user_account_id": 3, "rating": 4})
+
+        response_1 = client.get("/campsites/1", headers={"If-None-Match": etag_1})
+        response_2 = client.get("/campsites/2", headers={"If-None-Match": etag_2})
+        assert response_1.status_code == 304
+        assert response_2.status_code == 200
+        assert response_2.json()['average_rating'] == 4.0
+
+
+@pytest.mark.main
+class TestResponseCacheInvalidation:
+    def test_cached_list_refreshes_after_new_campsite(self, test_db):
+        assert len(client.get("/campsites").json()) == 3
+        client.post("/campsites", json={
+            "user_account_id": 1,
+            "campsite_name": "TEST NAME",
+            "campsite_longitude": 1.23,
+            "campsite_latitude": 4.56,
+            "category_id": 3
+        })
+        assert len(client.get("/campsites").json()) == 4
+
+    def test_cached_list_keeps_cursor_header(self, test_db):
+        first = client.get("/campsites?limit=1")
+        second = client.get("/campsites?limit=1")
+        assert second.headers['X-Next-Cursor'] == first.headers['X-Next-Cursor']
+
+    def test_cached_reviews_refresh_after_new_review(self, test_db):
+        assert len(client.get("/campsites/1/reviews").json()) == 3
+        client.post("/campsites/1/reviews",
+                    json={"rating": 4, "user_account_id": 2})
+        assert len(client.get("/campsites/1/reviews").json()) == 4
+
+    def test_cached_detail_refreshes_after_review_delete(self, test_db):
+        assert client.get("/campsites/2").json()['review_count'] == 1
+        client.delete("/campsites/2/reviews/4")
+        assert client.get("/campsites/2").json()['review_count'] == 0
+
+    def test_cached_detail_tagged_by_normalised_id(self, test_db):
+        client.get("/campsites/01")
+        assert response_cache.get("/campsites/01?").tags == {"campsite:1"}
+
+    def test_cached_list_refreshes_after_write_by_another_worker(self, test_db):
+        # another worker's write moves the shared version without touching
+        # this process's cache
+        etag = client.get("/campsites").headers['ETag']
+        test_db.get(CampsiteModel, 1).campsite_name = "Renamed"
+        bump_campsite_versions(test_db, 1)
+        test_db.commit()
+        response = client.get("/campsites", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert response.json()[0]['campsite_name'] == "Renamed"
+
+    def test_cached_favourites_refresh_after_changes(self, test_db):
+        assert len(client.get("/users/2/favourites").json()) == 0
+        client.post("/users/2/favourites/1")
+        assert len(client.get("/users/2/favourites").json()) == 1
+        client.delete("/users/2/favourites/1")
+        assert len(client.get("/users/2/favourites").json()) == 0
+
+    def test_cached_reviews_refresh_after_review_via_padded_id(self, test_db):
+        assert client.get("/campsites/3/reviews").json() == []
+        response = client.post("/campsites/03/reviews",
+                               json={"rating": 4, "user_account_id": 1})
+        assert response.status_code == 201
+        assert [review['rating'] for review in client.get("/campsites/3/reviews").json()] == [4]
+
+    def test_cached_favourites_refresh_after_change_via_padded_id(self, test_db):
+        assert len(client.get("/users/2/favourites").json()) == 0
+        assert client.post("/users/02/favourites/1").status_code == 201
+        assert len(client.get("/users/2/favourites").json()) == 1
+
+    def test_cached_favourites_refresh_after_campsite_review(self, test_db):
+        favourites = client.get("/users/1/favourites").json()
+        assert favourites[1]['review_count'] == 0
+        client.post("/campsites/3/reviews",
+                    json={"rating": 4, "user_account_id": 2})
+        favourites = client.get("/users/1/favourites").json()
+        assert favourites[1]['review_count'] == 1
+
+
+@pytest.mark.main
+class TestSparseFieldsets:
+    def test_list_returns_only_requested_fields(self, test_db):
+        response = client.get("/campsites?fields=campsite_id,campsite_name")
+        assert response.status_code == 200
+        assert response.json() == [
+            {"campsite_id": 1, "campsite_name": "CAMPSITE A"},
+            {"campsite_id": 2, "campsite_name": "CAMPSITE B"},
+            {"campsite_id": 3, "campsite_name": "CAMPSITE C"}
+        ]
+
+    def test_list_select_is_projected(self, test_db):
+        with QueryRecorder() as recorder:
+            client.get("/campsites?fields=campsite_name,average_rating")
+        # the ETag version lookup, then the cards
+        assert len(recorder.statements) == 2
+        assert "campsite_cards.campsite_name" in recorder.statements[1]
+        assert "campsite_cards.description" not in recorder.statements[1]
+
+    def test_list_requested_relationship_is_loaded(self, test_db):
+        response = client.get("/campsites?fields=campsite_id,photos,category")
+        campsites = response.json()
+        assert campsites[0]['photos'][0]['campsite_photo_url'] == "https://example.com/photo1.jpg"
+        assert campsites[0]['category']['category_name'] == "In The Wild"
+        assert 'contacts' not in campsites[0]
+
+    def test_list_fields_with_cursor(self, test_db):
+        first_page = client.get(
+            "/campsites?fields=campsite_name&sort_by=rating&limit=1")
+        cursor = first_page.headers['X-Next-Cursor']
+        second_page = client.get(
+            f"/campsites?fields=campsite_name&sort_by=rating&limit=1&cursor={cursor}")
+        assert second_page.json() == [{"campsite_name": "CAMPSITE B"}]
+
+    def test_detail_returns_only_requested_fields(self, test_db):
+        response = client.get("/campsites/1?fields=campsite_name,username")
+        assert response.status_code == 200
+        assert response.json() == {
+            "campsite_name": "CAMPSITE A", "username": "NatureExplorer"}
+
+    def test_favourites_return_only_requested_fields(self, test_db):
+        response = client.get(
+            "/users/1/favourites?fields=campsite_id,campsite_latitude")
+        assert response.status_code == 200
+        assert response.json() == [
+            {"campsite_id": 1, "campsite_latitude": 53.45645},
+            {"campsite_id": 3, "campsite_latitude": 53.123456}
+        ]
+
+    def test_400_unknown_field(self, test_db):
+        response = client.get("/campsites?fields=campsite_name,INVALID")
+        assert response.status_code == 400
+        assert response.json()['detail'] == "400 - Invalid Fields"
+
+    def test_400_list_only_allows_list_fields(self, test_db):
+        response = client.get("/campsites?fields=username")
+        assert response.status_code == 400
+
+
+@pytest.mark.main
+class TestCampsiteListQueryCounts:
+    def add_campsites(self, count):
+        for i in range(count):
+            client.post("/campsites", json={
+                "user_account_id": 1,
+                "campsite_name": f"EXTRA {i}",
+                "campsite_longitude": 1.23,
+                "campsite_latitude": 4.56,
+                "category_id": (i % 3) + 1,
+                "photos": [{"campsite_photo_url": f"https://example.com/extra{i}.jpg"}],
+                "contacts": [{"campsite_contact_name": "Bobby B", "campsite_contact_phone": "0987654321"}]
+            })
+
+    def test_list_query_count_is_constant(self, test_db):
+        with QueryRecorder() as recorder:
+            client.get("/campsites")
+        small_page_queries = len(recorder.statements)
+
+        self.add_campsites(10)
+        with QueryRecorder() as recorder:
+            response = client.get("/campsites")
+        assert len(response.json()) == 13
+        assert len(recorder.statements) == small_page_queries
+        assert small_page_queries <= 3
+
+    def test_favourites_query_count_is_constant(self, test_db):
+        with QueryRecorder() as recorder:
+            client.get("/users/1/favourites")
+        two_favourite_queries = len(recorder.statements)
+
+        self.add_campsites(5)
+        for campsite_id in range(4, 9):
+            client.post(f"/users/1/favourites/{campsite_id}")
+        with QueryRecorder() as recorder:
+            response = client.get("/users/1/favourites")
+        assert len(response.json()) == 7
+        assert len(recorder.statements) == two_favourite_queries
+
+
+@pytest.mark.main
+class TestCampsiteCards:
+    def test_list_is_one_card_scan(self, test_db):
+        with QueryRecorder() as recorder:
+            response = client.get("/campsites")
+        assert len(response.json()) == 3
+        # the ETag version lookup, then the cards
+        assert len(recorder.statements) == 2
+        assert "FROM campsite_versions" in recorder.statements[0]
+        assert "FROM campsite_cards" in recorder.statements[1]
+        assert "JOIN" not in recorder.statements[1]
+
+    def test_favourites_are_one_card_scan(self, test_db):
+        with QueryRecorder() as recorder:
+            response = client.get("/users/1/favourites")
+        assert [campsite["campsite_id"] for campsite in response.json()] == [1, 3]
+        # the user lookup, then the cards
+        assert len(recorder.statements) == 2
+        assert "FROM campsite_cards" in recorder.statements[1]
+
+    def test_cards_match_campsites(self, test_db):
+        listed = client.get("/campsites").json()[0]
+        detail = client.get("/campsites/1").json()
+        for field in ("campsite_name", "photos", "contacts", "category", "average_rating", "review_count"):
+            assert listed[field] == detail[field]
+
+    def test_new_campsite_card(self, test_db):
+        client.post("/campsites", json={
+            "user_account_id": 1,
+            "campsite_name": "TEST NAME",
+            "campsite_longitude": 1.23,
+            "campsite_latitude": 4.56,
+            "category_id": 3,
+            "photos": [{"campsite_photo_url": "https://example.com/new.jpg"}],
+            "contacts": [{"campsite_contact_name": "Bobby B", "campsite_contact_phone": "0987654321"}]
+        })
+        card = client.get("/campsites").json()[-1]
+        assert card["campsite_name"] == "TEST NAME"
+        assert card["photos"] == [{"campsite_photo_id": 3, "campsite_photo_url": "https://example.com/new.jpg", "campsite_id": 4}]
+        assert card["contacts"][0]["campsite_contact_name"] == "Bobby B"
+        assert card["category"]["category_id"] == 3
+
+    def test_review_writes_update_cards(self, test_db):
+        client.post("/campsites/3/reviews",
+                    json={"rating": 4, "user_account_id": 1})
+        card = client.get("/campsites").json()[2]
+        assert card["review_count"] == 1
+        assert card["average_rating"] == 4.0
+
+    def test_approval_photo_and_category_writes_update_cards(self, test_db):
+        test_db.get(CampsiteModel, 2).approved = True
+        test_db.add(CampsitePhotoModel(
+            campsite_id=2, campsite_photo_url="https://example.com/extra.jpg"))
+        test_db.get(CategoryModel, 2).category_name = "Renamed"
+        test_db.commit()
+        card = client.get("/campsites").json()[1]
+        assert card["approved"] is True
+        assert card["photos"][-1]["campsite_photo_url"] == "https://example.com/extra.jpg"
+        assert card["category"]["category_name"] == "Renamed"
+
+    def test_backfill_missing_cards(self, test_db):
+        test_db.query(CampsiteCardModel).delete()
+        test_db.commit()
+        Base.metadata.create_all(test_engine)
+        assert test_db.query(CampsiteCardModel).count() == 3
+
+
+@pytest.mark.main
+class TestResponseCompression:
+    def test_list_is_compressed_and_cached_compressed(self, test_db):
+        response = client.get(
+            "/campsites", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert len(response.json()) == 3
+
+        entry = response_cache.get("/campsites/?")
+        assert "gzip" in entry.encoded
+        compressed = entry.encoded["gzip"]
+        client.get("/campsites", headers={"Accept-Encoding": "gzip"})
+        assert response_cache.get("/campsites/?").encoded["gzip"] is compressed
+
+    def test_brotli_preferred(self, test_db):
+        response = client.get(
+            "/campsites", headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["content-encoding"] == "br"
+        assert len(response.json()) == 3
+
+    def test_uncompressed_without_accept_encoding(self, test_db):
+        response = client.get(
+            "/campsites", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert len(response.json()) == 3
+
+    def test_small_bodies_not_compressed(self, test_db):
+        response = client.get("/campsites/2/reviews",
+                              headers={"Accept-Encoding": "gzip"})
+        assert len(response.content) < COMPRESSION_MIN_BYTES
+        assert "content-encoding" not in response.headers
+
+    def test_map_feeds_are_compressed(self, test_db):
+        test_db.add_all([CampsiteModel(campsite_name=f"BULK {i}", campsite_longitude=-1.5 + i / 1000, campsite_latitude=53.5,
+                        user_account_id=1, category_id=1, approved=True) for i in range(100)])
+        test_db.commit()
+        for path in ("/campsites/markers", "/campsites/nearby?lat=53.5&lon=-1.5&k=100", "/campsites/clusters?zoom=22"):
+            response = client.get(path, headers={"Accept-Encoding": "gzip"})
+            assert response.headers["content-encoding"] == "gzip", path
+            assert "Accept-Encoding" in response.headers["vary"]
+            assert len(response.content) >= COMPRESSION_MIN_BYTES
+        response = client.get("/campsites/markers", headers={
+                              "Accept": MARKER_FEED_MEDIA_TYPE, "Accept-Encoding": "br"})
+        assert response.headers["content-encoding"] == "br"
+        assert response.headers["vary"] == "Accept, Accept-Encoding"
+        assert len(unpack_markers(response.content)['campsite_id']) == 103
+
+    def test_export_is_stream_compressed(self, test_db):
+        response = client.get("/campsites/export",
+                              headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        lines = response.text.strip().split("\n")
+        assert [json.loads(line)["campsite_id"] for line in lines] == [1, 2, 3]
+
+
+@pytest.mark.main
+class TestExportCampsites:
+    def test_streams_every_campsite_as_ndjson(self, test_db):
+        response = client.get("/campsites/export")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        campsites = [json.loads(line)
+                     for line in response.text.splitlines()]
+        assert [campsite['campsite_id'] for campsite in campsites] == [1, 2, 3]
+        assert campsites[0]['photos'][0]['campsite_photo_url'] == "https://example.com/photo1.jpg"
+        assert campsites[2]['contacts'][0]['campsite_contact_name'] == "Jack Doe"
+        assert campsites[0]['category']['category_name'] == "In The Wild"
+        assert campsites[0]['average_rating'] == 5.0
+        assert campsites[0]['rating_5_count'] == 3
+        assert campsites[1]['rating_2_count'] == 1
+
+    def test_not_capped_at_list_limit(self, test_db):
+        test_db.add_all([CampsiteModel(campsite_name=f"BULK {i}", campsite_longitude=1.23, campsite_latitude=4.56,
+                        user_account_id=1, category_id=1) for i in range(300)])
+        test_db.commit()
+        response = client.get("/campsites/export")
+        assert len(response.text.splitlines()) == 303
+
+    def test_reads_in_batches(self, test_db):
+        batches = list(stream_campsites(test_db, batch_size=2))
+        assert [[campsite.campsite_id for campsite in batch]
+                for batch in batches] == [[1, 2], [3]]
+
+
+def import_row(name, **fields):
+    return {"user_account_id": 1, "campsite_name": name, "campsite_longitude": -1.5,
+            "campsite_latitude": 53.5, "category_id": 1, **fields}
+
+
+@pytest.mark.main
+class TestImportCampsites:
+    def test_import_ndjson(self, test_db):
+        rows = [
+            import_row("IMPORTED A", photos=[{"campsite_photo_url": "https://example.com/imported.jpg"}],
+                       contacts=[{"campsite_contact_name": "Ida", "campsite_contact_phone": "0123"}],
+                       facilities=[{"facility_id": 1, "facility_name": "Wi-Fi",
+                                    "facility_img_url": "https://example.com/facility1.jpg"}]),
+            {"campsite_longitude": 1.0},
+            import_row("IMPORTED B", category_id=987654321),
+            import_row("IMPORTED C", opening_month="October", closing_month="March"),
+            import_row("IMPORTED D", user_account_id=987654321)
+        ]
+        body = "\n".join(json.dumps(row) for row in rows) + "\nnot json\n"
+        response = client.post("/campsites/import", content=body,
+                               headers={"Content-Type": "application/x-ndjson"})
+        assert response.status_code == 200
+        report = response.json()
+        assert report["imported"] == 2
+        assert report["campsite_ids"] == [4, 5]
+        assert [error["row"] for error in report["errors"]] == [2, 3, 5, 6]
+        assert "campsite_name: Field required" in report["errors"][0]["errors"]
+        assert report["errors"][1]["errors"] == [
+            "category_id: Category ID does not exist!"]
+        assert report["errors"][2]["errors"] == [
+            "user_account_id: Username not found for this campsite."]
+
+        campsite = client.get("/campsites/4").json()
+        assert campsite["photos"][0]["campsite_photo_url"] == "https://example.com/imported.jpg"
+        assert campsite["contacts"][0]["campsite_contact_name"] == "Ida"
+        assert [facility["facility_id"]
+                for facility in campsite["facilities"]] == [1]
+        assert [campsite["campsite_id"] for campsite in client.get(
+            "/campsites?open_in=January").json()] == [2, 3, 4, 5]
+
+    def test_import_csv(self, test_db):
+        body = ("user_account_id,campsite_name,campsite_longitude,campsite_latitude,category_id,parking_cost,photos,contacts\n"
+                "1,CSV A,-1.5,53.5,2,4.5,https://example.com/csv1.jpg|https://example.com/csv2.jpg,Ida;0123;ida@example.com\n"
+                "1,CSV B,-1.5,not a number,2,,,\n")
+        response = client.post("/campsites/import", content=body,
+                               headers={"Content-Type": "text/csv"})
+        report = response.json()
+        assert report["campsite_ids"] == [4]
+        assert report["errors"][0]["row"] == 2
+        campsite = client.get("/campsites/4").json()
+        assert campsite["parking_cost"] == 4.5
+        assert len(campsite["photos"]) == 2
+        assert campsite["contacts"][0]["campsite_contact_email"] == "ida@example.com"
+
+    def test_imported_campsites_are_indexed(self, test_db):
+        assert len(client.get("/campsites").json()) == 3
+        client.get("/campsites/autocomplete?prefix=imp")
+        client.post("/campsites/import", content=json.dumps(import_row("IMPORTED A")),
+                    headers={"Content-Type": "application/x-ndjson"})
+        assert len(client.get("/campsites").json()) == 4
+        assert [suggestion["campsite_id"] for suggestion in client.get(
+            "/campsites/autocomplete?prefix=imp").json()] == [4]
+
+    def test_inserts_in_chunks(self, test_db):
+        rows = [(row, import_row(f"CHUNKED {row}", photos=[{"campsite_photo_url": "https://example.com/c.jpg"}]), None)
+                for row in range(1, 6)]
+        with QueryRecorder() as recorder:
+            report = import_campsites(test_db, rows, chunk_size=2)
+        assert report["campsite_ids"] == [4, 5, 6, 7, 8]
+        # SQLite has no ordered multi-row RETURNING, so only the related rows
+        # show the one INSERT per chunk here
+        photo_inserts = [statement for statement in recorder.statements
+                         if statement.startswith("INSERT INTO campsite_photos ")]
+        assert len(photo_inserts) == 3
+        photos = test_db.query(CampsitePhotoModel.campsite_id).order_by(
+            CampsitePhotoModel.campsite_id).all()
+        assert [photo.campsite_id for photo in photos][-5:] == [4, 5, 6, 7, 8]
+
+    def test_415_unsupported_format(self, test_db):
+        response = client.post("/campsites/import", json=[import_row("A")])
+        assert response.status_code == 415
+
+
+@pytest.mark.main
+class TestWriteQueryCounts:
+    # one transaction per write, generated ids come back via RETURNING and
+    # nothing is refreshed after commit
+
+    def test_create_campsite(self, test_db):
+        with QueryRecorder() as recorder:
+            response = client.post("/campsites", json={
+                "user_account_id": 1,
+                "campsite_name": "TEST NAME",
+                "campsite_longitude": 1.23,
+                "campsite_latitude": 4.56,
+                "category_id": 3,
+                "photos": [{"campsite_photo_url": "https://example.com/new.jpg"}],
+                "contacts": [{"campsite_contact_name": "Bobby B", "campsite_contact_phone": "0987654321"}]
+            })
+        assert response.status_code == 201
+        assert response.json()["photos"][0]["campsite_photo_id"] == 3
+        assert response.json()["contacts"][0]["campsite_contact_id"] == 4
+        # category and username lookups, then campsite, contact and photo
+        # INSERTs and the version upsert
+        assert len(recorder.statements) == 6
+
+    def test_create_review(self, test_db):
+        with QueryRecorder() as recorder:
+            response = client.post("/campsites/3/reviews",
+                                   json={"rating": 4, "user_account_id": 1})
+        assert response.status_code == 201
+        assert response.json()["review_id"] == 5
+        # aggregate UPDATE, username lookup, review INSERT, version upsert
+        assert len(recorder.statements) == 4
+
+    def test_update_user_xp(self, test_db):
+        with QueryRecorder() as recorder:
+            response = client.patch("/users/1/25")
+        assert response.json()["xp"] == 525
+        assert len(recorder.statements) == 1
+        assert "RETURNING" in recorder.statements[0]
+
+    def test_create_user(self, test_db):
+        with QueryRecorder() as recorder:
+            response = client.post(
+                "/auth", json={"username": "Rich1234", "password": "secret123!"})
+        assert response.status_code == 201
+        assert len(recorder.statements) == 1
+        assert "RETURNING" in recorder.statements[0]
+
+
+@pytest.mark.main
+class TestAsyncReads:
+    def test_read_routes_use_async_engine(self, test_db):
+        with QueryRecorder(test_engine) as sync_recorder, QueryRecorder(test_async_engine.sync_engine) as async_recorder:
+            assert client.get("/campsites").status_code == 200
+            assert client.get("/campsites/1").status_code == 200
+            assert client.get("/campsites/1/reviews").status_code == 200
+            assert client.get("/users/1/favourites").status_code == 200
+        assert async_recorder.statements
+        # only the current user lookup behind the token goes through the sync session
+        assert not [statement for statement in sync_recorder.statements
+                    if "campsites" in statement or "reviews" in statement]
+
+    def test_async_reads(self, test_db):
+        async def read_async():
+            async with AsyncTestSession() as db:
+                return (await read_campsites_async(db, limit=1, sort_by="rating", facets={"facility_id": [2]}),
+                        await read_campsite_by_id_async(db, 1))
+
+        (campsites, next_cursor), campsite = asyncio.run(read_async())
+        assert [site.campsite_id for site in campsites] == [1]
+        assert next_cursor == encode_cursor("rating", 5.0, 1)
+        assert campsite.campsite_id == 1
+        assert campsite.campsite_name == "CAMPSITE A"
+
+    def test_async_reads_see_sync_writes(self, test_db):
+        client.post("/campsites/3/reviews",
+                    json={"rating": 4, "user_account_id": 1})
+        response = client.get("/campsites/3/reviews")
+        assert [review["rating"] for review in response.json()] == [4]
+        assert client.get("/campsites/3").json()["review_count"] == 1
+
+    def test_non_numeric_ids(self, test_db):
+        assert client.get("/campsites/INVALID").status_code == 404
+        assert client.get("/campsites/INVALID/reviews").json() == []
+        assert client.get("/users/INVALID/favourites").status_code == 404
+
+    def test_ids_out_of_integer_range(self, test_db):
+        too_big = 2 ** 63
+        assert client.get(f"/campsites/{too_big}").status_code == 404
+        assert client.get(f"/campsites/{too_big}/reviews").json() == []
+        assert client.get(f"/users/{too_big}/favourites").status_code == 404
+
+
+@pytest.mark.main
+class TestCampsiteFacets:
+    def test_facet_counts(self, test_db):
+        response = client.get("/campsites/facets")
+        assert response.status_code == 200
+        assert response.json() == {
+            "total": 3,
+            "category_id": {"1": 1, "2": 1, "3": 1},
+            "facility_id": {"1": 1, "2": 2},
+            "activity_id": {"2": 1},
+            "parking_cost": {"free": 1, "under_10": 0, "10_to_20": 2, "20_plus": 0},
+            "facilities_cost": {"free": 1, "under_10": 0, "10_to_20": 0, "20_plus": 2},
+            "approved": {"false": 1, "true": 2}
+        }
+
+    def test_facet_counts_follow_filters(self, test_db):
+        response = client.get("/campsites/facets?approved=true&facility_id=2")
+        counts = response.json()
+        assert counts["total"] == 2
+        assert counts["category_id"] == {"1": 1, "2": 0, "3": 1}
+        assert counts["activity_id"] == {"2": 1}
+        assert counts["parking_cost"]["10_to_20"] == 1
+
+    def test_facet_counts_include_new_campsite(self, test_db):
+        client.get("/campsites/facets")
+        client.post("/campsites", json={
+            "user_account_id": 1,
+            "campsite_name": "New Campsite",
+            "campsite_longitude": 1.23,
+            "campsite_latitude": 4.56,
+            "parking_cost": 5,
+            "category_id": 3
+        })
+        counts = client.get("/campsites/facets").json()
+        assert counts["total"] == 4
+        assert counts["parking_cost"]["under_10"] == 1
+
+    def test_filter_by_category(self, test_db):
+        response = client.get("/campsites?category_id=1&category_id=3")
+        assert [campsite['campsite_id'] for campsite in response.json()] == [1, 3]
+
+    def test_filter_by_facilities_requires_all(self, test_db):
+        response = client.get("/campsites?facility_id=2")
+        assert [campsite['campsite_id'] for campsite in response.json()] == [1, 3]
+        response = client.get("/campsites?facility_id=1&facility_id=2")
+        assert [campsite['campsite_id'] for campsite in response.json()] == [1]
+
+    def test_filter_and_counts_see_links_added_by_another_worker(self, test_db):
+        assert [campsite['campsite_id'] for campsite in client.get("/campsites?facility_id=1").json()] == [1]
+        assert client.get("/campsites/facets").json()["facility_id"]["1"] == 1
+        test_db.execute(insert(campsites_facilities).values(
+            campsite_id=3, facility_id=1))
+        bump_campsite_versions(test_db, 3)
+        test_db.commit()
+        assert [campsite['campsite_id'] for campsite in client.get("/campsites?facility_id=1").json()] == [1, 3]
+        assert client.get("/campsites/facets").json()["facility_id"]["1"] == 2
+
+    def test_facility_filter_is_a_semi_join(self, test_db):
+        with QueryRecorder() as recorder:
+            client.get("/campsites?facility_id=1&facility_id=2")
+        assert recorder.statements[-1].count(
+            "SELECT campsites_facilities.campsite_id") == 2
+
+    def test_filter_by_activity(self, test_db):
+        response = client.get("/campsites?activity_id=2")
+        assert [campsite['campsite_id'] for campsite in response.json()] == [3]
+
+    def test_filter_by_cost_range(self, test_db):
+        response = client.get("/campsites?parking_cost=10_to_20")
+        assert [campsite['campsite_id'] for campsite in response.json()] == [2, 3]
+        response = client.get("/campsites?facilities_cost=free")
+        assert [campsite['campsite_id'] for campsite in response.json()] == [1]
+
+    def test_filter_by_approval(self, test_db):
+        response = client.get("/campsites?approved=false")
+        assert [campsite['campsite_id'] for campsite in response.json()] == [2]
+
+    def test_list_and_counts_agree(self, test_db):
+        query = "approved=true&parking_cost=free&parking_cost=10_to_20&facility_id=2"
+        campsites = client.get(f"/campsites?{query}").json()
+        counts = client.get(f"/campsites/facets?{query}").json()
+        assert len(campsites) == counts["total"] == 2
+
+    def test_counts_follow_bbox_and_months(self, test_db):
+        bbox = "bbox=-1.6,53.4,-1.5,53.5"
+        counts = client.get(f"/campsites/facets?{bbox}").json()
+        assert counts["total"] == 1
+        assert counts["category_id"] == {"1": 1, "2": 0, "3": 0}
+        counts = client.get("/campsites/facets?open_in=jan").json()
+        assert counts["total"] == 2
+        assert counts["approved"] == {"false": 1, "true": 1}
+        assert client.get("/campsites/facets?open_in=Smarch").status_code == 400
+
+    def test_list_and_counts_agree_with_bbox_and_months(self, test_db):
+        this_month = datetime.now(timezone.utc).month
+        for query in ("bbox=-2,53,-1,54&open_in=jan&facility_id=2", "open_now=true&approved=true",
+                      f"open_in={this_month}&approved=true"):
+            campsites = client.get(f"/campsites?{query}").json()
+            counts = client.get(f"/campsites/facets?{query}").json()
+            assert len(campsites) == counts["total"], query
+
+    def test_new_campsite_facilities_are_filterable(self, test_db):
+        client.get("/campsites?facility_id=1")
+        client.post("/campsites", json={
+            "user_account_id": 1,
+            "campsite_name": "New Campsite",
+            "campsite_longitude": 1.23,
+            "campsite_latitude": 4.56,
+            "category_id": 3,
+            "facilities": [
+                {"facility_id": 1, "facility_name": "Wi-Fi",
+                    "facility_img_url": "https://example.com/facility1.jpg"},
+                {"facility_id": 2, "facility_name": "Shower",
+                    "facility_img_url": "https://example.com/facility2.jpg"}
+            ]
+        })
+        response = client.get("/campsites?facility_id=1&facility_id=2")
+        assert [campsite['campsite_id'] for campsite in response.json()] == [1, 4]
+        counts = client.get("/campsites/facets").json()
+        assert counts["facility_id"] == {"1": 2, "2": 3}
+
+    def test_422_invalid_cost_range(self, test_db):
+        response = client.get("/campsites?parking_cost=cheap")
+        assert response.status_code == 422
+
+
+@pytest.mark.main
+class TestCampsiteOpenMonths:
+    def test_open_in_month(self, test_db):
+        response = client.get("/campsites?open_in=July")
+        assert response.status_code == 200
+        assert [campsite['campsite_id'] for campsite in response.json()] == [1, 2, 3]
+        response = client.get("/campsites?open_in=jan")
+        assert [campsite['campsite_id'] for campsite in response.json()] == [2, 3]
+
+    def test_open_in_wrapping_season(self, test_db):
+        client.post("/campsites", json={
+            "user_account_id": 1,
+            "campsite_name": "Winter Camp",
+            "campsite_longitude": 1.23,
+            "campsite_latitude": 4.56,
+            "category_id": 3,
+            "opening_month": "October",
+            "closing_month": "March"
+        })
+        response = client.get("/campsites?open_in=1")
+        assert [campsite['campsite_id'] for campsite in response.json()] == [2, 3, 4]
+        response = client.get("/campsites?open_in=June")
+        assert [campsite['campsite_id'] for campsite in response.json()] == [1, 2, 3]
+
+    def test_open_now(self, test_db):
+        this_month = datetime.now(timezone.utc).month
+        open_now = client.get("/campsites?open_now=true")
+        assert open_now.status_code == 200
+        assert open_now.json() == client.get(
+            f"/campsites?open_in={this_month}").json()
+        assert open_now.headers["ETag"] != client.get(
+            "/campsites").headers["ETag"]
+
+    def test_400_invalid_month(self, test_db):
+        response = client.get("/campsites?open_in=Smarch")
+        assert response.status_code == 400
+        assert response.json()["detail"] == "400 - Invalid Month"
+
+
+@pytest.mark.main
+class TestSearchCampsites:
+    def test_search_description(self, test_db):
+        response = client.get("/campsites/search?q=river")
+        assert response.status_code == 200
+        campsites = response.json()
+        assert [campsite['campsite_id'] for campsite in campsites] == [3]
+        assert campsites[0]['category']['category_name'] == "Campsite"
+
+    def test_search_matches_prefixes(self, test_db):
+        response = client.get("/campsites/search?q=sun")
+        assert [campsite['campsite_id'] for campsite in response.json()] == [2]
+
+    def test_all_terms_must_match(self, test_db):
+        response = client.get("/campsites/search?q=setting picturesque")
+        assert [campsite['campsite_id'] for campsite in response.json()] == [3]
+
+    def test_name_matches_rank_first(self, test_db):
+        client.post("/campsites", json={
+            "user_account_id": 1,
+            "campsite_name": "River Camp",
+            "campsite_longitude": 1.23,
+            "campsite_latitude": 4.56,
+            "category_id": 3
+        })
+        response = client.get("/campsites/search?q=river")
+        assert [campsite['campsite_name'] for campsite in response.json()] == [
+            "River Camp", "CAMPSITE C"]
+
+    def test_search_is_paginated(self, test_db):
+        first_page = client.get("/campsites/search?q=campsite&limit=2").json()
+        second_page = client.get(
+            "/campsites/search?q=campsite&limit=2&skip=2").json()
+        assert len(first_page) == 2
+        assert len(second_page) == 1
+        campsite_ids = [campsite['campsite_id']
+                        for campsite in first_page + second_page]
+        assert sorted(campsite_ids) == [1, 2, 3]
+
+    def test_punctuation_is_ignored(self, test_db):
+        response = client.get('/campsites/search?q="river*) OR')
+        assert response.status_code == 200
+        assert response.json() == []
+
+    def test_no_results(self, test_db):
+        response = client.get("/campsites/search?q=volcano")
+        assert response.json() == []
+
+    def test_422_missing_query(self, test_db):
+        response = client.get("/campsites/search")
+        assert response.status_code == 422
+
+    def test_fuzzy_search_tolerates_typos(self, test_db):
+        client.post("/campsites", json={
+            "user_account_id": 1,
+            "campsite_name": "Whispering Pines",
+            "campsite_longitude": 1.23,
+            "campsite_latitude": 4.56,
+            "category_id": 3
+        })
+        assert client.get(
+            "/campsites/search?q=Whisperng Pines").json() == []
+        response = client.get("/campsites/search?q=Whisperng Pines&fuzzy=true")
+        assert response.status_code == 200
+        assert [campsite['campsite_name']
+                for campsite in response.json()] == ["Whispering Pines"]
+
+    def test_fuzzy_search_ranks_by_similarity(self, test_db):
+        response = client.get("/campsites/search?q=campsit a&fuzzy=true")
+        campsite_ids = [campsite['campsite_id'] for campsite in response.json()]
+        assert campsite_ids[0] == 1
+        assert sorted(campsite_ids) == [1, 2, 3]
+
+    def test_fuzzy_search_no_results(self, test_db):
+        response = client.get("/campsites/search?q=volcano&fuzzy=true")
+        assert response.json() == []
+
+
+@pytest.mark.main
+class TestCampsiteAutocomplete:
+    def test_suggestions_ordered_by_rating(self, test_db):
+        response = client.get("/campsites/autocomplete?prefix=camp")
+        assert response.status_code == 200
+        assert response.json() == [
+            {"campsite_id": 1, "campsite_name": "CAMPSITE A", "average_rating": 5.0},
+            {"campsite_id": 2, "campsite_name": "CAMPSITE B", "average_rating": 2.0},
+            {"campsite_id": 3, "campsite_name": "CAMPSITE C", "average_rating": 0.0}
+        ]
+
+    def test_limit(self, test_db):
+        response = client.get("/campsites/autocomplete?prefix=camp&limit=1")
+        assert [suggestion['campsite_id']
+                for suggestion in response.json()] == [1]
+
+    def test_new_campsite_is_suggested(self, test_db):
+        client.get("/campsites/autocomplete?prefix=whi")
+        client.post("/campsites", json={
+            "user_account_id": 1,
+            "campsite_name": "Whispering Pines",
+            "campsite_longitude": 1.23,
+            "campsite_latitude": 4.56,
+            "category_id": 3
+        })
+        response = client.get("/campsites/autocomplete?prefix=pin")
+        assert [suggestion['campsite_name']
+                for suggestion in response.json()] == ["Whispering Pines"]
+
+    def test_rating_change_reorders_suggestions(self, test_db):
+        client.get("/campsites/autocomplete?prefix=camp")
+        client.post("/campsites/3/reviews",
+                    json={"rating": 4, "user_account_id": 1})
+        with QueryRecorder() as recorder:
+            response = client.get("/campsites/autocomplete?prefix=camp")
+        assert [suggestion['campsite_id']
+                for suggestion in response.json()] == [1, 3, 2]
+        assert response.json()[1]['average_rating'] == 4.0
+        # the review patched the rating in place, no reload
+        assert not [statement for statement in recorder.statements
+                    if "FROM campsites" in statement]
+
+    def test_reseed_resets_suggestions(self, test_db):
+        client.post("/campsites", json={
+            "user_account_id": 1,
+            "campsite_name": "Whispering Pines",
+            "campsite_longitude": 1.23,
+            "campsite_latitude": 4.56,
+            "category_id": 3
+        })
+        assert len(client.get("/campsites/autocomplete?prefix=pin").json()) == 1
+        Base.metadata.drop_all(test_engine)
+        Base.metadata.create_all(test_engine)
+        reseed_session = TestSession()
+        seed_database(reseed_session, get_test_data())
+        reseed_session.close()
+        assert client.get("/campsites/autocomplete?prefix=pin").json() == []
+        assert client.get(
+            "/campsites/search?q=whispering pines&fuzzy=true").json() == []
+
+    def test_422_limit_above_maximum(self, test_db):
+        response = client.get("/campsites/autocomplete?prefix=camp&limit=11")
+        assert response.status_code == 422
+
+
 @pytest.mark.main
 class TestGetCampsiteById:
     def test_read_campsites_by_campsite_id(self, test_db):
@@ -375,6 +1583,18 @@ class TestGetCampsiteById:
         assert response.status_code == 200
         assert response.json()['campsite_id'] == 1
 
+    def test_includes_facilities_and_activities(self, test_db):
+        response = client.get("/campsites/3")
+        campsite = response.json()
+        assert campsite['facilities'] == [
+            {"facility_id": 2, "facility_name": "Shower",
+                "facility_img_url": "https://example.com/facility2.jpg"}
+        ]
+        assert campsite['activities'] == [
+            {"activity_id": 2, "activity_name": "Fishing",
+                "activity_img_url": "https://example.com/activity2.jpg"}
+        ]
+
     def test_404_campsite_not_found(self, test_db):
         response = client.get("/campsites/987654321")
         assert response.status_code == 404
@@ -878,3 +2098,63 @@ class TestUpdateCampsiteAverageRatingUtility:
 
         assert response.status_code == 201
         assert campsite_after_first_review['average_rating'] != campsite_after_second_review["average_rating"]
+
+
+@pytest.mark.main
+class TestCampsiteRatingAggregates:
+    def test_seeded_aggregates(self, test_db):
+        campsites = client.get("/campsites").json()
+        assert campsites[0]['review_count'] == 3
+        assert campsites[0]['average_rating'] == 5.0
+        assert campsites[1]['review_count'] == 1
+        assert campsites[1]['average_rating'] == 2.0
+        assert campsites[2]['review_count'] == 0
+        assert campsites[2]['average_rating'] == 0.0
+
+    def test_post_review_updates_aggregates(self, test_db):
+        request_body = {"rating": 1, "user_account_id": 1}
+        client.post("/campsites/1/reviews", json=request_body)
+
+        campsite = client.get("/campsites/1").json()
+        assert campsite['review_count'] == 4
+        assert campsite['average_rating'] == 4.0
+
+    def test_patch_review_updates_aggregates(self, test_db):
+        request_body = {"user_account_id": 3, "rating": 4}
+        response = client.patch("/campsites/2/reviews/4", json=request_body)
+        assert response.status_code == 200
+        assert response.json()['username'] == 'ForestFanatic'
+
+        campsite = client.get("/campsites/2").json()
+        assert campsite['review_count'] == 1
+        assert campsite['average_rating'] == 4.0
+
+    def test_delete_review_updates_aggregates(self, test_db):
+        client.delete("/campsites/2/reviews/4")
+
+        campsite = client.get("/campsites/2").json()
+        assert campsite['review_count'] == 0
+        assert campsite['average_rating'] == 0.0
+
+    def test_repeated_delete_subtracts_once(self, test_db):
+        client.post("/campsites/2/reviews",
+                    json={"rating": 5, "user_account_id": 1})
+        assert client.delete("/campsites/2/reviews/4").status_code == 204
+        assert client.delete("/campsites/2/reviews/4").status_code == 404
+
+        campsite = client.get("/campsites/2").json()
+        assert campsite['review_count'] == 1
+        assert campsite['average_rating'] == 5.0
+
+    def test_histogram_tracks_each_star(self, test_db):
+        client.post("/campsites/1/reviews",
+                    json={"rating": 3, "user_account_id": 2})
+        client.patch("/campsites/1/reviews/1",
+                     json={"user_account_id": 1, "rating": 4})
+
+        campsite = test_db.get(CampsiteModel, 1)
+        test_db.refresh(campsite)
+        assert campsite.rating_5_count == 2
+        assert campsite.rating_4_count == 1
+        assert campsite.rating_3_count == 1
+        assert campsite.rating_sum == 17
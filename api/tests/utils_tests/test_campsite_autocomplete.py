@@ -0,0 +1,94 @@
+import pytest
+from api.utils.campsite_autocomplete import CampsiteAutocomplete, normalise_name, MAX_SUGGESTIONS
+
+
+def suggested_ids(autocomplete, prefix, limit=MAX_SUGGESTIONS):
+    return [suggestion['campsite_id'] for suggestion in autocomplete.suggest(prefix, limit)]
+
+
+@pytest.mark.utils
+class TestCampsiteAutocompleteUtil:
+
+    def test_normalise_name(self):
+        assert normalise_name("  Café  du Lac!") == "cafe du lac"
+        assert normalise_name(None) == ""
+
+    def test_prefix_of_name(self):
+        autocomplete = CampsiteAutocomplete()
+        autocomplete.build([(1, "Whispering Pines", 4.0),
+                           (2, "Willow Bank", 3.0)])
+        assert suggested_ids(autocomplete, "whi") == [1]
+        assert suggested_ids(autocomplete, "W") == [1, 2]
+        assert suggested_ids(autocomplete, "x") == []
+
+    def test_prefix_of_later_word(self):
+        autocomplete = CampsiteAutocomplete()
+        autocomplete.build([(1, "Whispering Pines", 4.0)])
+        assert suggested_ids(autocomplete, "pin") == [1]
+        assert suggested_ids(autocomplete, "spering") == []
+
+    def test_ordered_by_rating(self):
+        autocomplete = CampsiteAutocomplete()
+        autocomplete.build([(1, "Camp One", 2.0), (2, "Camp Two",
+                           5.0), (3, "Camp Three", None)])
+        assert suggested_ids(autocomplete, "camp") == [2, 1, 3]
+
+    def test_keeps_only_top_suggestions(self):
+        autocomplete = CampsiteAutocomplete()
+        autocomplete.build([(i, f"Camp {i}", float(i % 5))
+                           for i in range(50)])
+        suggestions = autocomplete.suggest("camp")
+        assert len(suggestions) == MAX_SUGGESTIONS
+        assert all(suggestion['average_rating'] ==
+                   4.0 for suggestion in suggestions)
+        assert len(autocomplete.suggest("camp", 3)) == 3
+
+    def test_campsite_listed_once_per_prefix(self):
+        autocomplete = CampsiteAutocomplete()
+        autocomplete.build([(1, "Camp Campbell", 4.0)])
+        assert suggested_ids(autocomplete, "camp") == [1]
+
+    def test_insert_after_build(self):
+        autocomplete = CampsiteAutocomplete()
+        autocomplete.build([(1, "Camp One", 2.0)])
+        autocomplete.insert(2, "Camp Two", 3.0)
+        assert suggested_ids(autocomplete, "camp") == [2, 1]
+
+    def test_update_rating_reorders(self):
+        autocomplete = CampsiteAutocomplete()
+        autocomplete.build([(1, "Camp One", 2.0), (2, "Camp Two", 3.0)])
+        autocomplete.update_rating(1, 4.5)
+        assert suggested_ids(autocomplete, "camp") == [1, 2]
+        assert autocomplete.suggest("one")[0]['average_rating'] == 4.5
+
+    def test_insert_is_idempotent(self):
+        autocomplete = CampsiteAutocomplete()
+        autocomplete.build([(1, "Camp One", 2.0)])
+        autocomplete.insert(1, "Camp One", 2.0)
+        assert suggested_ids(autocomplete, "one") == [1]
+
+    def test_empty_prefix(self):
+        autocomplete = CampsiteAutocomplete()
+        autocomplete.build([(1, "Camp One", 2.0)])
+        assert suggested_ids(autocomplete, "!!") == []
+
+    def test_insert_ignored_until_loaded(self):
+        autocomplete = CampsiteAutocomplete()
+        autocomplete.insert(1, "Camp One", 2.0)
+        assert suggested_ids(autocomplete, "camp") == []
+
+    def test_build_started_before_invalidate_is_discarded(self):
+        autocomplete = CampsiteAutocomplete()
+        generation = autocomplete.generation
+        autocomplete.invalidate()
+        autocomplete.build([(1, "Camp One", 2.0)], generation)
+        assert autocomplete.loaded is False
+        assert suggested_ids(autocomplete, "camp") == []
+
+    def test_build_started_before_ignored_insert_is_discarded(self):
+        # the insert's row may be missing from the entries being built
+        autocomplete = CampsiteAutocomplete()
+        generation = autocomplete.generation
+        autocomplete.insert(2, "Camp Two", 3.0)
+        autocomplete.build([(1, "Camp One", 2.0)], generation)
+        assert autocomplete.loaded is False
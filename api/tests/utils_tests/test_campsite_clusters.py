@@ -0,0 +1,77 @@
+import pytest
+import random
+from api.utils.campsite_clusters import CampsiteClusterIndex, mercator_x, mercator_y, latitude_from_y, longitude_from_x, MAX_ZOOM
+
+
+@pytest.mark.utils
+class TestCampsiteClustersUtil:
+
+    def test_mercator_round_trip(self):
+        assert latitude_from_y(mercator_y(53.45645)) == pytest.approx(53.45645)
+        assert longitude_from_x(mercator_x(-1.54322)) == pytest.approx(-1.54322)
+
+    def test_empty_index(self):
+        index = CampsiteClusterIndex()
+        index.build([])
+        assert index.clusters(0) == []
+
+    def test_counts_are_preserved_at_every_zoom(self):
+        rng = random.Random(1)
+        entries = [(i, rng.uniform(49, 59), rng.uniform(-8, 2))
+                   for i in range(300)]
+        index = CampsiteClusterIndex()
+        index.build(entries)
+
+        for zoom in range(MAX_ZOOM + 2):
+            assert sum(cluster['count']
+                       for cluster in index.clusters(zoom)) == 300
+
+    def test_clusters_split_as_zoom_increases(self):
+        rng = random.Random(2)
+        entries = [(i, rng.uniform(49, 59), rng.uniform(-8, 2))
+                   for i in range(300)]
+        index = CampsiteClusterIndex()
+        index.build(entries)
+
+        cluster_counts = [len(index.clusters(zoom))
+                          for zoom in range(MAX_ZOOM + 2)]
+        assert cluster_counts == sorted(cluster_counts)
+        assert cluster_counts[0] < 5
+        assert cluster_counts[-1] == 300
+
+    def test_single_campsites_keep_their_id(self):
+        index = CampsiteClusterIndex()
+        index.build([(7, 53.0, -1.0)])
+        cluster = index.clusters(0)[0]
+        assert cluster['count'] == 1
+        assert cluster['campsite_id'] == 7
+        assert cluster['latitude'] == pytest.approx(53.0)
+        assert cluster['longitude'] == pytest.approx(-1.0)
+
+    def test_merged_cluster_centroid_is_weighted(self):
+        index = CampsiteClusterIndex()
+        index.build([(1, 0.0, 0.0), (2, 0.0, 0.02)])
+        cluster = index.clusters(0)[0]
+        assert cluster['count'] == 2
+        assert cluster['campsite_id'] is None
+        assert cluster['longitude'] == pytest.approx(0.01)
+
+    def test_bbox_filters_clusters(self):
+        index = CampsiteClusterIndex()
+        index.build([(1, 53.0, -1.0), (2, 40.0, -74.0)])
+        clusters = index.clusters(MAX_ZOOM + 1, (-2.0, 52.0, 0.0, 54.0))
+        assert [cluster['campsite_id'] for cluster in clusters] == [1]
+
+    def test_build_started_before_invalidate_is_discarded(self):
+        index = CampsiteClusterIndex()
+        generation = index.generation
+        index.invalidate()
+        index.build([(1, 53.0, -1.0)], generation)
+        assert index.loaded is False
+        assert index.clusters(MAX_ZOOM + 1) == []
+
+    def test_bbox_across_antimeridian(self):
+        index = CampsiteClusterIndex()
+        index.build([(1, 0.0, 179.5), (2, 0.0, -179.5), (3, 0.0, 0.0)])
+        clusters = index.clusters(MAX_ZOOM + 1, (179.0, -1.0, -179.0, 1.0))
+        assert sorted(cluster['campsite_id'] for cluster in clusters) == [1, 2]
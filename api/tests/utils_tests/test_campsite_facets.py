@@ -0,0 +1,106 @@
+import pytest
+from api.utils.campsite_facets import CampsiteFacetIndex, cost_range, bit_ids, id_bitmap
+
+
+def build_index():
+    index = CampsiteFacetIndex()
+    index.build(
+        [(1, 1, True, None, 0), (2, 2, False, 14, 27), (3, 1, True, 5, 12)],
+        facility_links=[(1, 1), (1, 2), (3, 2)],
+        activity_links=[(3, 1)]
+    )
+    return index
+
+
+def matching_ids(index, filters):
+    return bit_ids(index.matching(filters))
+
+
+@pytest.mark.utils
+class TestCampsiteFacetIndex:
+
+    def test_cost_range(self):
+        assert cost_range(None) == "free"
+        assert cost_range(0) == "free"
+        assert cost_range(9.99) == "under_10"
+        assert cost_range(10) == "10_to_20"
+        assert cost_range(20) == "20_plus"
+
+    def test_no_filters_match_everything(self):
+        assert matching_ids(build_index(), {}) == [1, 2, 3]
+
+    def test_single_valued_facets_match_any_value(self):
+        index = build_index()
+        assert matching_ids(index, {"category_id": [1]}) == [1, 3]
+        assert matching_ids(index, {"category_id": [1, 2]}) == [1, 2, 3]
+        assert matching_ids(
+            index, {"parking_cost": ["free", "under_10"]}) == [1, 3]
+
+    def test_multi_valued_facets_match_every_value(self):
+        index = build_index()
+        assert matching_ids(index, {"facility_id": [2]}) == [1, 3]
+        assert matching_ids(index, {"facility_id": [1, 2]}) == [1]
+        assert matching_ids(index, {"facility_id": [3]}) == []
+
+    def test_facets_combine(self):
+        index = build_index()
+        assert matching_ids(
+            index, {"facility_id": [2], "activity_id": [1]}) == [3]
+        assert matching_ids(
+            index, {"approved": [False], "category_id": [1]}) == []
+
+    def test_counts(self):
+        counts = build_index().counts({"approved": [True]})
+        assert counts["total"] == 2
+        assert counts["category_id"] == {1: 2, 2: 0}
+        assert counts["facility_id"] == {1: 1, 2: 2}
+        assert counts["activity_id"] == {1: 1}
+        assert counts["parking_cost"] == {
+            "free": 1, "under_10": 1, "10_to_20": 0, "20_plus": 0}
+        assert counts["facilities_cost"] == {
+            "free": 1, "under_10": 0, "10_to_20": 1, "20_plus": 0}
+        assert counts["approved"] == {False: 0, True: 2}
+
+    def test_bit_ids(self):
+        assert bit_ids(0) == []
+        assert bit_ids(0b101010) == [1, 3, 5]
+        assert bit_ids(1 << 100) == [100]
+
+    def test_id_bitmap(self):
+        assert id_bitmap([]) == 0
+        assert bit_ids(id_bitmap([5, 1, 3])) == [1, 3, 5]
+
+    def test_counts_within(self):
+        index = build_index()
+        counts = index.counts({"approved": [True]}, within=id_bitmap([1, 2]))
+        assert counts["total"] == 1
+        assert counts["category_id"] == {1: 1, 2: 0}
+        assert counts["facility_id"] == {1: 1, 2: 1}
+        assert index.counts(within=0)["total"] == 0
+
+    def test_insert_after_build(self):
+        index = build_index()
+        index.insert(4, 2, True, 3, None, facility_ids=[1, 2], activity_ids=[1])
+        assert matching_ids(index, {"facility_id": [1, 2]}) == [1, 4]
+        assert matching_ids(index, {"activity_id": [1]}) == [3, 4]
+        assert matching_ids(index, {"parking_cost": ["under_10"]}) == [3, 4]
+        assert index.counts()["total"] == 4
+
+    def test_insert_ignored_until_loaded(self):
+        index = CampsiteFacetIndex()
+        index.insert(1, 1, True, None, None, facility_ids=[1])
+        assert index.matching({"facility_id": [1]}) == 0
+
+    def test_build_started_before_invalidate_is_discarded(self):
+        index = CampsiteFacetIndex()
+        generation = index.generation
+        index.invalidate()
+        index.build([(1, 1, True, None, 0)], generation=generation)
+        assert not index.loaded
+        assert index.counts()["total"] == 0
+
+    def test_invalidate(self):
+        index = build_index()
+        index.invalidate()
+        assert not index.loaded
+        assert index.counts()["total"] == 0
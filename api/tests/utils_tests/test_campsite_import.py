@@ -0,0 +1,60 @@
+import pytest
+from fastapi import HTTPException
+from api.utils.campsite_import import parse_ndjson_rows, parse_csv_rows, parse_import_rows
+
+
+@pytest.mark.utils
+class TestCampsiteImportUtil:
+
+    def test_parse_ndjson_rows(self):
+        text = '{"campsite_name": "A"}\n\n[1, 2]\nnot json\n{"campsite_name": "B"}'
+        assert list(parse_ndjson_rows(text)) == [
+            (1, {"campsite_name": "A"}, None),
+            (3, None, ["Row must be a JSON object"]),
+            (4, None, ["Row is not valid JSON"]),
+            (5, {"campsite_name": "B"}, None)
+        ]
+
+    def test_parse_csv_rows(self):
+        text = ("campsite_name,parking_cost,photos\n"
+                "A,,https://example.com/a.jpg | https://example.com/b.jpg\n"
+                "B,4.5,\n"
+                "C,1,,extra\n")
+        assert list(parse_csv_rows(text)) == [
+            (1, {"campsite_name": "A", "photos": [
+                {"campsite_photo_url": "https://example.com/a.jpg"},
+                {"campsite_photo_url": "https://example.com/b.jpg"}]}, None),
+            (2, {"campsite_name": "B", "parking_cost": "4.5"}, None),
+            (3, None, ["Row has more cells than the header"])
+        ]
+
+    def test_parse_csv_contacts(self):
+        text = ("campsite_name,contacts\n"
+                "A,Ida;0123;ida@example.com | Bo;0456\n"
+                "B,Cy\n")
+        assert list(parse_csv_rows(text)) == [
+            (1, {"campsite_name": "A", "contacts": [
+                {"campsite_contact_name": "Ida", "campsite_contact_phone": "0123",
+                 "campsite_contact_email": "ida@example.com"},
+                {"campsite_contact_name": "Bo", "campsite_contact_phone": "0456"}]}, None),
+            (2, {"campsite_name": "B", "contacts": [
+                {"campsite_contact_name": "Cy"}]}, None)
+        ]
+
+    def test_parse_import_rows_by_content_type(self):
+        rows = parse_import_rows(
+            "text/csv; charset=utf-8", "﻿campsite_name\nA\n".encode())
+        assert list(rows) == [(1, {"campsite_name": "A"}, None)]
+        rows = parse_import_rows(
+            "application/x-ndjson", b'{"campsite_name": "A"}')
+        assert list(rows) == [(1, {"campsite_name": "A"}, None)]
+
+    def test_415_unsupported_content_type(self):
+        with pytest.raises(HTTPException) as error:
+            parse_import_rows("application/json", b"[]")
+        assert error.value.status_code == 415
+
+    def test_400_not_utf8(self):
+        with pytest.raises(HTTPException) as error:
+            parse_import_rows("text/csv", "campsite_name\nCafé".encode("latin-1"))
+        assert error.value.status_code == 400
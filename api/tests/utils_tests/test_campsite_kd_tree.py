@@ -0,0 +1,83 @@
+import pytest
+import random
+from api.utils.campsite_kd_tree import CampsiteKDTree, haversine_km
+
+
+def brute_force_nearest(entries, latitude, longitude, k):
+    distances = sorted((haversine_km(latitude, longitude, lat, lon), campsite_id)
+                       for campsite_id, lat, lon in entries)
+    return [campsite_id for _, campsite_id in distances[:k]]
+
+
+@pytest.mark.utils
+class TestCampsiteKDTreeUtil:
+
+    def test_haversine_known_distance(self):
+        # London to Paris is roughly 344km
+        assert haversine_km(51.5074, -0.1278, 48.8566, 2.3522) == pytest.approx(
+            343.5, abs=1)
+
+    def test_empty_tree(self):
+        tree = CampsiteKDTree()
+        tree.build([])
+        assert tree.nearest(53.0, -1.0, 5) == []
+
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(1)
+        entries = [(i, rng.uniform(-90, 90), rng.uniform(-180, 180))
+                   for i in range(500)]
+        tree = CampsiteKDTree()
+        tree.build(entries)
+
+        for _ in range(20):
+            lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+            nearest = tree.nearest(lat, lon, 7)
+            assert [campsite_id for campsite_id, _ in nearest] == brute_force_nearest(
+                entries, lat, lon, 7)
+
+    def test_results_are_ordered_with_distances(self):
+        tree = CampsiteKDTree()
+        tree.build([(1, 53.0, -1.0), (2, 54.0, -1.0), (3, 53.1, -1.0)])
+        nearest = tree.nearest(53.0, -1.0, 3)
+        assert [campsite_id for campsite_id, _ in nearest] == [1, 3, 2]
+        assert nearest[0][1] == 0.0
+        assert nearest[1][1] == pytest.approx(11.1, abs=0.1)
+
+    def test_nearest_across_antimeridian(self):
+        tree = CampsiteKDTree()
+        tree.build([(1, 0.0, 179.9), (2, 0.0, -170.0)])
+        assert tree.nearest(0.0, -179.9, 1)[0][0] == 1
+
+    def test_inserts_are_searchable(self):
+        rng = random.Random(2)
+        entries = [(i, rng.uniform(-60, 60), rng.uniform(-180, 180))
+                   for i in range(50)]
+        tree = CampsiteKDTree()
+        tree.build(entries[:10])
+        for entry in entries[10:]:
+            tree.insert(*entry)
+
+        assert len(tree) == 50
+        nearest = tree.nearest(10.0, 10.0, 5)
+        assert [campsite_id for campsite_id, _ in nearest] == brute_force_nearest(
+            entries, 10.0, 10.0, 5)
+
+    def test_insert_ignored_until_loaded(self):
+        tree = CampsiteKDTree()
+        tree.insert(1, 53.0, -1.0)
+        assert len(tree) == 0
+
+    def test_build_started_before_invalidate_is_discarded(self):
+        tree = CampsiteKDTree()
+        generation = tree.generation
+        tree.invalidate()
+        tree.build([(1, 53.0, -1.0)], generation)
+        assert tree.loaded is False
+        assert len(tree) == 0
+
+    def test_invalidate_clears_tree(self):
+        tree = CampsiteKDTree()
+        tree.build([(1, 53.0, -1.0)])
+        tree.invalidate()
+        assert tree.loaded is False
+        assert tree.nearest(53.0, -1.0, 1) == []
@@ -0,0 +1,60 @@
+import pytest
+from api.utils.campsite_trigrams import CampsiteTrigramIndex, trigrams, similarity
+
+
+@pytest.mark.utils
+class TestCampsiteTrigramIndex:
+
+    def test_trigrams_follow_pg_trgm_padding(self):
+        assert trigrams("Pines") == {"  p", " pi", "pin", "ine", "nes", "es "}
+        assert trigrams("a-b") == {"  a", " a ", "  b", " b "}
+        assert trigrams("") == set()
+
+    def test_similarity(self):
+        assert similarity(3, 3, 3) == 1.0
+        assert similarity(2, 4, 6) == 0.25
+        assert similarity(0, 0, 0) == 0.0
+
+    def test_matches_misspelling(self):
+        index = CampsiteTrigramIndex()
+        index.build([(1, "Whispering Pines"), (2, "Willow Bank")])
+        matches = index.search("Whisperng Pines")
+        assert [campsite_id for campsite_id, _ in matches] == [1]
+        assert 0.3 <= matches[0][1] < 1.0
+
+    def test_exact_match_scores_one(self):
+        index = CampsiteTrigramIndex()
+        index.build([(1, "Willow Bank")])
+        assert index.search("willow bank") == [(1, 1.0)]
+
+    def test_ordered_by_similarity(self):
+        index = CampsiteTrigramIndex()
+        index.build([(1, "Lakeside Meadow Camp"), (2, "Lakeside")])
+        assert [campsite_id for campsite_id,
+                _ in index.search("lakeside", threshold=0.1)] == [2, 1]
+
+    def test_threshold(self):
+        index = CampsiteTrigramIndex()
+        index.build([(1, "Whispering Pines")])
+        assert index.search("pine valley") == []
+        assert index.search("zzz") == []
+
+    def test_insert_after_build(self):
+        index = CampsiteTrigramIndex()
+        index.build([])
+        index.insert(1, "Willow Bank")
+        assert [campsite_id for campsite_id,
+                _ in index.search("wilow bank")] == [1]
+
+    def test_insert_ignored_until_loaded(self):
+        index = CampsiteTrigramIndex()
+        index.insert(1, "Willow Bank")
+        assert index.search("willow bank") == []
+
+    def test_build_started_before_invalidate_is_discarded(self):
+        index = CampsiteTrigramIndex()
+        generation = index.generation
+        index.invalidate()
+        index.build([(1, "Willow Bank")], generation)
+        assert index.loaded is False
+        assert index.search("willow bank") == []
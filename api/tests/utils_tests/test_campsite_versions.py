@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from api.models.campsite_version_models import CampsiteVersion
+from api.utils.campsite_versions import bump_campsite_versions, reset_campsite_versions, campsite_versions_query, versions_etag, etag_matches
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    CampsiteVersion.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def etag(db, campsite_id=None):
+    return versions_etag(db.execute(campsite_versions_query(campsite_id)).all(), campsite_id)
+
+
+@pytest.mark.utils
+class TestCampsiteVersionsUtil:
+
+    def test_bump_changes_list_and_campsite_etags(self, db):
+        list_etag = etag(db)
+        campsite_etag = etag(db, 1)
+        other_campsite_etag = etag(db, 2)
+
+        bump_campsite_versions(db, 1)
+        db.commit()
+        assert etag(db) != list_etag
+        assert etag(db, 1) != campsite_etag
+        assert etag(db, 2) == other_campsite_etag
+
+        bump_campsite_versions(db, 1)
+        db.commit()
+        assert db.get(CampsiteVersion, 1).version == 2
+
+    def test_bump_list_only(self, db):
+        campsite_etag = etag(db, 1)
+        bump_campsite_versions(db)
+        db.commit()
+        assert etag(db, 1) == campsite_etag
+
+    def test_reset_changes_epoch(self, db):
+        list_etag = etag(db)
+        campsite_etag = etag(db, 1)
+        reset_campsite_versions(db)
+        assert etag(db) != list_etag
+        assert etag(db, 1) != campsite_etag
+
+    def test_etags_are_weak(self, db):
+        assert etag(db).startswith('W/"')
+        assert etag(db, 1).startswith('W/"')
+
+    def test_no_list_version_has_no_etag(self):
+        assert versions_etag([]) is None
+        assert versions_etag([], 1) is None
+
+    def test_etag_matches(self):
+        assert etag_matches('"abc-1"', '"abc-1"')
+        assert etag_matches('"xyz", "abc-1"', '"abc-1"')
+        assert etag_matches('W/"abc-1"', '"abc-1"')
+        assert etag_matches('"abc-1"', 'W/"abc-1"')
+        assert etag_matches('*', '"abc-1"')
+        assert not etag_matches('"abc-2"', '"abc-1"')
+        assert not etag_matches(None, '"abc-1"')
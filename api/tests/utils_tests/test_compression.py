@@ -0,0 +1,47 @@
+import gzip
+import brotli
+import pytest
+from api.utils.compression import negotiate_encoding, compress, compress_stream
+
+
+@pytest.mark.utils
+class TestCompressionUtil:
+
+    def test_negotiate_encoding(self):
+        assert negotiate_encoding("gzip, deflate, br") == "br"
+        assert negotiate_encoding("gzip") == "gzip"
+        assert negotiate_encoding("br;q=0.5, gzip") == "gzip"
+        assert negotiate_encoding("gzip;q=0, br;q=0") is None
+        assert negotiate_encoding("*") == "br"
+        assert negotiate_encoding("*, br;q=0") == "gzip"
+        assert negotiate_encoding("identity") is None
+        assert negotiate_encoding("gzip;q=bad") is None
+        assert negotiate_encoding(None) is None
+
+    def test_compress(self):
+        body = b'{"campsite_photo_url": "https://example.com/photo.jpg"}' * 50
+        assert gzip.decompress(compress(body, "gzip")) == body
+        assert brotli.decompress(compress(body, "br")) == body
+        assert len(compress(body, "br")) < len(body) / 10
+
+    def test_compress_stream(self):
+        chunks = [b'{"campsite_id": %d}\n' % campsite_id for campsite_id in range(100)]
+        assert gzip.decompress(
+            b"".join(compress_stream(iter(chunks), "gzip"))) == b"".join(chunks)
+        assert brotli.decompress(
+            b"".join(compress_stream(iter(chunks), "br"))) == b"".join(chunks)
+
+    def test_compress_stream_closes_source(self):
+        closed = []
+
+        def source():
+            try:
+                yield b"first"
+                yield b"second"
+            finally:
+                closed.append(True)
+
+        stream = compress_stream(source(), "gzip")
+        next(stream)
+        stream.close()
+        assert closed == [True]
@@ -0,0 +1,30 @@
+import json
+import pytest
+from api.utils.fast_json import FastJSONResponse
+from api.schemas.campsite_schemas import CampsiteCluster
+from api.benchmarks.serialization_benchmark import make_page, response_model_body, adapter_body, fast_response_body, campsite_list_adapter, run
+
+
+@pytest.mark.utils
+class TestFastJSONUtil:
+
+    def test_renders_models_and_plain_data(self):
+        response = FastJSONResponse(
+            [CampsiteCluster(latitude=53.4, longitude=-1.5, count=2), {"count": 1}], status_code=201)
+        assert response.status_code == 201
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == [
+            {"latitude": 53.4, "longitude": -1.5, "count": 2, "campsite_id": None}, {"count": 1}]
+
+    def test_serialization_paths_agree(self):
+        campsites = make_page(3)
+        models = campsite_list_adapter.validate_python(
+            campsites, from_attributes=True)
+        expected = json.loads(response_model_body(campsites))
+        assert json.loads(adapter_body(campsites)) == expected
+        assert json.loads(fast_response_body(models)) == expected
+        assert expected[0]["photos"][1]["campsite_photo_url"] == "https://example.com/1/1.jpg"
+
+    def test_benchmark_runs(self):
+        assert set(run(rows=2, repeats=1)) == {
+            "response_model", "adapter", "revalidated", "fast_response"}
@@ -0,0 +1,53 @@
+import pytest
+from fastapi import HTTPException
+from api.utils.geo_grid import grid_cell, grid_cell_ranges, parse_bbox, GRID_COLUMNS
+
+
+@pytest.mark.utils
+class TestGeoGridUtil:
+
+    def test_grid_cell_is_none_without_coordinates(self):
+        assert grid_cell(None, 1.0) is None
+        assert grid_cell(1.0, None) is None
+
+    def test_points_in_same_cell_share_id(self):
+        assert grid_cell(53.41, -1.51) == grid_cell(53.49, -1.59)
+        assert grid_cell(53.41, -1.51) != grid_cell(53.51, -1.51)
+
+    def test_out_of_range_longitude_wraps(self):
+        assert grid_cell(10.0, -197.0) == grid_cell(10.0, 163.0)
+
+    def test_cell_of_point_inside_bbox_is_in_a_range(self):
+        ranges = grid_cell_ranges(-2.0, 53.0, -1.0, 54.0)
+        cell = grid_cell(53.45645, -1.54322)
+        assert any(start <= cell <= end for start, end in ranges)
+
+    def test_one_range_per_row(self):
+        ranges = grid_cell_ranges(-2.0, 53.0, -1.0, 53.25)
+        assert len(ranges) == 3
+
+    def test_full_width_rows_merge(self):
+        ranges = grid_cell_ranges(-180.0, 0.0, 180.0, 1.0)
+        assert len(ranges) == 1
+
+    def test_antimeridian_bbox_splits_columns(self):
+        ranges = grid_cell_ranges(179.0, 0.0, -179.0, 0.05)
+        assert len(ranges) == 2
+        assert ranges[0][0] % GRID_COLUMNS == 0
+        assert ranges[1][1] % GRID_COLUMNS == GRID_COLUMNS - 1
+
+    def test_antimeridian_rows_merge_across_the_seam(self):
+        ranges = grid_cell_ranges(179.0, 0.0, -179.0, 0.15)
+        assert len(ranges) == 3
+
+    def test_large_bbox_collapses_to_single_range(self):
+        ranges = grid_cell_ranges(-10.0, 40.0, 10.0, 60.0)
+        assert len(ranges) == 1
+
+    def test_parse_bbox(self):
+        assert parse_bbox("-2,53,-1,54") == (-2.0, 53.0, -1.0, 54.0)
+
+    def test_parse_bbox_invalid(self):
+        for bbox in ["1,2,3", "a,b,c,d", "-2,54,-1,53", "-2,53,-1,95", "-200,53,-1,54"]:
+            with pytest.raises(HTTPException):
+                parse_bbox(bbox)
@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import create_engine, exc
+from database.database_utils.instrumented_pool import InstrumentedQueuePool, InstrumentedAsyncQueuePool, pool_options, pool_metrics
+
+
+@pytest.fixture
+def pooled_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=1, pool_timeout=0.05)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.db_utils
+class TestInstrumentedPool:
+
+    def test_counts_checkouts_in_use_and_overflow(self, pooled_engine):
+        first = pooled_engine.connect()
+        second = pooled_engine.connect()
+        metrics = pool_metrics(pooled_engine)
+        assert metrics["checked_out"] == 2
+        assert metrics["overflow"] == 1
+        assert metrics["checkouts"] == 2
+        second.close()
+        first.close()
+        metrics = pool_metrics(pooled_engine)
+        assert metrics["checked_out"] == 0
+        assert metrics["overflow"] == 0
+        assert metrics["checked_in"] == 1
+
+    def test_records_wait_and_timeouts(self, pooled_engine):
+        connections = [pooled_engine.connect(), pooled_engine.connect()]
+        with pytest.raises(exc.TimeoutError):
+            pooled_engine.connect()
+        for connection in connections:
+            connection.close()
+        metrics = pool_metrics(pooled_engine)
+        assert metrics["timeouts"] == 1
+        assert metrics["checkouts"] == 2
+        assert 0 < metrics["wait_seconds_mean"] <= metrics["wait_seconds_max"]
+        assert metrics["wait_seconds_total"] >= 2 * metrics["wait_seconds_mean"] - 1e-9
+
+    def test_unsized_pools_report_status(self):
+        engine = create_engine("sqlite:///")
+        assert "status" in pool_metrics(engine)
+
+    def test_pool_options(self):
+        assert pool_options("sqlite:///") == {}
+        assert pool_options(
+            "sqlite:///file:test?mode=memory&cache=shared&uri=true") == {}
+        options = pool_options("postgresql://localhost/parkfinite")
+        assert options["poolclass"] is InstrumentedQueuePool
+        assert {"pool_size", "max_overflow", "pool_timeout",
+                "pool_recycle", "pool_pre_ping"} <= options.keys()
+        assert pool_options("sqlite:////tmp/dev.db", asynchronous=True)[
+            "poolclass"] is InstrumentedAsyncQueuePool
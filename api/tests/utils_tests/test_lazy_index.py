@@ -0,0 +1,69 @@
+import pytest
+import threading
+import time
+from api.utils.lazy_index import is_at_least
+from api.utils.campsite_kd_tree import CampsiteKDTree
+
+
+class CountingKDTree(CampsiteKDTree):
+    # loads entries from a list instead of a session and counts the loads
+    def __init__(self, entries):
+        self.source = entries
+        self.loads = 0
+        super().__init__()
+
+    def _query(self, db):
+        self.loads += 1
+        time.sleep(0.01)
+        return (list(self.source),)
+
+
+@pytest.mark.utils
+class TestLazyIndexUtil:
+
+    def test_is_at_least(self):
+        assert is_at_least(("a", 2), ("a", 1))
+        assert is_at_least(("a", 2), ("a", 2))
+        assert not is_at_least(("a", 1), ("a", 2))
+        assert not is_at_least(("b", 5), ("a", 1))
+        assert not is_at_least(None, ("a", 1))
+
+    def test_loads_once_per_version(self):
+        index = CountingKDTree([(1, 53.0, -1.5)])
+        index.ensure_loaded(None, ("a", 1))
+        index.ensure_loaded(None, ("a", 1))
+        assert index.loads == 1
+        index.ensure_loaded(None, ("a", 2))
+        assert index.loads == 2
+        # a new epoch (a reseed) always reloads
+        index.ensure_loaded(None, ("b", 1))
+        assert index.loads == 3
+
+    def test_concurrent_callers_share_one_build(self):
+        index = CountingKDTree([(1, 53.0, -1.5)])
+        threads = [threading.Thread(target=index.ensure_loaded, args=(None, ("a", 1)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert index.loads == 1
+
+    def test_own_write_advances_without_reload(self):
+        index = CountingKDTree([(1, 53.0, -1.5)])
+        index.ensure_loaded(None, ("a", 1))
+        index.insert(2, 54.0, -1.5)
+        index.advance(("a", 2))
+        index.ensure_loaded(None, ("a", 2))
+        assert index.loads == 1
+        assert [entry[0] for entry in index.nearest(54.0, -1.5, 2)] == [2, 1]
+
+    def test_missed_write_is_not_skipped(self):
+        # version 2 came from another worker, so this worker's write of
+        # version 3 must not claim the index has seen it
+        index = CountingKDTree([(1, 53.0, -1.5)])
+        index.ensure_loaded(None, ("a", 1))
+        index.advance(("a", 3))
+        assert index.version == ("a", 1)
+        index.ensure_loaded(None, ("a", 3))
+        assert index.loads == 2
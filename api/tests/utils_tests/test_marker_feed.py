@@ -0,0 +1,37 @@
+import pytest
+from api.utils.marker_feed import pack_markers, unpack_markers, columnar_markers, wants_packed_markers, MARKER_FEED_MEDIA_TYPE
+
+
+@pytest.mark.utils
+class TestMarkerFeedUtil:
+
+    def test_columnar_markers(self):
+        rows = [(1, 53.5, -1.5, 2, 4.5), (2, 54.0, -2.0, None, 0.0)]
+        assert columnar_markers(rows) == {
+            "campsite_id": [1, 2],
+            "latitude": [53.5, 54.0],
+            "longitude": [-1.5, -2.0],
+            "category_id": [2, None],
+            "average_rating": [4.5, 0.0]
+        }
+
+    def test_pack_round_trip(self):
+        rows = [(1, 53.5, -1.5, 2, 4.5), (2, 54.0, -2.0, None, None)]
+        markers = unpack_markers(pack_markers(rows))
+        assert markers["campsite_id"] == [1, 2]
+        assert markers["latitude"] == [53.5, 54.0]
+        assert markers["longitude"] == [-1.5, -2.0]
+        assert markers["category_id"] == [2, -1]
+        assert markers["average_rating"] == [4.5, 0.0]
+
+    def test_packed_size(self):
+        rows = [(i, 53.0, -1.0, 1, 3.0) for i in range(100)]
+        assert len(pack_markers(rows)) == 4 + 100 * 20
+
+    def test_pack_empty(self):
+        assert unpack_markers(pack_markers([]))["campsite_id"] == []
+
+    def test_wants_packed_markers(self):
+        assert wants_packed_markers(MARKER_FEED_MEDIA_TYPE)
+        assert not wants_packed_markers("application/json")
+        assert not wants_packed_markers(None)
@@ -0,0 +1,53 @@
+import pytest
+from fastapi import HTTPException
+from api.utils.month_mask import month_mask, parse_month, parse_open_in, month_bit, masks_open_in, SEASON_MASKS, ALL_MONTHS
+
+
+def open_months(mask):
+    return [month for month in range(1, 13) if mask & month_bit(month)]
+
+
+@pytest.mark.utils
+class TestMonthMaskUtil:
+
+    def test_parse_month(self):
+        assert parse_month("July") == 7
+        assert parse_month(" jul ") == 7
+        assert parse_month("SEPT") == 9
+        assert parse_month("7") == 7
+        assert parse_month("ju") is None
+        assert parse_month("13") is None
+        assert parse_month(None) is None
+
+    def test_season_within_year(self):
+        assert open_months(month_mask("March", "November")) == list(range(3, 12))
+
+    def test_season_wrapping_year_end(self):
+        assert open_months(month_mask("October", "March")) == [
+            1, 2, 3, 10, 11, 12]
+
+    def test_single_month_season(self):
+        assert open_months(month_mask("August", "aug")) == [8]
+
+    def test_unknown_season_is_open_all_year(self):
+        assert month_mask(None, None) == ALL_MONTHS
+        assert month_mask("March", None) == ALL_MONTHS
+        assert month_mask("Spring", "Autumn") == ALL_MONTHS
+
+    def test_season_masks(self):
+        assert len(SEASON_MASKS) == 133
+        assert month_mask("Spring", "Autumn") in SEASON_MASKS
+
+    def test_masks_open_in(self):
+        january = masks_open_in(1)
+        assert month_mask("October", "March") in january
+        assert month_mask("March", "November") not in january
+        assert ALL_MONTHS in january
+        assert all(mask & month_bit(1) for mask in january)
+        assert len(january) == 67
+
+    def test_parse_open_in(self):
+        assert parse_open_in("December") == 12
+        with pytest.raises(HTTPException) as error:
+            parse_open_in("Smarch")
+        assert error.value.status_code == 400
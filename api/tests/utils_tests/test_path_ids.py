@@ -0,0 +1,19 @@
+import pytest
+from api.utils.path_ids import parse_path_id
+
+
+@pytest.mark.utils
+class TestPathIdsUtil:
+
+    def test_parse_path_id(self):
+        assert parse_path_id("12") == 12
+        assert parse_path_id("012") == 12
+        assert parse_path_id("INVALID") is None
+        assert parse_path_id(None) is None
+
+    def test_out_of_range_ids_are_none(self):
+        assert parse_path_id(str(2 ** 63 - 1)) == 2 ** 63 - 1
+        assert parse_path_id(str(2 ** 63)) is None
+        assert parse_path_id(str(-2 ** 63 - 1)) is None
+        assert parse_path_id(str(2 ** 31 - 1), "postgresql") == 2 ** 31 - 1
+        assert parse_path_id(str(2 ** 31), "postgresql") is None
@@ -0,0 +1,104 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+from starlette.responses import Response
+import database.database_utils.get_db as get_db_module
+import database.database_utils.replica_routing as replica_routing
+from database.database_utils.replica_routing import LAST_WRITE_COOKIE, record_write, wrote_recently, primary_session
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_request(method, cookie=None):
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    return Request({"type": "http", "method": method, "path": "/", "headers": headers,
+                    "client": ("127.0.0.1", 50000)})
+
+
+def write_cookie(clock):
+    # the cookie a client sends back after a write at clock.now
+    response = Response()
+    record_write(make_request("PATCH"), response, replica_configured=True,
+                 window_seconds=5, clock=clock)
+    return response.headers["set-cookie"].split(";")[0]
+
+
+@pytest.fixture
+def replica_pair(tmp_path, monkeypatch):
+    # a primary and a replica SQLite file, told apart by a marker table
+    sessions = {}
+    for name in ("primary", "replica"):
+        engine = create_engine(f"sqlite:///{tmp_path / name}.db")
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE marker (name TEXT)"))
+            connection.execute(
+                text("INSERT INTO marker VALUES (:name)"), {"name": name})
+        sessions[name] = sessionmaker(bind=engine)
+    monkeypatch.setattr(get_db_module, "SessionLocal", sessions["primary"])
+    monkeypatch.setattr(get_db_module, "ReplicaSessionLocal",
+                        sessions["replica"])
+    monkeypatch.setattr(get_db_module, "reads_from_replica",
+                        lambda request: replica_routing.reads_from_replica(request, replica_configured=True))
+    yield sessions
+
+
+def database_for(request):
+    dependency = get_db_module.get_db(request)
+    db = next(dependency)
+    name = db.execute(text("SELECT name FROM marker")).scalar()
+    dependency.close()
+    return name
+
+
+@pytest.mark.db_utils
+class TestReplicaRouting:
+
+    def test_last_write_cookie_window(self):
+        clock = FakeClock()
+        cookie = write_cookie(clock)
+        assert cookie.startswith(f"{LAST_WRITE_COOKIE}=")
+        assert wrote_recently(make_request(
+            "GET", cookie), window_seconds=5, clock=clock)
+        assert not wrote_recently(make_request("GET"), clock=clock)
+        assert not wrote_recently(make_request(
+            "GET", f"{LAST_WRITE_COOKIE}=junk"), clock=clock)
+        clock.now = 5
+        assert not wrote_recently(make_request(
+            "GET", cookie), window_seconds=5, clock=clock)
+
+    def test_reads_not_recorded_as_writes(self):
+        response = Response()
+        record_write(make_request("GET"), response, replica_configured=True)
+        assert "set-cookie" not in response.headers
+
+    def test_reads_go_to_replica_writes_to_primary(self, replica_pair):
+        assert database_for(make_request("GET")) == "replica"
+        assert database_for(make_request("POST")) == "primary"
+
+    def test_read_your_writes(self, replica_pair):
+        cookie = write_cookie(replica_routing.time.time)
+        assert database_for(make_request("GET", cookie)) == "primary"
+        assert database_for(make_request("GET")) == "replica"
+
+    def test_primary_session_from_replica_session(self, replica_pair):
+        dependency = get_db_module.get_db(make_request("GET"))
+        db = next(dependency)
+        with primary_session(db) as primary:
+            assert primary.execute(
+                text("SELECT name FROM marker")).scalar() == "primary"
+        dependency.close()
+        db = replica_pair["primary"]()
+        with primary_session(db) as primary:
+            assert primary is db
+        db.close()
+
+    def test_no_replica_configured(self):
+        assert not replica_routing.reads_from_replica(
+            make_request("GET"), replica_configured=False)
@@ -0,0 +1,110 @@
+import pytest
+from starlette.requests import Request
+from api.utils.response_cache import ResponseCache, cache_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.utils
+class TestResponseCacheUtil:
+
+    def test_get_and_set(self):
+        cache = ResponseCache(max_bytes=1000, ttl_seconds=60)
+        cache.set("a", b"body", {"X-Header": "1"}, ["tag"])
+        entry = cache.get("a")
+        assert entry.body == b"body"
+        assert entry.headers == {"X-Header": "1"}
+        assert cache.get("missing") is None
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = ResponseCache(max_bytes=1000, ttl_seconds=60, clock=clock)
+        cache.set("a", b"body")
+        clock.now = 59
+        assert cache.get("a") is not None
+        clock.now = 60
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_evicted_past_max_bytes(self):
+        cache = ResponseCache(max_bytes=10, ttl_seconds=60)
+        cache.set("a", b"aaaa")
+        cache.set("b", b"bbbb")
+        cache.get("a")
+        cache.set("c", b"cccc")
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+
+    def test_oversized_body_not_cached(self):
+        cache = ResponseCache(max_bytes=3, ttl_seconds=60)
+        cache.set("a", b"aaaa")
+        assert cache.get("a") is None
+
+    def test_invalidate_by_tag(self):
+        cache = ResponseCache(max_bytes=1000, ttl_seconds=60)
+        cache.set("list", b"1", tags=["campsites"])
+        cache.set("detail_1", b"2", tags=["campsite:1"])
+        cache.set("detail_2", b"3", tags=["campsite:2"])
+        cache.invalidate("campsites", "campsite:1")
+        assert cache.get("list") is None
+        assert cache.get("detail_1") is None
+        assert cache.get("detail_2") is not None
+
+    def test_stale_load_not_stored_after_invalidation(self):
+        cache = ResponseCache(max_bytes=1000, ttl_seconds=60)
+        generation = cache.generation
+        cache.invalidate("campsites")
+        cache.set("list", b"stale", tags=["campsites"], generation=generation)
+        assert cache.get("list") is None
+
+    def test_invalidated_tags_not_stored_while_settling(self):
+        clock = FakeClock()
+        cache = ResponseCache(max_bytes=1000, ttl_seconds=60,
+                              settle_seconds=5, clock=clock)
+        cache.invalidate("campsite:1")
+        cache.set("detail_1", b"replica", tags=["campsite:1"])
+        cache.set("detail_2", b"fresh", tags=["campsite:2"])
+        assert cache.get("detail_1") is None
+        assert cache.get("detail_2") is not None
+        assert cache.settling("campsite:1")
+        assert not cache.settling("campsite:2")
+        clock.now = 5
+        assert not cache.settling("campsite:1")
+        cache.set("detail_1", b"caught up", tags=["campsite:1"])
+        assert cache.get("detail_1").body == b"caught up"
+
+    def test_compressed_variants_cached_once_and_counted(self):
+        cache = ResponseCache(max_bytes=10000, ttl_seconds=60)
+        entry = cache.set("list", b"campsite " * 200, tags=["campsites"])
+        cache.encode("list", entry, "gzip")
+        compressed = entry.encoded["gzip"]
+        cache.encode("list", entry, "gzip")
+        assert entry.encoded["gzip"] is compressed
+        assert cache.get("list").to_response(encoding="gzip").body == compressed
+        assert cache.get("list").to_response(
+            encoding="gzip").headers["content-encoding"] == "gzip"
+        assert cache._size == len(entry.body) + len(compressed)
+        cache.invalidate("campsites")
+        assert cache._size == 0
+
+    def test_cache_key_keeps_escaped_separators_apart(self):
+        def request(query_string):
+            return Request({"type": "http", "path": "/campsites/", "headers": [],
+                            "query_string": query_string})
+        assert cache_key(request(b"q=campsite%26skip%3D1")) != cache_key(
+            request(b"q=campsite&skip=1"))
+        assert cache_key(request(b"skip=1&q=campsite")) == cache_key(
+            request(b"q=campsite&skip=1"))
+
+    def test_clear(self):
+        cache = ResponseCache(max_bytes=1000, ttl_seconds=60)
+        cache.set("a", b"body", tags=["tag"])
+        cache.clear()
+        assert len(cache) == 0
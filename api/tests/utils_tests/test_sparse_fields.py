@@ -0,0 +1,32 @@
+import pytest
+from fastapi import HTTPException
+from api.schemas.campsite_schemas import Campsite
+from api.utils.sparse_fields import parse_fields, narrowed_model, narrowed_list_adapter
+
+
+@pytest.mark.utils
+class TestSparseFieldsUtil:
+
+    def test_parse_fields_uses_model_order(self):
+        assert parse_fields("campsite_id, campsite_name", Campsite) == (
+            "campsite_name", "campsite_id")
+
+    def test_parse_fields_invalid(self):
+        for fields in ["", ",", "INVALID", "campsite_name,INVALID"]:
+            with pytest.raises(HTTPException):
+                parse_fields(fields, Campsite)
+
+    def test_narrowed_model_only_has_requested_fields(self):
+        model = narrowed_model(Campsite, ("campsite_name", "approved"))
+        assert list(model.model_fields) == ["campsite_name", "approved"]
+        assert model.model_fields["approved"].default is False
+
+    def test_narrowed_model_is_cached(self):
+        assert narrowed_model(Campsite, ("campsite_name",)) is narrowed_model(
+            Campsite, ("campsite_name",))
+
+    def test_narrowed_list_adapter_dumps_json(self):
+        adapter = narrowed_list_adapter(Campsite, ("campsite_id",))
+        data = adapter.validate_python(
+            [{"campsite_id": 1, "campsite_name": "IGNORED"}])
+        assert adapter.dump_json(data) == b'[{"campsite_id":1}]'
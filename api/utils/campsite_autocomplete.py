@@ -0,0 +1,82 @@
+import bisect
+import heapq
+import re
+import unicodedata
+from api.models.campsite_models import Campsite
+from api.utils.lazy_index import LazyIndex
+
+# The most suggestions a request can ask for
+MAX_SUGGESTIONS = 10
+# sorts after every character normalise_name can produce
+PREFIX_END = "\U0010ffff"
+
+
+def normalise_name(name):
+    # "Café  du Lac!" -> "cafe du lac"
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    without_accents = "".join(
+        char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(re.findall(r"\w+", without_accents.lower()))
+
+
+def word_suffixes(name):
+    # "whispering pines" -> ["whispering pines", "pines"], one per word start
+    # so "pin" finds "Whispering Pines"
+    return [name[match.start():] for match in re.finditer(r"\b\w", name)]
+
+
+class CampsiteAutocomplete(LazyIndex):
+    # Sorted array of (word suffix of the normalised name, campsite_id). The
+    # suffixes a prefix matches are one contiguous run found by bisection,
+    # ranked by rating at lookup, so a rating change only touches the
+    # campsite's entry in _campsites.
+
+    def _reset(self):
+        self._suffixes = []
+        # campsite_id -> (campsite_name, average_rating)
+        self._campsites = {}
+
+    def _query(self, db):
+        return (db.query(Campsite.campsite_id, Campsite.campsite_name, Campsite.average_rating).all(),)
+
+    def build(self, entries, generation=None, version=None):
+        # entries: iterable of (campsite_id, campsite_name, average_rating)
+        campsites = {campsite_id: (campsite_name, average_rating)
+                     for campsite_id, campsite_name, average_rating in entries}
+        suffixes = sorted((suffix, campsite_id)
+                          for campsite_id, (campsite_name, _) in campsites.items()
+                          for suffix in word_suffixes(normalise_name(campsite_name)))
+        self._install(generation, version,
+                      _suffixes=suffixes, _campsites=campsites)
+
+    def insert(self, campsite_id, campsite_name, average_rating):
+        with self._lock:
+            if not self._patchable() or campsite_id in self._campsites:
+                return
+            self._campsites[campsite_id] = (campsite_name, average_rating)
+            for suffix in word_suffixes(normalise_name(campsite_name)):
+                bisect.insort(self._suffixes, (suffix, campsite_id))
+
+    def update_rating(self, campsite_id, average_rating):
+        with self._lock:
+            if campsite_id in self._campsites:
+                self._campsites[campsite_id] = (
+                    self._campsites[campsite_id][0], average_rating)
+
+    def suggest(self, prefix, limit=MAX_SUGGESTIONS):
+        prefix = normalise_name(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            suffixes, campsites = self._suffixes, self._campsites
+            start = bisect.bisect_left(suffixes, (prefix,))
+            end = bisect.bisect_left(suffixes, (prefix + PREFIX_END,), start)
+            matches = {campsite_id: campsites[campsite_id]
+                       for _, campsite_id in suffixes[start:end]}
+        best = heapq.nsmallest(limit, ((-(average_rating or 0.0), campsite_name, campsite_id)
+                                       for campsite_id, (campsite_name, average_rating) in matches.items()))
+        return [{"campsite_id": campsite_id, "campsite_name": campsite_name, "average_rating": -negative_rating}
+                for negative_rating, campsite_name, campsite_id in best]
+
+
+campsite_autocomplete = CampsiteAutocomplete()
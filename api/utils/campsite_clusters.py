@@ -0,0 +1,119 @@
+from bisect import bisect_left, bisect_right
+from math import radians, degrees, sin, atan, sinh, log, pi
+from api.models.campsite_models import Campsite
+from api.utils.lazy_index import LazyIndex
+
+# Hierarchical grid clustering in the style of supercluster. Campsites are
+# projected to Web Mercator [0, 1] space, clustered on a grid of
+# CLUSTER_RADIUS_PX pixels at MAX_ZOOM, then each coarser zoom clusters the
+# clusters of the zoom below, so clusters nest cleanly as the map zooms out.
+MAX_ZOOM = 16
+CLUSTER_RADIUS_PX = 60
+TILE_SIZE = 256
+
+
+def mercator_x(longitude):
+    return longitude / 360 + 0.5
+
+
+def mercator_y(latitude):
+    sin_lat = sin(radians(latitude))
+    if sin_lat >= 1:
+        return 0.0
+    if sin_lat <= -1:
+        return 1.0
+    y = 0.5 - 0.25 * log((1 + sin_lat) / (1 - sin_lat)) / pi
+    return min(max(y, 0.0), 1.0)
+
+
+def longitude_from_x(x):
+    return (x - 0.5) * 360
+
+
+def latitude_from_y(y):
+    return degrees(atan(sinh(pi * (1 - 2 * y))))
+
+
+class Cluster:
+    __slots__ = ("x", "y", "count", "campsite_id")
+
+    def __init__(self, x, y, count, campsite_id=None):
+        self.x = x
+        self.y = y
+        self.count = count
+        self.campsite_id = campsite_id
+
+    def to_dict(self):
+        return {
+            "latitude": latitude_from_y(self.y),
+            "longitude": longitude_from_x(self.x),
+            "count": self.count,
+            "campsite_id": self.campsite_id
+        }
+
+
+def merge_clusters(members):
+    if len(members) == 1:
+        return members[0]
+    count = sum(member.count for member in members)
+    return Cluster(
+        sum(member.x * member.count for member in members) / count,
+        sum(member.y * member.count for member in members) / count,
+        count
+    )
+
+
+class CampsiteClusterIndex(LazyIndex):
+    def _reset(self):
+        self._levels = {}
+
+    def _query(self, db):
+        return (db.query(Campsite.campsite_id, Campsite.campsite_latitude, Campsite.campsite_longitude).filter(
+            Campsite.approved.is_(True)).all(),)
+
+    def build(self, entries, generation=None, version=None):
+        # entries: iterable of (campsite_id, latitude, longitude)
+        current = [Cluster(mercator_x(lon), mercator_y(lat), 1, campsite_id)
+                   for campsite_id, lat, lon in entries
+                   if lat is not None and lon is not None]
+        levels = {MAX_ZOOM + 1: self._sorted_level(current)}
+
+        for zoom in range(MAX_ZOOM, -1, -1):
+            cell_size = CLUSTER_RADIUS_PX / (TILE_SIZE * 2 ** zoom)
+            grid = {}
+            for cluster in current:
+                key = (int(cluster.x / cell_size), int(cluster.y / cell_size))
+                grid.setdefault(key, []).append(cluster)
+            current = [merge_clusters(members) for members in grid.values()]
+            levels[zoom] = self._sorted_level(current)
+
+        self._install(generation, version, _levels=levels)
+
+    def _sorted_level(self, clusters):
+        clusters = sorted(clusters, key=lambda cluster: cluster.x)
+        return [cluster.x for cluster in clusters], clusters
+
+    def clusters(self, zoom, bbox=None):
+        level = self._levels.get(min(zoom, MAX_ZOOM + 1))
+        if not level:
+            return []
+        xs, clusters = level
+        if not bbox:
+            return [cluster.to_dict() for cluster in clusters]
+
+        min_lon, min_lat, max_lon, max_lat = bbox
+        min_y, max_y = mercator_y(max_lat), mercator_y(min_lat)
+        if min_lon <= max_lon:
+            x_spans = [(mercator_x(min_lon), mercator_x(max_lon))]
+        else:
+            x_spans = [(mercator_x(min_lon), 1.0), (0.0, mercator_x(max_lon))]
+
+        visible = []
+        for min_x, max_x in x_spans:
+            for cluster in clusters[bisect_left(xs, min_x):bisect_right(xs, max_x)]:
+                if min_y <= cluster.y <= max_y:
+                    visible.append(cluster.to_dict())
+        return visible
+
+
+campsite_cluster_index = CampsiteClusterIndex()
@@ -0,0 +1,155 @@
+from sqlalchemy import and_, or_, select
+from api.models.campsite_models import Campsite, campsites_facilities
+from api.models.activity_models import CampsiteActivity
+from api.utils.lazy_index import LazyIndex
+
+# cost range -> [low, high) in pounds, anything not positive counts as "free"
+COST_RANGES = {
+    "free": (None, 0),
+    "under_10": (0, 10),
+    "10_to_20": (10, 20),
+    "20_plus": (20, None),
+}
+COST_FACETS = ("parking_cost", "facilities_cost")
+
+# facets where a campsite has many values and filters must all match
+# ("has Shower AND Wi-Fi"), the rest match any of the requested values
+MULTI_VALUED_FACETS = ("facility_id", "activity_id")
+FACETS = ("category_id", "facility_id", "activity_id",
+          "parking_cost", "facilities_cost", "approved")
+
+
+def cost_range(cost):
+    if cost is None or cost <= 0:
+        return "free"
+    for name, (low, high) in COST_RANGES.items():
+        if low is not None and cost >= low and (high is None or cost < high):
+            return name
+
+
+def cost_range_condition(column, name):
+    # SQL equivalent of cost_range(column) == name
+    low, high = COST_RANGES[name]
+    if low is None:
+        return or_(column.is_(None), column <= high)
+    conditions = [column > 0, column >= low]
+    if high is not None:
+        conditions.append(column < high)
+    return and_(*conditions)
+
+
+def bit_ids(bitmap):
+    # campsite ids set in a bitmap, ascending
+    campsite_ids = []
+    while bitmap:
+        lowest = bitmap & -bitmap
+        campsite_ids.append(lowest.bit_length() - 1)
+        bitmap ^= lowest
+    return campsite_ids
+
+
+def id_bitmap(campsite_ids):
+    # bit_ids in reverse
+    bitmap = 0
+    for campsite_id in campsite_ids:
+        bitmap |= 1 << campsite_id
+    return bitmap
+
+
+class CampsiteFacetIndex(LazyIndex):
+    # One bitmap per facet value, bit n set when campsite n has that value.
+    # Python ints are arbitrary-width bitsets (about 1KB per 8,000 campsites),
+    # so "Shower AND Wi-Fi AND Fishing" is a few ANDs rather than a join per
+    # facility and every facet count is a popcount rather than a GROUP BY.
+
+    def _reset(self):
+        self._bitmaps = {facet: {} for facet in FACETS}
+        self._all = 0
+
+    def _query(self, db):
+        return (
+            db.execute(select(Campsite.campsite_id, Campsite.category_id, Campsite.approved,
+                              Campsite.parking_cost, Campsite.facilities_cost)).all(),
+            db.execute(select(campsites_facilities.c.campsite_id,
+                              campsites_facilities.c.facility_id)).all(),
+            db.execute(select(CampsiteActivity.campsite_id,
+                              CampsiteActivity.activity_id)).all()
+        )
+
+    def build(self, campsites, facility_links=(), activity_links=(), generation=None, version=None):
+        # campsites: (campsite_id, category_id, approved, parking_cost, facilities_cost)
+        # links: (campsite_id, facility_id) / (campsite_id, activity_id)
+        bitmaps = {facet: {} for facet in FACETS}
+        everything = 0
+        for campsite_id, *columns in campsites:
+            everything |= 1 << campsite_id
+            self._add_campsite(bitmaps, campsite_id, *columns)
+        for campsite_id, facility_id in facility_links:
+            self._set(bitmaps, "facility_id", facility_id, campsite_id)
+        for campsite_id, activity_id in activity_links:
+            self._set(bitmaps, "activity_id", activity_id, campsite_id)
+
+        self._install(generation, version, _bitmaps=bitmaps, _all=everything)
+
+    def insert(self, campsite_id, category_id, approved, parking_cost, facilities_cost, facility_ids=(), activity_ids=()):
+        with self._lock:
+            if not self._patchable():
+                return
+            self._all |= 1 << campsite_id
+            self._add_campsite(self._bitmaps, campsite_id, category_id,
+                               approved, parking_cost, facilities_cost)
+            for facility_id in facility_ids:
+                self._set(self._bitmaps, "facility_id",
+                          facility_id, campsite_id)
+            for activity_id in activity_ids:
+                self._set(self._bitmaps, "activity_id",
+                          activity_id, campsite_id)
+
+    @classmethod
+    def _add_campsite(cls, bitmaps, campsite_id, category_id, approved, parking_cost, facilities_cost):
+        if category_id is not None:
+            cls._set(bitmaps, "category_id", category_id, campsite_id)
+        cls._set(bitmaps, "approved", bool(approved), campsite_id)
+        cls._set(bitmaps, "parking_cost", cost_range(parking_cost), campsite_id)
+        cls._set(bitmaps, "facilities_cost",
+                 cost_range(facilities_cost), campsite_id)
+
+    @staticmethod
+    def _set(bitmaps, facet, value, campsite_id):
+        bitmaps[facet][value] = bitmaps[facet].get(
+            value, 0) | (1 << campsite_id)
+
+    def matching(self, filters=None):
+        # filters: {facet: [values]} -> bitmap of the matching campsites
+        bitmaps = self._bitmaps
+        result = self._all
+        for facet, values in (filters or {}).items():
+            if not values:
+                continue
+            if facet in MULTI_VALUED_FACETS:
+                for value in values:
+                    result &= bitmaps[facet].get(value, 0)
+            else:
+                any_value = 0
+                for value in values:
+                    any_value |= bitmaps[facet].get(value, 0)
+                result &= any_value
+        return result
+
+    def counts(self, filters=None, within=None):
+        # facet counts over the campsites matching filters, and set in the
+        # within bitmap when given
+        bitmaps = self._bitmaps
+        result = self.matching(filters)
+        if within is not None:
+            result &= within
+        counts = {"total": result.bit_count()}
+        for facet in FACETS:
+            values = COST_RANGES if facet in COST_FACETS else sorted(
+                bitmaps[facet])
+            counts[facet] = {value: (bitmaps[facet].get(value, 0) & result).bit_count()
+                             for value in values}
+        return counts
+
+
+campsite_facet_index = CampsiteFacetIndex()
@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+from fastapi import HTTPException
+
+IMPORT_MEDIA_TYPES = ("application/x-ndjson", "text/csv")
+
+
+def parse_ndjson_rows(text):
+    # -> (row number, campsite dict or None, errors or None) per non-blank line
+    for row_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield row_number, None, ["Row is not valid JSON"]
+            continue
+        if not isinstance(data, dict):
+            yield row_number, None, ["Row must be a JSON object"]
+            continue
+        yield row_number, data, None
+
+
+def parse_csv_contact(cell):
+    # "name;phone;email" -> contact dict, missing parts are left for validation
+    parts = [part.strip() for part in cell.split(";")]
+    contact = dict(zip(("campsite_contact_name", "campsite_contact_phone",
+                   "campsite_contact_email"), parts))
+    return {field: value for field, value in contact.items() if value}
+
+
+def parse_csv_rows(text):
+    # One campsite per row, headed by CampsiteCreateRequest field names.
+    # Blank cells are left out so defaults apply. The photos column holds "|"
+    # separated URLs and the contacts column "|" separated
+    # name;phone;email contacts, the email optional. Facilities and
+    # activities need NDJSON. Row 1 is the first row after the header.
+    for row_number, row in enumerate(csv.DictReader(io.StringIO(text)), start=1):
+        if None in row:
+            yield row_number, None, ["Row has more cells than the header"]
+            continue
+        data = {field: value for field, value in row.items()
+                if value is not None and value.strip() != ""}
+        if "photos" in data:
+            data["photos"] = [{"campsite_photo_url": url.strip()}
+                              for url in data["photos"].split("|") if url.strip()]
+        if "contacts" in data:
+            data["contacts"] = [parse_csv_contact(contact)
+                                for contact in data["contacts"].split("|") if contact.strip()]
+        yield row_number, data, None
+
+
+def parse_import_rows(content_type, body):
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in IMPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=415, detail="415 - Unsupported Import Format")
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=400, detail="400 - Import Must Be UTF-8")
+    if media_type == "text/csv":
+        return parse_csv_rows(text)
+    return parse_ndjson_rows(text)
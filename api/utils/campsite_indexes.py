@@ -0,0 +1,73 @@
+from api.utils.campsite_kd_tree import campsite_kd_tree
+from api.utils.campsite_clusters import campsite_cluster_index
+from api.utils.campsite_autocomplete import campsite_autocomplete
+from api.utils.campsite_facets import campsite_facet_index
+from api.utils.campsite_trigrams import campsite_trigram_index
+from api.utils.campsite_versions import read_list_version
+from api.utils.response_cache import response_cache
+from database.database_utils.replica_routing import primary_session
+
+# In-process indexes and cached responses over campsite data. Indexes are
+# loaded lazily from the database on first use, patched by this worker's
+# campsite and review writes, reloaded once the campsite_versions list row
+# shows a write they haven't seen and dropped whenever the tables are
+# rewritten underneath them (e.g. seeding).
+CAMPSITE_INDEXES = (campsite_kd_tree, campsite_cluster_index, campsite_autocomplete,
+                    campsite_trigram_index, campsite_facet_index)
+
+
+def ensure_index_loaded(db, index):
+    # An index is built once and shared by every request, so never from a
+    # lagging replica. It reloads once the list version shows a write it
+    # hasn't seen, whichever worker made it.
+    with primary_session(db) as primary:
+        index.ensure_loaded(primary, read_list_version(primary))
+
+
+def advance_campsite_indexes(version):
+    for index in CAMPSITE_INDEXES:
+        index.advance(version)
+
+
+def index_new_campsite(campsite, version):
+    if campsite.approved:
+        campsite_kd_tree.insert(
+            campsite.campsite_id, campsite.campsite_latitude, campsite.campsite_longitude)
+        campsite_cluster_index.invalidate()
+    campsite_autocomplete.insert(
+        campsite.campsite_id, campsite.campsite_name, campsite.average_rating)
+    campsite_trigram_index.insert(campsite.campsite_id, campsite.campsite_name)
+    campsite_facet_index.insert(
+        campsite.campsite_id, campsite.category_id, campsite.approved,
+        campsite.parking_cost, campsite.facilities_cost,
+        [facility.facility_id for facility in campsite.facilities],
+        [activity.activity_id for activity in campsite.activities])
+    advance_campsite_indexes(version)
+    response_cache.invalidate("campsites")
+
+
+def index_imported_campsites():
+    # too many campsites to patch in one by one, the indexes reload lazily
+    for index in CAMPSITE_INDEXES:
+        index.invalidate()
+    response_cache.invalidate("campsites")
+
+
+def index_campsite_review_change(campsite_id, version, average_rating=None):
+    # ratings order the autocomplete suggestions, average_rating is the
+    # campsite's new one when the review changed it
+    if average_rating is not None:
+        campsite_autocomplete.update_rating(campsite_id, average_rating)
+    advance_campsite_indexes(version)
+    response_cache.invalidate(
+        "campsites", f"campsite:{campsite_id}", f"reviews:{campsite_id}")
+
+
+def index_user_favourites_change(user_id):
+    response_cache.invalidate(f"favourites:{user_id}")
+
+
+def invalidate_campsite_indexes():
+    response_cache.clear()
+    for index in CAMPSITE_INDEXES:
+        index.invalidate()
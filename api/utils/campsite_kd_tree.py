@@ -0,0 +1,136 @@
+import heapq
+from math import radians, sin, cos, asin, sqrt
+from api.models.campsite_models import Campsite
+from api.utils.lazy_index import LazyIndex
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    d_lat = radians(lat2 - lat1)
+    d_lon = radians(lon2 - lon1)
+    a = sin(d_lat / 2) ** 2 + cos(radians(lat1)) * \
+        cos(radians(lat2)) * sin(d_lon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+def to_unit_vector(latitude, longitude):
+    # Points on the unit sphere: straight-line distance between them grows
+    # with great-circle distance, so an ordinary 3D KD-tree gives true kNN
+    # without any special handling at the poles or the antimeridian.
+    lat, lon = radians(latitude), radians(longitude)
+    return (cos(lat) * cos(lon), cos(lat) * sin(lon), sin(lat))
+
+
+class KDNode:
+    __slots__ = ("point", "campsite_id", "latitude",
+                 "longitude", "axis", "left", "right")
+
+    def __init__(self, point, campsite_id, latitude, longitude, axis):
+        self.point = point
+        self.campsite_id = campsite_id
+        self.latitude = latitude
+        self.longitude = longitude
+        self.axis = axis
+        self.left = None
+        self.right = None
+
+
+class CampsiteKDTree(LazyIndex):
+    # Rebuild once this fraction of the tree has been added by unbalanced inserts
+    REBALANCE_RATIO = 0.5
+
+    def _reset(self):
+        self._root = None
+        self._entries = []
+        self._inserted_since_build = 0
+
+    def _query(self, db):
+        return (db.query(Campsite.campsite_id, Campsite.campsite_latitude, Campsite.campsite_longitude).filter(
+            Campsite.approved.is_(True)).all(),)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def build(self, entries, generation=None, version=None):
+        # entries: iterable of (campsite_id, latitude, longitude)
+        entries = [entry for entry in entries
+                   if entry[1] is not None and entry[2] is not None]
+        self._install(generation, version, _entries=entries,
+                      _root=self._build_tree(entries), _inserted_since_build=0)
+
+    def _rebuild(self):
+        self._root = self._build_tree(self._entries)
+        self._inserted_since_build = 0
+
+    def _build_tree(self, entries):
+        points = [(to_unit_vector(lat, lon), campsite_id, lat, lon)
+                  for campsite_id, lat, lon in entries]
+        return self._build_subtree(points, 0)
+
+    def _build_subtree(self, points, depth):
+        if not points:
+            return None
+        axis = depth % 3
+        points.sort(key=lambda point: point[0][axis])
+        median = len(points) // 2
+        node = KDNode(*points[median], axis)
+        node.left = self._build_subtree(points[:median], depth + 1)
+        node.right = self._build_subtree(points[median + 1:], depth + 1)
+        return node
+
+    def insert(self, campsite_id, latitude, longitude):
+        if latitude is None or longitude is None:
+            return
+        with self._lock:
+            if not self._patchable():
+                return
+            self._entries.append((campsite_id, latitude, longitude))
+            self._inserted_since_build += 1
+            if self._inserted_since_build > len(self._entries) * self.REBALANCE_RATIO:
+                self._rebuild()
+                return
+
+            point = to_unit_vector(latitude, longitude)
+            if self._root is None:
+                self._root = KDNode(point, campsite_id, latitude, longitude, 0)
+                return
+            node = self._root
+            while True:
+                branch = "left" if point[node.axis] < node.point[node.axis] else "right"
+                child = getattr(node, branch)
+                if child is None:
+                    setattr(node, branch, KDNode(
+                        point, campsite_id, latitude, longitude, (node.axis + 1) % 3))
+                    return
+                node = child
+
+    def nearest(self, latitude, longitude, k):
+        # Returns [(campsite_id, distance_km)] ordered nearest first
+        target = to_unit_vector(latitude, longitude)
+        heap = []
+        root = self._root
+
+        def search(node):
+            if node is None:
+                return
+            distance = sum((a - b) ** 2 for a, b in zip(target, node.point))
+            if len(heap) < k:
+                heapq.heappush(heap, (-distance, id(node), node))
+            elif distance < -heap[0][0]:
+                heapq.heapreplace(heap, (-distance, id(node), node))
+
+            difference = target[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if difference < 0 else (
+                node.right, node.left)
+            search(near)
+            if len(heap) < k or difference ** 2 < -heap[0][0]:
+                search(far)
+
+        search(root)
+        nearest_nodes = [node for _, _, node in sorted(heap, reverse=True)]
+        return [(node.campsite_id, haversine_km(latitude, longitude, node.latitude, node.longitude))
+                for node in nearest_nodes]
+
+
+campsite_kd_tree = CampsiteKDTree()
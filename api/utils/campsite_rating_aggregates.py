@@ -0,0 +1,67 @@
+from collections import defaultdict
+from sqlalchemy import select, update, case, cast, Float
+from sqlalchemy.sql import func
+from api.models.campsite_models import Campsite
+from api.models.review_models import Review
+
+RATING_VALUES = range(1, 6)
+
+
+def rating_count_column(rating):
+    return getattr(Campsite, f"rating_{rating}_count")
+
+
+def apply_campsite_rating_change(db, campsite_id, added_rating=None, removed_rating=None):
+    # Adjusts the stored aggregates in a single UPDATE so concurrent review
+    # writes can't lose each other's increments. Does not commit, the caller
+    # commits the review change and the aggregate change together. Returns
+    # the campsite's new average rating, or None when there is no such campsite.
+    if added_rating == removed_rating:
+        return db.scalar(select(Campsite.average_rating).where(Campsite.campsite_id == campsite_id))
+
+    count_delta = (added_rating is not None) - (removed_rating is not None)
+    sum_delta = (added_rating or 0) - (removed_rating or 0)
+    new_review_count = Campsite.review_count + count_delta
+    new_rating_sum = Campsite.rating_sum + sum_delta
+
+    values = {
+        "review_count": new_review_count,
+        "rating_sum": new_rating_sum,
+        "average_rating": case(
+            (new_review_count > 0, cast(new_rating_sum, Float) / new_review_count),
+            else_=0.0
+        )
+    }
+    if added_rating is not None:
+        column = rating_count_column(added_rating)
+        values[column.key] = column + 1
+    if removed_rating is not None:
+        column = rating_count_column(removed_rating)
+        values[column.key] = column - 1
+
+    return db.execute(
+        update(Campsite).where(Campsite.campsite_id == campsite_id).values(
+            **values).returning(Campsite.average_rating),
+        execution_options={"synchronize_session": "fetch"}
+    ).scalar()
+
+
+def recalculate_campsite_rating_aggregates(db):
+    # Full rebuild from the reviews table, used after seeding
+    # or to repair aggregates that have drifted.
+    histograms = defaultdict(dict)
+    rows = db.query(Review.campsite_id, Review.rating, func.count(Review.review_id)).group_by(
+        Review.campsite_id, Review.rating).all()
+    for campsite_id, rating, count in rows:
+        histograms[campsite_id][rating] = count
+
+    for campsite in db.query(Campsite).all():
+        histogram = histograms.get(campsite.campsite_id, {})
+        review_count = sum(histogram.values())
+        rating_sum = sum(rating * count for rating, count in histogram.items())
+        campsite.review_count = review_count
+        campsite.rating_sum = rating_sum
+        campsite.average_rating = rating_sum / review_count if review_count else 0.0
+        for rating in RATING_VALUES:
+            setattr(campsite, f"rating_{rating}_count", histogram.get(rating, 0))
+    db.commit()
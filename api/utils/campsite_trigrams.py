@@ -0,0 +1,71 @@
+import re
+from collections import Counter
+from api.models.campsite_models import Campsite
+from api.utils.lazy_index import LazyIndex
+
+# pg_trgm's default similarity threshold, so both databases match alike
+SIMILARITY_THRESHOLD = 0.3
+
+
+def trigrams(text):
+    # pg_trgm rules: lowercase words padded with two leading blanks and one
+    # trailing blank, e.g. "Pines" -> {"  p", " pi", "pin", "ine", "nes", "es "}
+    grams = set()
+    for word in re.findall(r"[^\W_]+", (text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(shared, first_count, second_count):
+    union = first_count + second_count - shared
+    return shared / union if union else 0.0
+
+
+class CampsiteTrigramIndex(LazyIndex):
+    # Posting lists from each trigram to the campsites whose names contain
+    # it. A fuzzy lookup only scores campsites sharing at least one trigram
+    # with the query, instead of comparing against every campsite name.
+
+    def _reset(self):
+        self._postings = {}
+        self._trigram_counts = {}
+
+    def _query(self, db):
+        return (db.query(Campsite.campsite_id, Campsite.campsite_name).all(),)
+
+    def build(self, entries, generation=None, version=None):
+        # entries: iterable of (campsite_id, campsite_name)
+        postings, trigram_counts = {}, {}
+        for campsite_id, campsite_name in entries:
+            self._add(postings, trigram_counts, campsite_id, campsite_name)
+        self._install(generation, version, _postings=postings,
+                      _trigram_counts=trigram_counts)
+
+    def insert(self, campsite_id, campsite_name):
+        with self._lock:
+            if self._patchable():
+                self._add(self._postings, self._trigram_counts,
+                          campsite_id, campsite_name)
+
+    @staticmethod
+    def _add(postings, trigram_counts, campsite_id, campsite_name):
+        grams = trigrams(campsite_name)
+        trigram_counts[campsite_id] = len(grams)
+        for gram in grams:
+            postings.setdefault(gram, set()).add(campsite_id)
+
+    def search(self, query, threshold=SIMILARITY_THRESHOLD):
+        # -> [(campsite_id, similarity)], most similar first
+        query_grams = trigrams(query)
+        with self._lock:
+            shared = Counter()
+            for gram in query_grams:
+                shared.update(self._postings.get(gram, ()))
+            scored = [(campsite_id, similarity(count, len(query_grams), self._trigram_counts[campsite_id]))
+                      for campsite_id, count in shared.items()]
+        return sorted(((campsite_id, score) for campsite_id, score in scored if score >= threshold),
+                      key=lambda match: (-match[1], match[0]))
+
+
+campsite_trigram_index = CampsiteTrigramIndex()
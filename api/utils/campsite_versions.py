@@ -0,0 +1,80 @@
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from api.models.campsite_version_models import CampsiteVersion, LIST_VERSION_ID, new_epoch
+from api.utils.path_ids import parse_path_id, session_dialect
+
+# dialect -> INSERT construct with ON CONFLICT support
+UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def bump_campsite_versions(db, campsite_id=None):
+    # Moves the list version, and campsite_id's when given, and returns the
+    # new list version as (epoch, version). Does not commit, the caller
+    # commits it with the write so the versions move exactly when the data
+    # does, for every worker.
+    rows = [{"campsite_id": LIST_VERSION_ID, "version": 1, "epoch": new_epoch()}]
+    if campsite_id is not None:
+        rows.append({"campsite_id": int(campsite_id),
+                    "version": 1, "epoch": None})
+    upsert = UPSERT_INSERTS[db.get_bind().dialect.name](CampsiteVersion)
+    versions = db.execute(upsert.values(rows).on_conflict_do_update(
+        index_elements=[CampsiteVersion.campsite_id],
+        set_={"version": CampsiteVersion.version + 1}
+    ).returning(CampsiteVersion.campsite_id, CampsiteVersion.epoch, CampsiteVersion.version)).all()
+    return next((row.epoch, row.version) for row in versions if row.campsite_id == LIST_VERSION_ID)
+
+
+def reset_campsite_versions(db):
+    # a new epoch and no campsite versions, after the tables were reseeded
+    db.execute(delete(CampsiteVersion))
+    db.execute(insert(CampsiteVersion).values(
+        campsite_id=LIST_VERSION_ID, version=0, epoch=new_epoch()))
+    db.commit()
+
+
+def read_list_version(db):
+    # -> (epoch, version) of the list, which the in-process indexes compare
+    # against what they were built from
+    row = db.execute(campsite_versions_query()).first()
+    return (row.epoch, row.version) if row else None
+
+
+def campsite_versions_query(campsite_id=None):
+    ids = [LIST_VERSION_ID] if campsite_id is None else [
+        LIST_VERSION_ID, campsite_id]
+    return select(CampsiteVersion.campsite_id, CampsiteVersion.epoch,
+                  CampsiteVersion.version).where(CampsiteVersion.campsite_id.in_(ids))
+
+
+def versions_etag(rows, campsite_id=None):
+    # The ETag for the list, or for campsite_id, from campsite_versions_query
+    # rows. Weak, since the gzip, br and identity bodies share it.
+    versions = {row.campsite_id: row for row in rows}
+    list_version = versions.get(LIST_VERSION_ID)
+    if list_version is None:
+        return None
+    if campsite_id is None:
+        return f'W/"{list_version.epoch}-{list_version.version}"'
+    campsite_version = versions.get(campsite_id)
+    return f'W/"{list_version.epoch}-{campsite_id}-{campsite_version.version if campsite_version else 0}"'
+
+
+async def read_list_etag_async(db):
+    return versions_etag((await db.execute(campsite_versions_query())).all())
+
+
+async def read_campsite_etag_async(db, campsite_id):
+    campsite_id = parse_path_id(campsite_id, session_dialect(db))
+    if campsite_id is None:
+        return None
+    return versions_etag((await db.execute(campsite_versions_query(campsite_id))).all(), campsite_id)
+
+
+def etag_matches(if_none_match, etag):
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
@@ -0,0 +1,85 @@
+import gzip
+import zlib
+from fastapi import Response
+from api.config.config import COMPRESSION_MIN_BYTES
+
+try:
+    import brotli
+except ImportError:  # optional, clients fall back to gzip without it
+    brotli = None
+
+GZIP_LEVEL = 6
+# brotli's middle qualities compress JSON nearly as well as 11 at a fraction
+# of the CPU, which matters for bodies compressed per request
+BROTLI_QUALITY = 5
+
+# server preference when the client weights codings equally
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding):
+    # "gzip, br;q=0.5" -> the supported coding the client weights highest, or None
+    weights = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.partition(";")
+        weight = 1.0
+        name, _, value = params.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        if coding.strip():
+            weights[coding.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in ENCODINGS:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def response_encoding(request, body):
+    # bodies under the threshold aren't worth the CPU or the header bytes
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return None
+    return negotiate_encoding(request.headers.get("accept-encoding"))
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compressed_response(request, body, media_type="application/json", headers=None):
+    # an uncached body compressed to suit the request's Accept-Encoding
+    headers = dict(headers or {})
+    headers["Vary"] = ", ".join(filter(None, (headers.get("Vary"), "Accept-Encoding")))
+    encoding = response_encoding(request, body)
+    if encoding:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def compress_stream(chunks, encoding):
+    # Compresses an iterable of byte chunks. Each chunk is flushed so a
+    # streaming client can decode it as soon as it arrives.
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    else:
+        # wbits 31 writes the gzip header and trailer around the deflate stream
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    try:
+        for chunk in chunks:
+            if encoding == "br":
+                yield compressor.process(chunk) + compressor.flush()
+            else:
+                yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.finish() if encoding == "br" else compressor.flush()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
@@ -0,0 +1,13 @@
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    # Serializes pydantic models and plain data in pydantic-core, without
+    # validating. Routes return it wrapped around data the CRUD layer has
+    # already validated, so FastAPI skips its response_model validation and
+    # jsonable_encoder pass. As the app's default response class it also
+    # replaces json.dumps for routes that still return bare objects.
+
+    def render(self, content) -> bytes:
+        return to_json(content)
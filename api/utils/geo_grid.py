@@ -0,0 +1,69 @@
+from fastapi import HTTPException
+
+# Campsites are bucketed into a fixed 0.1 degree lat/lon grid. Each cell has
+# a row-major integer id stored in Campsite.grid_cell, so a viewport becomes
+# a handful of indexed BETWEEN ranges instead of a full table scan.
+GRID_CELL_DEGREES = 0.1
+GRID_COLUMNS = 3600
+GRID_ROWS = 1800
+# Past this many rows a single range over the whole band is cheaper to plan
+MAX_GRID_ROW_RANGES = 64
+
+
+def normalise_longitude(longitude):
+    return ((longitude + 180) % 360) - 180
+
+
+def grid_row(latitude):
+    row = int((latitude + 90) / GRID_CELL_DEGREES)
+    return min(max(row, 0), GRID_ROWS - 1)
+
+
+def grid_column(longitude):
+    column = int((longitude + 180) / GRID_CELL_DEGREES)
+    return min(max(column, 0), GRID_COLUMNS - 1)
+
+
+def grid_cell(latitude, longitude):
+    if latitude is None or longitude is None:
+        return None
+    return grid_row(latitude) * GRID_COLUMNS + grid_column(normalise_longitude(longitude))
+
+
+def grid_cell_ranges(min_lon, min_lat, max_lon, max_lat):
+    # A bbox whose min_lon is east of its max_lon crosses the antimeridian
+    if min_lon <= max_lon:
+        column_spans = [(grid_column(min_lon), grid_column(max_lon))]
+    else:
+        # west chunk first so it merges with the previous row's east chunk
+        column_spans = [(0, grid_column(max_lon)),
+                        (grid_column(min_lon), GRID_COLUMNS - 1)]
+
+    rows = range(grid_row(min_lat), grid_row(max_lat) + 1)
+    if len(rows) > MAX_GRID_ROW_RANGES:
+        return [(rows[0] * GRID_COLUMNS, rows[-1] * GRID_COLUMNS + GRID_COLUMNS - 1)]
+
+    ranges = []
+    for row in rows:
+        for first_column, last_column in column_spans:
+            start = row * GRID_COLUMNS + first_column
+            end = row * GRID_COLUMNS + last_column
+            if ranges and ranges[-1][1] + 1 == start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+    return ranges
+
+
+def parse_bbox(bbox):
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(value)
+                                              for value in bbox.split(','))
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="400 - Invalid Bounding Box")
+
+    if not (-90 <= min_lat <= max_lat <= 90) or not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180):
+        raise HTTPException(
+            status_code=400, detail="400 - Invalid Bounding Box")
+    return min_lon, min_lat, max_lon, max_lat
@@ -0,0 +1,83 @@
+import threading
+
+
+def is_at_least(version, other):
+    # versions are campsite_versions list (epoch, version) pairs, comparable
+    # only within an epoch
+    return version is not None and version[0] == other[0] and version[1] >= other[1]
+
+
+class LazyIndex:
+    # Lifecycle shared by the in-process campsite indexes. An index loads from
+    # the database on first use and remembers the campsite_versions list
+    # version it reflects. This worker's writes patch it and advance() it to
+    # the version they wrote, anything newer (a write through another worker,
+    # a reseed) makes ensure_loaded reload it. A build that started before an
+    # invalidate(), or before an insert() ignored while unloaded, is dropped.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # held for a whole load, so concurrent requests wait for one build
+        # instead of each running their own
+        self._build_lock = threading.Lock()
+        self.loaded = False
+        self.version = None
+        self._generation = 0
+        self._reset()
+
+    @property
+    def generation(self):
+        # read before loading entries and pass to build(), so entries loaded
+        # before an invalidate() or an ignored insert() can't be installed
+        return self._generation
+
+    def _reset(self):
+        # empties the index, called under the lock
+        raise NotImplementedError
+
+    def _query(self, db):
+        # -> build()'s positional arguments, read from db
+        raise NotImplementedError
+
+    def _install(self, generation, version, **state):
+        # sets the attributes a build computed, unless it is stale
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            for name, value in state.items():
+                setattr(self, name, value)
+            self.loaded = True
+            self.version = version
+
+    def _patchable(self):
+        # Under the lock: whether an insert can patch the index. One that
+        # can't may be missing from a build in progress, so that build goes.
+        if self.loaded:
+            return True
+        self._generation += 1
+        return False
+
+    def is_current(self, version=None):
+        return self.loaded and (version is None or is_at_least(self.version, version))
+
+    def advance(self, version):
+        # this worker's write of version has been applied to the index
+        with self._lock:
+            if self.loaded and self.version is not None and self.version[0] == version[0] \
+                    and self.version[1] + 1 == version[1]:
+                self.version = version
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._reset()
+            self.loaded = False
+            self.version = None
+
+    def ensure_loaded(self, db, version=None):
+        while not self.is_current(version):
+            with self._build_lock:
+                if self.is_current(version):
+                    return
+                generation = self.generation
+                self.build(*self._query(db), generation=generation, version=version)
@@ -0,0 +1,51 @@
+import struct
+
+# Binary marker feed layout, all little-endian:
+#   uint32  marker count n
+#   int32   campsite_id[n]
+#   float32 latitude[n]
+#   float32 longitude[n]
+#   int32   category_id[n]      (-1 when the campsite has no category)
+#   float32 average_rating[n]
+MARKER_FEED_MEDIA_TYPE = "application/vnd.parkfinite.markers"
+MARKER_FIELDS = ["campsite_id", "latitude",
+                 "longitude", "category_id", "average_rating"]
+
+
+def wants_packed_markers(accept_header):
+    return MARKER_FEED_MEDIA_TYPE in (accept_header or "")
+
+
+def columnar_markers(rows):
+    columns = {field: [] for field in MARKER_FIELDS}
+    for row in rows:
+        for field, value in zip(MARKER_FIELDS, row):
+            columns[field].append(value)
+    return columns
+
+
+def pack_markers(rows):
+    count = len(rows)
+    campsite_ids, latitudes, longitudes, category_ids, ratings = (
+        zip(*rows) if rows else ([], [], [], [], []))
+    return b"".join([
+        struct.pack("<I", count),
+        struct.pack(f"<{count}i", *campsite_ids),
+        struct.pack(f"<{count}f", *(value or 0.0 for value in latitudes)),
+        struct.pack(f"<{count}f", *(value or 0.0 for value in longitudes)),
+        struct.pack(f"<{count}i", *(-1 if value is None else value
+                                    for value in category_ids)),
+        struct.pack(f"<{count}f", *(value or 0.0 for value in ratings)),
+    ])
+
+
+def unpack_markers(payload):
+    # Reference decoder for clients and tests
+    (count,) = struct.unpack_from("<I", payload, 0)
+    offset = 4
+    columns = {}
+    for field, code in zip(MARKER_FIELDS, "iffif"):
+        columns[field] = list(struct.unpack_from(
+            f"<{count}{code}", payload, offset))
+        offset += 4 * count
+    return columns
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from fastapi import HTTPException
+
+MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+          "august", "september", "october", "november", "december"]
+# bit n set when the campsite is open in month n + 1, so January is bit 0
+ALL_MONTHS = (1 << 12) - 1
+
+
+def parse_month(month):
+    # "July", "jul" or "7" -> 7, anything else -> None
+    month = str(month or "").strip().lower()
+    if month.isdigit():
+        return int(month) if 1 <= int(month) <= 12 else None
+    for number, name in enumerate(MONTHS, start=1):
+        if len(month) >= 3 and name.startswith(month):
+            return number
+    return None
+
+
+def month_bit(month):
+    return 1 << (month - 1)
+
+
+def month_mask(opening_month, closing_month):
+    # Seasons run from opening to closing month inclusive and may wrap the
+    # year end, so October to March is Oct, Nov, Dec, Jan, Feb and Mar. A
+    # campsite without a readable season is treated as open all year.
+    opening, closing = parse_month(opening_month), parse_month(closing_month)
+    if opening is None or closing is None:
+        return ALL_MONTHS
+    mask, month = 0, opening
+    while True:
+        mask |= month_bit(month)
+        if month == closing:
+            return mask
+        month = month % 12 + 1
+
+
+# every mask month_mask produces: 132 partial seasons and the whole year
+SEASON_MASKS = sorted({month_mask(opening, closing)
+                       for opening in MONTHS for closing in MONTHS})
+
+
+def masks_open_in(month):
+    # The season masks including month. Matching open_months against these
+    # with IN can use its index, a bitwise AND can't.
+    bit = month_bit(month)
+    return [mask for mask in SEASON_MASKS if mask & bit]
+
+
+def parse_open_in(open_in):
+    month = parse_month(open_in)
+    if month is None:
+        raise HTTPException(status_code=400, detail="400 - Invalid Month")
+    return month
+
+
+def current_month():
+    return datetime.now(timezone.utc).month
@@ -0,0 +1,35 @@
+import base64
+import json
+from fastapi import HTTPException
+
+# sort key -> the types its cursor's sort value may have
+SORT_VALUE_TYPES = {
+    "campsite_id": (int,),
+    "date_added": (str,),
+    "rating": (float, int),
+}
+
+
+def encode_cursor(sort_by, sort_value, campsite_id):
+    # Opaque to clients, it just records where the previous page stopped
+    payload = json.dumps([sort_by, sort_value, campsite_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def is_sort_value(value, types):
+    # bool is an int subclass but never a sort value
+    return isinstance(value, types) and not isinstance(value, bool)
+
+
+def decode_cursor(cursor, sort_by):
+    try:
+        padded_cursor = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort_by, sort_value, campsite_id = json.loads(
+            base64.urlsafe_b64decode(padded_cursor.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise HTTPException(status_code=400, detail="400 - Invalid Cursor")
+
+    if (cursor_sort_by != sort_by or not is_sort_value(campsite_id, (int,))
+            or not is_sort_value(sort_value, SORT_VALUE_TYPES[sort_by])):
+        raise HTTPException(status_code=400, detail="400 - Invalid Cursor")
+    return sort_value, campsite_id
@@ -0,0 +1,21 @@
+# bits in the Integer id columns by dialect: int4 on Postgres, SQLite's
+# integers are 64 bit
+ID_BITS = {"postgresql": 32}
+DEFAULT_ID_BITS = 64
+
+
+def parse_path_id(value, dialect=None):
+    # "12" -> 12, anything else -> None so the lookup finds nothing. asyncpg
+    # binds parameters by type and won't cast a string to an integer column
+    # the way psycopg2's literal parameters do, and neither driver binds an
+    # int wider than the column, so those find nothing too.
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    bound = 2 ** (ID_BITS.get(dialect, DEFAULT_ID_BITS) - 1)
+    return value if -bound <= value < bound else None
+
+
+def session_dialect(db):
+    return db.get_bind().dialect.name
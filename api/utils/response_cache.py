@@ -0,0 +1,199 @@
+import threading
+import time
+from urllib.parse import urlencode
+from collections import OrderedDict
+from fastapi import Response
+from api.config.config import RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_TTL_SECONDS, REPLICA_DATABASE_URL, READ_YOUR_WRITES_SECONDS
+from api.utils.compression import compress, response_encoding
+
+
+def cache_key(request):
+    # re-encoded, so an escaped "&" or "=" in a value can't collide with a
+    # real separator
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+class CachedResponse:
+    __slots__ = ("body", "headers", "tags", "expires_at", "version", "encoded")
+
+    def __init__(self, body, headers, tags, expires_at, version=None):
+        self.body = body
+        self.headers = headers
+        self.tags = tags
+        self.expires_at = expires_at
+        # the data version (e.g. ETag) the body was loaded at, if any
+        self.version = version
+        # content coding -> compressed body, filled in as clients ask for them
+        self.encoded = {}
+
+    def to_response(self, headers=None, encoding=None):
+        headers = {**self.headers, **(headers or {})}
+        if encoding is None:
+            return Response(content=self.body, media_type="application/json", headers=headers)
+        headers["Content-Encoding"] = encoding
+        return Response(content=self.encoded[encoding], media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    # Serialized response bodies keyed by path + query, bounded by total body
+    # size with LRU eviction and a TTL. Each entry carries tags (e.g.
+    # "campsite:3") so writes can drop exactly the entries they affect.
+    # Compressed variants live on their entry, count towards max_bytes and
+    # go when it does, so a hit never compresses the same bytes twice.
+    # With settle_seconds, entries for a tag invalidated within that window
+    # are not stored, so a read from a lagging replica can't put the old
+    # response back in front of everyone, including the writer.
+
+    def __init__(self, max_bytes, ttl_seconds, settle_seconds=0, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.settle_seconds = settle_seconds
+        self._invalidated_at = {}
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._keys_by_tag = {}
+        self._size = 0
+        self._generation = 0
+
+    @property
+    def generation(self):
+        # Read before loading a response and pass to set(), so a response
+        # loaded before an invalidation can't be stored after it
+        return self._generation
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= self._clock():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, body, headers=None, tags=(), generation=None, version=None):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if self._settling(tags):
+                return
+            if key in self._entries:
+                self._remove(key)
+            entry = self._entries[key] = CachedResponse(
+                body, headers or {}, frozenset(tags), self._clock() + self.ttl_seconds, version)
+            self._size += len(body)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+            return entry if key in self._entries else None
+
+    def encode(self, key, entry, encoding):
+        # adds entry's compressed body for encoding, once
+        if encoding in entry.encoded:
+            return
+        encoded = compress(entry.body, encoding)
+        with self._lock:
+            if encoding in entry.encoded:
+                return
+            entry.encoded[encoding] = encoded
+            if self._entries.get(key) is entry:
+                self._size += len(encoded)
+                while self._size > self.max_bytes:
+                    self._remove(next(iter(self._entries)))
+
+    def invalidate(self, *tags):
+        with self._lock:
+            self._generation += 1
+            if self.settle_seconds:
+                now = self._clock()
+                self._invalidated_at = {tag: at for tag, at in self._invalidated_at.items()
+                                        if now - at < self.settle_seconds}
+                self._invalidated_at.update(dict.fromkeys(tags, now))
+            for tag in tags:
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            self._size = 0
+
+    def settling(self, *tags):
+        # whether any of tags was invalidated within the settle window, when
+        # a replica read may still return what the write replaced
+        with self._lock:
+            return self._settling(tags)
+
+    def _settling(self, tags):
+        if not self._invalidated_at:
+            return False
+        now = self._clock()
+        return any(now - self._invalidated_at.get(tag, now - self.settle_seconds) < self.settle_seconds
+                   for tag in tags)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._size -= len(entry.body) + \
+            sum(len(encoded) for encoded in entry.encoded.values())
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+response_cache = ResponseCache(
+    RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_TTL_SECONDS,
+    settle_seconds=READ_YOUR_WRITES_SECONDS if REPLICA_DATABASE_URL else 0)
+
+
+def not_modified_response(etag):
+    # 304 for a cached_json_response route, with the headers its 200 has
+    return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept-Encoding"})
+
+
+def encoded_response(request, key, cached, headers=None):
+    # cached's body compressed to suit the request's Accept-Encoding
+    headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+    encoding = response_encoding(request, cached.body)
+    if encoding:
+        response_cache.encode(key, cached, encoding)
+    return cached.to_response(headers, encoding)
+
+
+def cached_json_response(request, load, headers=None, version=None):
+    # load() -> (body bytes, headers to cache with the body, invalidation tags).
+    # With a version, only a body loaded at that version is served, so a
+    # write through another worker can't leave this one's entry in place.
+    key = cache_key(request)
+    cached = response_cache.get(key)
+    if cached is None or cached.version != version:
+        generation = response_cache.generation
+        body, cached_headers, tags = load()
+        cached = response_cache.set(key, body, cached_headers, tags, generation, version) or \
+            CachedResponse(body, cached_headers, tags, None, version)
+    return encoded_response(request, key, cached, headers)
+
+
+async def cached_json_response_async(request, load, headers=None, version=None):
+    # cached_json_response for async routes, load is awaited
+    key = cache_key(request)
+    cached = response_cache.get(key)
+    if cached is None or cached.version != version:
+        generation = response_cache.generation
+        body, cached_headers, tags = await load()
+        cached = response_cache.set(key, body, cached_headers, tags, generation, version) or \
+            CachedResponse(body, cached_headers, tags, None, version)
+    return encoded_response(request, key, cached, headers)
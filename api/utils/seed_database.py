@@ -1,5 +1,9 @@
 from api.models.user_models import user_campsite_favourites
+from api.models.campsite_models import campsites_facilities
 from api.config.config import PRE_HASHED_USER_PASSWORD
+from api.utils.campsite_rating_aggregates import recalculate_campsite_rating_aggregates
+from api.utils.campsite_indexes import invalidate_campsite_indexes
+from api.utils.campsite_versions import reset_campsite_versions
 
 
 
@@ -27,6 +31,19 @@ def seed_campsites(session, campsites):
     session.commit()
 
 
+def seed_campsite_facilities(session, facilities_data, campsites_facilities):
+    for id_array in facilities_data:
+        session.execute(campsites_facilities.insert().values(
+            campsite_id=id_array[0], facility_id=id_array[1]))
+    session.commit()
+
+
+def seed_campsite_activities(session, campsite_activities):
+    for campsite_activity in campsite_activities:
+        session.add(campsite_activity)
+    session.commit()
+
+
 def seed_photos(session, photos):
     for photo in photos:
         session.add(photo)
@@ -84,12 +101,20 @@ def seed_database(session, data):
         seed_activities(session, data['activity'])
     if 'campsite' in data:
         seed_campsites(session, data['campsite'])
+    if 'campsite_facilities' in data:
+        seed_campsite_facilities(
+            session, data['campsite_facilities'], campsites_facilities)
+    if 'campsite_activity' in data:
+        seed_campsite_activities(session, data['campsite_activity'])
     if 'campsite_photo' in data:
         seed_photos(session, data['campsite_photo'])
     if 'campsite_contact' in data:
         seed_contacts(session, data['campsite_contact'])
     if 'review' in data:
         seed_reviews(session, data['review'])
+        recalculate_campsite_rating_aggregates(session)
     if 'user_campsite_favourites' in data:
         seed_user_campsite_favourites(
             session, data['user_campsite_favourites'], user_campsite_favourites)
+    reset_campsite_versions(session)
+    invalidate_campsite_indexes()
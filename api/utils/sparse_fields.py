@@ -0,0 +1,28 @@
+from copy import copy
+from functools import lru_cache
+from fastapi import HTTPException
+from pydantic import ConfigDict, TypeAdapter, create_model
+
+
+def parse_fields(fields, model):
+    # "campsite_name,campsite_id" -> ("campsite_id", "campsite_name") in the
+    # model's own field order, so equivalent requests share narrowed models
+    requested = {field.strip() for field in fields.split(',') if field.strip()}
+    if not requested or not requested.issubset(model.model_fields):
+        raise HTTPException(status_code=400, detail="400 - Invalid Fields")
+    return tuple(field for field in model.model_fields if field in requested)
+
+
+@lru_cache(maxsize=256)
+def narrowed_model(model, fields):
+    return create_model(
+        f"{model.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{field: (model.model_fields[field].annotation, copy(model.model_fields[field]))
+           for field in fields}
+    )
+
+
+@lru_cache(maxsize=256)
+def narrowed_list_adapter(model, fields):
+    return TypeAdapter(list[narrowed_model(model, fields)])